@@ -8,48 +8,131 @@ def carregar_historico():
     except FileNotFoundError:
         return pd.DataFrame(columns=['Time1', 'Time2', 'Vitorias_Time1', 'Vitorias_Time2', 'Empates'])
 
-def gerar_confronto_direto(df_total, time_A_selecionado, time_B_selecionado):
-    """Calcula estatísticas de confronto direto filtrando apenas jogos ocorridos."""
-    # Ordenação para busca no arquivo histórico
-    t1, t2 = sorted([time_A_selecionado, time_B_selecionado])
-    df_hist_base = carregar_historico()
-    hist_match = df_hist_base[(df_hist_base['Time1'] == t1) & (df_hist_base['Time2'] == t2)]
-    
-    stats_base = {t1: {'vitorias': 0}, t2: {'vitorias': 0}, 'empates': 0}
-    if not hist_match.empty:
-        stats_base[t1]['vitorias'] = int(hist_match.iloc[0]['Vitorias_Time1'])
-        stats_base[t2]['vitorias'] = int(hist_match.iloc[0]['Vitorias_Time2'])
-        stats_base['empates'] = int(hist_match.iloc[0]['Empates'])
-
-    # Filtra jogos entre os dois times na base atual do app
-    recente = df_total[
-        ((df_total['HomeTeam'] == time_A_selecionado) & (df_total['AwayTeam'] == time_B_selecionado)) |
-        ((df_total['HomeTeam'] == time_B_selecionado) & (df_total['AwayTeam'] == time_A_selecionado))
-    ].copy()
-    
+def _chave_time(time):
+    """Nome do time como chave: sem diferença de maiúsculas nem de espaços ("São Paulo " = "são paulo")."""
+    return ' '.join(str(time).split()).casefold()
+
+def _chave_par(time_A, time_B):
+    """Chave do par não ordenado (A x B e B x A caem no mesmo lugar)."""
+    return tuple(sorted([_chave_time(time_A), _chave_time(time_B)]))
+
+def construir_indice_h2h(df_total, df_hist_base=None):
+    """
+    Monta o índice de confronto direto, uma vez por versão dos dados:
+    para cada par de times (não ordenado), a base secular do arquivo histórico e
+    os jogos recentes já agregados (vitórias, empates e gols de cada lado).
+    """
+    if df_hist_base is None:
+        df_hist_base = carregar_historico()
+
+    # O arquivo não garante a ordem dos times no par (ex.: "Cruzeiro,Atlético Mineiro"): a chave
+    # é normalizada; as vitórias ficam indexadas pelo nome do time, então a ordem não importa
+    base = {}
+    for t1, t2, v1, v2, emp in df_hist_base[['Time1', 'Time2', 'Vitorias_Time1', 'Vitorias_Time2', 'Empates']].itertuples(index=False):
+        base.setdefault(_chave_par(t1, t2), {
+            _chave_time(t1): {'vitorias': int(v1)}, _chave_time(t2): {'vitorias': int(v2)}, 'empates': int(emp)
+        })
+
+    indice = {'base': base, 'pares': {}}
+    atualizar_indice_h2h(indice, df_total)
+    return indice
+
+def atualizar_indice_h2h(indice, df_novos):
+    """
+    Acrescenta (ou substitui, pelo id da partida) jogos encerrados no índice e
+    recalcula só os agregados dos pares afetados. Cada par afetado vira um dict novo,
+    trocado de uma vez: quem ainda lê o par antigo nunca vê um agregado pela metade.
+    """
+    if df_novos is None or df_novos.empty:
+        return indice
+
     # --- FILTRO CRÍTICO: Remove jogos que ainda não aconteceram ---
-    recente = recente.dropna(subset=['FTHG', 'FTAG'])
+    jogos = df_novos.dropna(subset=['FTHG', 'FTAG'])
+    ids = jogos['id'] if 'id' in jogos.columns else pd.Series(np.nan, index=jogos.index)
+
+    pares_afetados = {}
+    for id_jogo, data, casa, g_casa, g_vis, vis in zip(ids, jogos['Date'], jogos['HomeTeam'], jogos['FTHG'], jogos['FTAG'], jogos['AwayTeam']):
+        chave_par = _chave_par(casa, vis)
+        chave_jogo = id_jogo if pd.notna(id_jogo) else (data, casa, vis)
+        par = pares_afetados.get(chave_par)
+        if par is None:
+            anterior = indice['pares'].get(chave_par)
+            par = pares_afetados[chave_par] = {'jogos': dict(anterior['jogos']) if anterior else {}}
+        par['jogos'][chave_jogo] = (data, casa, g_casa, g_vis, vis)
+
+    for chave_par, par in pares_afetados.items():
+        vitorias = {time: 0 for time in chave_par}
+        gols = {time: 0 for time in chave_par}
+        empates = 0
+        for _, casa, g_casa, g_vis, vis in par['jogos'].values():
+            casa, vis = _chave_time(casa), _chave_time(vis)
+            gols[casa] += g_casa
+            gols[vis] += g_vis
+            if g_casa > g_vis:
+                vitorias[casa] += 1
+            elif g_vis > g_casa:
+                vitorias[vis] += 1
+            else:
+                empates += 1
+        par['vitorias'], par['gols'], par['empates'] = vitorias, gols, empates
+        # Jogos do par do mais recente para o mais antigo, prontos para exibição
+        par['recentes'] = sorted(par['jogos'].values(), key=lambda j: j[0], reverse=True)
+        indice['pares'][chave_par] = par
+
+    return indice
+
+def derivar_indice_h2h(indice, df_anterior, df_total):
+    """
+    Índice da nova versão dos dados a partir do índice da versão anterior, sem alterá-lo:
+    só os jogos encerrados novos ou com data/placar diferente (pelo id) passam por
+    atualizar_indice_h2h. Sem id, ou se um jogo encerrado sumiu ou trocou de times, refaz do zero.
+    """
+    colunas = ['id', 'Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']
+    if indice is None or df_anterior is None or any(c not in df.columns for df in (df_anterior, df_total) for c in colunas):
+        return construir_indice_h2h(df_total)
+
+    antigos = df_anterior.dropna(subset=['FTHG', 'FTAG'])[colunas]
+    atuais = df_total.dropna(subset=['FTHG', 'FTAG'])[colunas]
+    if antigos['id'].isna().any() or atuais['id'].isna().any() or not antigos['id'].isin(atuais['id']).all():
+        return construir_indice_h2h(df_total)
+
+    junto = atuais.merge(antigos, on='id', how='left', suffixes=('', '_ant'), indicator=True)
+    existia = (junto['_merge'] == 'both').to_numpy()
+    if ((junto['HomeTeam'] != junto['HomeTeam_ant']) | (junto['AwayTeam'] != junto['AwayTeam_ant']))[existia].any():
+        return construir_indice_h2h(df_total)
+
+    mudou = ~existia
+    for col in ['Date', 'FTHG', 'FTAG']:
+        mudou |= (junto[col] != junto[f'{col}_ant']).to_numpy()
+
+    novo = {'base': indice['base'], 'pares': dict(indice['pares'])}
+    return atualizar_indice_h2h(novo, junto.loc[mudou, colunas])
+
+def gerar_confronto_direto(df_total, time_A_selecionado, time_B_selecionado, indice=None):
+    """
+    Calcula estatísticas de confronto direto filtrando apenas jogos ocorridos.
+    Com `indice` (construir_indice_h2h), a consulta custa só o número de jogos do par.
+    """
+    if indice is None:
+        indice = construir_indice_h2h(df_total)
+
+    # Ordenação para busca no arquivo histórico
+    t1, t2 = _chave_par(time_A_selecionado, time_B_selecionado)
+    stats_base = indice['base'].get((t1, t2), {t1: {'vitorias': 0}, t2: {'vitorias': 0}, 'empates': 0})
 
+    par = indice['pares'].get((t1, t2))
     stats_rec = {time_A_selecionado: {'vitorias': 0, 'gols': 0}, time_B_selecionado: {'vitorias': 0, 'gols': 0}, 'empates': 0}
-    
-    if not recente.empty:
-        recente['Resultado'] = np.where(
-            recente['FTHG'] > recente['FTAG'], 'Casa',
-            np.where(recente['FTHG'] < recente['FTAG'], 'Visitante', 'Empate')
-        )
-        
-        # Contagem de Vitórias
-        stats_rec[time_A_selecionado]['vitorias'] = len(recente[((recente['HomeTeam'] == time_A_selecionado) & (recente['Resultado'] == 'Casa')) | ((recente['AwayTeam'] == time_A_selecionado) & (recente['Resultado'] == 'Visitante'))])
-        stats_rec[time_B_selecionado]['vitorias'] = len(recente[((recente['HomeTeam'] == time_B_selecionado) & (recente['Resultado'] == 'Casa')) | ((recente['AwayTeam'] == time_B_selecionado) & (recente['Resultado'] == 'Visitante'))])
-        stats_rec['empates'] = len(recente[recente['Resultado'] == 'Empate'])
-        
-        # Gols (Apenas no período recente da base)
-        stats_rec[time_A_selecionado]['gols'] = int(recente.loc[recente['HomeTeam'] == time_A_selecionado, 'FTHG'].sum() + recente.loc[recente['AwayTeam'] == time_A_selecionado, 'FTAG'].sum())
-        stats_rec[time_B_selecionado]['gols'] = int(recente.loc[recente['HomeTeam'] == time_B_selecionado, 'FTHG'].sum() + recente.loc[recente['AwayTeam'] == time_B_selecionado, 'FTAG'].sum())
+    recentes = []
+    if par is not None:
+        for time in (time_A_selecionado, time_B_selecionado):
+            stats_rec[time]['vitorias'] = par['vitorias'][_chave_time(time)]
+            stats_rec[time]['gols'] = int(par['gols'][_chave_time(time)])
+        stats_rec['empates'] = par['empates']
+        recentes = par['recentes']
 
     # Consolidação Final
-    v_A = stats_base.get(time_A_selecionado, {}).get('vitorias', 0) + stats_rec[time_A_selecionado]['vitorias']
-    v_B = stats_base.get(time_B_selecionado, {}).get('vitorias', 0) + stats_rec[time_B_selecionado]['vitorias']
+    v_A = stats_base.get(_chave_time(time_A_selecionado), {}).get('vitorias', 0) + stats_rec[time_A_selecionado]['vitorias']
+    v_B = stats_base.get(_chave_time(time_B_selecionado), {}).get('vitorias', 0) + stats_rec[time_B_selecionado]['vitorias']
     emp = stats_base['empates'] + stats_rec['empates']
 
     resumo = {
@@ -59,6 +142,5 @@ def gerar_confronto_direto(df_total, time_A_selecionado, time_B_selecionado):
         'total_partidas': v_A + v_B + emp
     }
 
-    exibicao = recente[['Date', 'HomeTeam', 'FTHG', 'FTAG', 'AwayTeam']].copy()
-    exibicao.columns = ['Data', 'Mandante', 'GM', 'GV', 'Visitante']
-    return resumo, exibicao.sort_values(by='Data', ascending=False)
\ No newline at end of file
+    exibicao = pd.DataFrame(recentes, columns=['Data', 'Mandante', 'GM', 'GV', 'Visitante'])
+    return resumo, exibicao
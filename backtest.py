@@ -0,0 +1,261 @@
+"""
+Backtest walk-forward dos modelos de previsão. Roda offline, sem Flet.
+
+Uso:
+    python backtest.py --temporadas-teste 5 --bloco temporada
+    python backtest.py --sintetico 10 --bloco rodada --workers 4 --saida backtest.json
+    python backtest.py --motor placar
+
+A cada bloco (temporada ou rodada) o modelo é treinado só com os jogos anteriores ao início
+do bloco e prevê os jogos do bloco. As features e a matriz de treino são montadas uma única
+vez (elas só dependem de jogos passados) e fatiadas por fold; cada temporada de teste roda num
+processo, com os folds de rodada em sequência e warm start entre eles. Relata log-loss, Brier
+e curvas de calibração de cada mercado, por temporada e no total, ao lado de uma referência
+que sempre prevê as frequências do treino.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import OneHotEncoder
+
+from feature_engineering import preparar_dados_para_modelo
+from model_trainer import ajustar_modelos, ALVOS, COLS_BASE
+from scoreline_model import treinar_modelo_placar, prever_placar_lote
+
+MERCADOS = ['Casa', 'Empate', 'Visitante', 'Over25', 'BTTS']
+CLASSES_RESULTADO = ['Casa', 'Empate', 'Visitante']
+
+
+def montar_folds(df_treino, bloco='temporada', temporadas_teste=5):
+    """
+    Folds walk-forward agrupados por temporada de teste: {ano: [(idx_treino, idx_teste), ...]}.
+    Com bloco='temporada' há um fold por temporada; com 'rodada', um por rodada. O treino de
+    cada fold são os jogos com data anterior ao primeiro jogo do bloco.
+    """
+    datas = df_treino['Date']
+    anos = datas.dt.year.to_numpy()
+    rodadas = pd.to_numeric(df_treino['Rodada'], errors='coerce').to_numpy()
+    folds = {}
+    for ano in sorted(np.unique(anos))[-temporadas_teste:]:
+        mascaras = [anos == ano] if bloco == 'temporada' else [
+            (anos == ano) & (rodadas == r) for r in np.unique(rodadas[anos == ano]) if not np.isnan(r)
+        ]
+        for mascara in mascaras:
+            idx_teste = np.flatnonzero(mascara)
+            idx_treino = np.flatnonzero(datas < datas.iloc[idx_teste].min())
+            if len(idx_treino) and len(idx_teste):
+                folds.setdefault(int(ano), []).append((idx_treino, idx_teste))
+    return folds
+
+
+def _matriz_features(df_treino):
+    """
+    Matriz (CSR) de todos os jogos de uma vez, no mesmo layout do treinar_modelo.
+
+    O encoder vê todos os jogos, inclusive os de folds futuros, sem vazar informação: a coluna
+    de um time que só aparece depois do treino é toda zero nas linhas de treino, então o
+    coeficiente dela fica exatamente em zero (a penalidade L2 não tem o que compensar) e, no
+    teste, o time conta como desconhecido, igual ao handle_unknown='ignore' de um encoder
+    ajustado só no treino do fold. Colunas fixas entre folds permitem o warm start.
+    """
+    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=True)
+    X_times = df_treino[['HomeTeam', 'AwayTeam']]
+    cols = [c for c in COLS_BASE if c in df_treino.columns]
+    return sparse.hstack([
+        encoder.fit_transform(X_times),
+        sparse.csr_matrix(df_treino[cols].to_numpy(dtype=float))
+    ], format='csr')
+
+
+def _probabilidades(modelos, X):
+    """Matriz (jogos x MERCADOS) com as probabilidades dos três classificadores."""
+    probs = np.zeros((X.shape[0], len(MERCADOS)))
+    classes = list(modelos['resultado'].classes_)
+    p_res = modelos['resultado'].predict_proba(X)
+    for j, classe in enumerate(CLASSES_RESULTADO):
+        if classe in classes:
+            probs[:, j] = p_res[:, classes.index(classe)]
+    probs[:, 3] = modelos['over25'].predict_proba(X)[:, 1]
+    probs[:, 4] = modelos['btts'].predict_proba(X)[:, 1]
+    return probs
+
+
+def _referencia(ocorridos_treino):
+    """Previsão constante: a frequência de cada mercado nos jogos de treino."""
+    return ocorridos_treino.mean(axis=0)
+
+
+def _rodar_temporada(args):
+    """
+    Executa os folds de uma temporada em sequência (usado pelos processos do pool). Devolve
+    (índices de teste, probabilidades do modelo, probabilidades de referência).
+    """
+    motor, folds, X, alvos, ocorridos, df_jogos = args
+    indices, previstas, referencias = [], [], []
+    anteriores = None
+    for idx_treino, idx_teste in folds:
+        if motor == 'placar':
+            modelo = treinar_modelo_placar(df_jogos.iloc[idx_treino])
+            probs = prever_placar_lote(modelo, df_jogos.iloc[idx_teste])[MERCADOS].to_numpy()
+        else:
+            # Warm start a partir do fold anterior: mesma matriz, mesmas colunas
+            anteriores = ajustar_modelos(
+                X[idx_treino], {k: y[idx_treino] for k, y in alvos.items()}, anteriores, n_workers=1
+            )
+            probs = _probabilidades(anteriores, X[idx_teste])
+        indices.append(idx_teste)
+        previstas.append(probs)
+        referencias.append(np.tile(_referencia(ocorridos[idx_treino]), (len(idx_teste), 1)))
+    return np.concatenate(indices), np.vstack(previstas), np.vstack(referencias)
+
+
+def log_loss(probs, ocorridos):
+    """Log-loss médio. `probs`/`ocorridos` são (jogos x classes), ou vetores para mercados binários."""
+    probs = np.clip(probs, 1e-15, 1 - 1e-15)
+    if probs.ndim == 1:
+        return float(-np.mean(ocorridos * np.log(probs) + (1 - ocorridos) * np.log(1 - probs)))
+    probs = probs / probs.sum(axis=1, keepdims=True)
+    return float(-np.mean(np.log(probs[ocorridos.astype(bool)])))
+
+
+def brier(probs, ocorridos):
+    """Brier score: erro quadrático médio (somado entre as classes no caso multiclasse)."""
+    erro = (probs - ocorridos) ** 2
+    return float(np.mean(erro if erro.ndim == 1 else erro.sum(axis=1)))
+
+
+def curva_calibracao(probs, ocorridos, n_faixas=10):
+    """Por faixa de probabilidade prevista: média prevista, frequência observada e número de jogos."""
+    faixa = np.minimum((probs * n_faixas).astype(int), n_faixas - 1)
+    curva = []
+    for f in range(n_faixas):
+        mascara = faixa == f
+        if mascara.any():
+            curva.append({
+                'faixa': f"{f / n_faixas:.1f}-{(f + 1) / n_faixas:.1f}",
+                'prevista': round(float(probs[mascara].mean()), 4),
+                'observada': round(float(ocorridos[mascara].mean()), 4),
+                'jogos': int(mascara.sum()),
+            })
+    return curva
+
+
+def _metricas(probs, ref, ocorridos):
+    """Log-loss e Brier por mercado (1X2 avaliado como um mercado de três classes)."""
+    linhas = []
+    for mercado, cols in [('1X2', slice(0, 3)), ('Over25', 3), ('BTTS', 4)]:
+        linhas.append({
+            'mercado': mercado,
+            'jogos': len(probs),
+            'log_loss': round(log_loss(probs[:, cols], ocorridos[:, cols]), 5),
+            'brier': round(brier(probs[:, cols], ocorridos[:, cols]), 5),
+            'log_loss_referencia': round(log_loss(ref[:, cols], ocorridos[:, cols]), 5),
+            'brier_referencia': round(brier(ref[:, cols], ocorridos[:, cols]), 5),
+        })
+    return linhas
+
+
+def executar_backtest(df_resultados, bloco='temporada', temporadas_teste=5, motor='classificadores', n_workers=1):
+    """
+    Backtest walk-forward completo sobre os jogos com resultado. Retorna um dict com as métricas
+    por temporada e no total, as curvas de calibração de cada mercado e as previsões de cada jogo.
+    """
+    df_treino, _ = preparar_dados_para_modelo(df_resultados.copy())
+    folds = montar_folds(df_treino, bloco, temporadas_teste)
+    X = _matriz_features(df_treino) if motor == 'classificadores' else None
+    alvos = {key: df_treino[col].to_numpy() for col, key in ALVOS}
+    ocorridos = np.column_stack([
+        (df_treino['Resultado'] == c).to_numpy() for c in CLASSES_RESULTADO
+    ] + [df_treino['Target_Over25'].to_numpy() == 1, df_treino['Target_BTTS'].to_numpy() == 1]).astype(float)
+    df_jogos = df_treino[['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']]
+
+    tarefas = [(motor, f, X, alvos, ocorridos, df_jogos) for f in folds.values()]
+    if n_workers > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tarefas))) as pool:
+            parciais = list(pool.map(_rodar_temporada, tarefas))
+    else:
+        parciais = [_rodar_temporada(t) for t in tarefas]
+
+    metricas = []
+    for ano, (idx, probs, ref) in zip(folds, parciais):
+        metricas += [dict(temporada=ano, **m) for m in _metricas(probs, ref, ocorridos[idx])]
+    idx = np.concatenate([p[0] for p in parciais])
+    probs = np.vstack([p[1] for p in parciais])
+    ref = np.vstack([p[2] for p in parciais])
+    metricas += [dict(temporada='total', **m) for m in _metricas(probs, ref, ocorridos[idx])]
+
+    previsoes = df_treino.iloc[idx][['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']].reset_index(drop=True)
+    previsoes[MERCADOS] = probs
+    return {
+        'metricas': metricas,
+        'calibracao': {m: curva_calibracao(probs[:, j], ocorridos[idx, j]) for j, m in enumerate(MERCADOS)},
+        'folds': sum(len(f) for f in folds.values()),
+        'previsoes': previsoes,
+    }
+
+
+def _carregar_dados(args):
+    """Jogos com resultado: liga sintética (--sintetico N) ou o cache local de temporadas."""
+    if args.sintetico:
+        from liga_sintetica import gerar_liga
+        df = gerar_liga(args.sintetico, seed=args.seed)
+        df['Date'] = pd.to_datetime(df['Date'], utc=True).dt.tz_convert('America/Sao_Paulo')
+    else:
+        from pipeline import carregar_partidas, CACHE_FILE
+        ano_atual = args.ano or datetime.now().year
+        anos = list(range(ano_atual - args.temporadas + 1, ano_atual + 1))
+        df = carregar_partidas(None, anos, ano_atual, args.cache_dir, csv_legado=CACHE_FILE)
+        if df is None:
+            return None
+    return df[df['FTHG'].notna()]
+
+
+if __name__ == "__main__":
+    from pipeline import CACHE_DIR
+
+    parser = argparse.ArgumentParser(description="AtletiQ: backtest walk-forward dos modelos")
+    parser.add_argument('--bloco', choices=('temporada', 'rodada'), default='temporada',
+                        help="Retreina a cada temporada (padrão) ou a cada rodada")
+    parser.add_argument('--temporadas-teste', type=int, default=5, help="Temporadas avaliadas (as mais recentes)")
+    parser.add_argument('--motor', choices=('classificadores', 'placar'), default='classificadores')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processos (um por temporada)")
+    parser.add_argument('--sintetico', type=int, metavar="TEMPORADAS", help="Usa uma liga sintética em vez do cache")
+    parser.add_argument('--seed', type=int, default=0, help="Semente da liga sintética")
+    parser.add_argument('--ano', type=int, help="Temporada mais recente do cache (padrão: ano corrente)")
+    parser.add_argument('--temporadas', type=int, default=6, help="Temporadas lidas do cache (treino + teste)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--saida', help="Arquivo JSON com métricas e curvas de calibração")
+    parser.add_argument('--previsoes', help="CSV com a previsão de cada jogo testado")
+    args = parser.parse_args()
+
+    df_resultados = _carregar_dados(args)
+    if df_resultados is None or df_resultados.empty:
+        print("Erro: sem jogos com resultado (use --sintetico ou sincronize o cache).")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    resultado = executar_backtest(df_resultados, args.bloco, args.temporadas_teste, args.motor, args.workers)
+    segundos = time.perf_counter() - inicio
+
+    for m in resultado['metricas']:
+        print(f"{str(m['temporada']):>7}  {m['mercado']:<7} {m['jogos']:>5} jogos  "
+              f"log-loss {m['log_loss']:.4f} (ref. {m['log_loss_referencia']:.4f})  "
+              f"Brier {m['brier']:.4f} (ref. {m['brier_referencia']:.4f})")
+    for mercado, curva in resultado['calibracao'].items():
+        pontos = "  ".join(f"{c['prevista']:.2f}->{c['observada']:.2f}" for c in curva)
+        print(f"Calibração {mercado:<9} {pontos}")
+    print(f"{resultado['folds']} fold(s) em {segundos:.2f}s")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in resultado.items() if k != 'previsoes'}, f, indent=2)
+    if args.previsoes:
+        resultado['previsoes'].to_csv(args.previsoes, index=False)
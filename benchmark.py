@@ -0,0 +1,421 @@
+"""
+Benchmarks de desempenho do AtletiQ. Rodam offline, sem Flet e sem API_KEY.
+
+Uso:
+    python benchmark.py simulacao --simulacoes 200000 --workers 1 2 4 8
+    python benchmark.py pipeline --temporadas 5 20 50 --saida bench.json --baseline bench_base.json
+    python benchmark.py onehot --tamanhos 20x50 60x5 120x2
+    python benchmark.py retreino --temporadas 5 20 --workers 1 3
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+
+from analysis import construir_indice_h2h, gerar_confronto_direto
+from feature_engineering import preparar_dados_para_modelo, gerar_dados_evolucao
+from liga_sintetica import gerar_liga
+from model_trainer import treinar_modelo, COLS_BASE
+from predictor import (
+    simular_monte_carlo_paralelo, prever_jogo_especifico, simular_campeonato, simular_campeonato_monte_carlo,
+    prever_lote, preparar_features_lote, montar_matriz_lote, PlanoInferencia
+)
+
+# Consultas repetidas nas etapas de interação (Match Center)
+N_CONSULTAS = 50
+
+
+def _probabilidades_aleatorias(n_times, n_jogos, rng):
+    """Jogos restantes sintéticos (mandante != visitante) com probabilidades Casa/Empate/Visitante."""
+    idx_casa = rng.integers(0, n_times, n_jogos)
+    idx_vis = (idx_casa + rng.integers(1, n_times, n_jogos)) % n_times
+    probs = rng.dirichlet([4, 2.5, 3], n_jogos)
+    return probs, idx_casa, idx_vis
+
+
+def benchmark_simulacao(n_simulacoes=200000, workers=(1, 2, 4, 8), n_times=20, n_jogos=190, seed=0):
+    """
+    Mede o Monte Carlo de temporadas com diferentes números de processos e confere que
+    o histograma de posições é idêntico em todos eles (mesma semente mestre).
+    """
+    rng = np.random.default_rng(seed)
+    probs, idx_casa, idx_vis = _probabilidades_aleatorias(n_times, n_jogos, rng)
+    pontos = rng.integers(20, 40, n_times).astype(float)
+    vitorias = np.floor(pontos / 3)
+    saldo = rng.integers(-10, 10, n_times).astype(float)
+
+    resultados, referencia = [], None
+    for n_workers in workers:
+        inicio = time.perf_counter()
+        _, histograma = simular_monte_carlo_paralelo(
+            probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, seed=seed, n_workers=n_workers
+        )
+        segundos = time.perf_counter() - inicio
+
+        if referencia is None:
+            referencia = (segundos, histograma)
+        resultados.append({
+            'workers': n_workers,
+            'segundos': round(segundos, 4),
+            'speedup': round(referencia[0] / segundos, 2),
+            'eficiencia': round(referencia[0] / segundos / n_workers, 2),
+            'identico': bool(np.array_equal(histograma, referencia[1])),
+        })
+    return resultados
+
+
+def _etapas_pipeline(df_total):
+    """
+    Etapas do app na ordem em que rodam, como (nome, chamadas, função sem argumentos).
+    Cada função guarda o que produz em `estado` para as etapas seguintes.
+    """
+    ano_atual = df_total['Date'].dt.year.max()
+    df_res = df_total[df_total['FTHG'].notna()]
+    df_temporada = df_total[df_total['Date'].dt.year == ano_atual]
+    df_res_at = df_temporada[df_temporada['FTHG'].notna()]
+    df_fut_at = df_temporada[df_temporada['FTHG'].isna()]
+    rng = np.random.default_rng(0)
+    times = sorted(set(df_temporada['HomeTeam']))
+    pares = [tuple(rng.choice(times, 2, replace=False)) for _ in range(N_CONSULTAS)]
+    estado = {}
+
+    def preparar():
+        estado['df_treino'], estado['time_stats'] = preparar_dados_para_modelo(df_res.copy())
+
+    def treinar():
+        estado['modelos'], estado['encoder'], estado['cols'] = treinar_modelo(estado['df_treino'])
+
+    def compilar():
+        estado['plano'] = PlanoInferencia(estado['modelos'], estado['encoder'], estado['time_stats'], estado['cols'])
+
+    def prever():
+        for casa, fora in pares:
+            prever_jogo_especifico(casa, fora, estado['modelos'], estado['encoder'], estado['time_stats'], estado['cols'])
+
+    def prever_plano():
+        for casa, fora in pares:
+            estado['plano'].prever(casa, fora)
+
+    def simular():
+        simular_campeonato(38, df_fut_at, df_res_at, estado['modelos'], estado['encoder'], estado['time_stats'], estado['cols'])
+
+    def simular_mc():
+        simular_campeonato_monte_carlo(38, df_fut_at, df_res_at, estado['modelos'], estado['encoder'],
+                                       estado['time_stats'], estado['cols'], seed=0)
+
+    def indexar_h2h():
+        estado['indice_h2h'] = construir_indice_h2h(df_total)
+
+    def confronto():
+        for a, b in pares:
+            gerar_confronto_direto(df_total, a, b, indice=estado['indice_h2h'])
+
+    def evolucao():
+        gerar_dados_evolucao(df_temporada)
+
+    return [
+        ('preparar_dados_para_modelo', 1, preparar),
+        ('treinar_modelo', 1, treinar),
+        ('prever_jogo_especifico', N_CONSULTAS, prever),
+        ('compilar_plano_inferencia', 1, compilar),
+        ('plano_inferencia_prever', N_CONSULTAS, prever_plano),
+        ('simular_campeonato', 1, simular),
+        ('simular_campeonato_monte_carlo', 1, simular_mc),
+        ('construir_indice_h2h', 1, indexar_h2h),
+        ('gerar_confronto_direto', N_CONSULTAS, confronto),
+        ('gerar_dados_evolucao', 1, evolucao),
+    ]
+
+
+def _liga_para_df_total(df_api):
+    """Mesmo tratamento que o app aplica aos dados da API (datas no horário de Brasília)."""
+    df_total = df_api.copy()
+    df_total['Date'] = pd.to_datetime(df_total['Date'], utc=True).dt.tz_convert('America/Sao_Paulo')
+    return df_total
+
+
+def benchmark_pipeline(tamanhos=(5, 20, 50), n_times=20, seed=0):
+    """
+    Mede cada etapa do pipeline em ligas sintéticas de vários tamanhos (número de temporadas).
+    O tempo vem de uma execução sem tracemalloc; o pico de memória, de uma segunda execução com ele.
+    """
+    resultados = []
+    for n_temporadas in tamanhos:
+        df_total = _liga_para_df_total(
+            gerar_liga(n_temporadas, n_times, seed=seed, rodadas_pendentes=10)
+        )
+
+        tempos = {}
+        for nome, _, funcao in _etapas_pipeline(df_total):
+            inicio = time.perf_counter()
+            funcao()
+            tempos[nome] = time.perf_counter() - inicio
+
+        picos = {}
+        tracemalloc.start()
+        for nome, _, funcao in _etapas_pipeline(df_total):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            funcao()
+            picos[nome] = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+
+        for nome, chamadas, _ in _etapas_pipeline(df_total):
+            resultados.append({
+                'temporadas': n_temporadas,
+                'jogos': len(df_total),
+                'etapa': nome,
+                'chamadas': chamadas,
+                'segundos': round(tempos[nome], 5),
+                'pico_memoria_mb': round(picos[nome] / 2 ** 20, 2),
+            })
+    return resultados
+
+
+def _bytes_matriz(X):
+    """Memória ocupada pelos valores de uma matriz densa (DataFrame/ndarray) ou esparsa (CSR)."""
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False).sum())
+    return X.nbytes
+
+
+def _prever_denso(df_jogos, modelos, encoder, time_stats, colunas_modelo):
+    """Caminho antigo de previsão: matriz densa e predict_proba de cada modelo."""
+    X = preparar_features_lote(df_jogos, encoder, time_stats, colunas_modelo).to_numpy(dtype=float)
+    probs = [modelos['resultado'].predict_proba(X)]
+    probs += [modelos[k].predict_proba(X)[:, [1]] for k in ('over25', 'btts')]
+    return np.hstack(probs)
+
+
+def benchmark_onehot(tamanhos=((20, 50), (60, 5), (120, 2)), n_previsoes=1000, seed=0):
+    """
+    Compara o one-hot denso (caminho antigo) com o esparso em ligas de (times, temporadas):
+    memória da matriz de treino e de previsão, pico de memória e tempo do treino, latência
+    da previsão em lote e a maior diferença entre as probabilidades dos dois caminhos.
+    """
+    resultados = []
+    for n_times, n_temporadas in tamanhos:
+        df_total = _liga_para_df_total(gerar_liga(n_temporadas, n_times, seed=seed))
+        df_treino, time_stats = preparar_dados_para_modelo(df_total.copy())
+        rng = np.random.default_rng(seed)
+        casa = rng.integers(0, n_times, n_previsoes)
+        nomes = np.array(sorted(set(df_total['HomeTeam'])), dtype=object)
+        df_jogos = pd.DataFrame({
+            'HomeTeam': nomes[casa],
+            'AwayTeam': nomes[(casa + rng.integers(1, n_times, n_previsoes)) % n_times],
+        })
+
+        saidas = {}
+        for modo, esparso in [('denso', False), ('esparso', True)]:
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            modelos, encoder, colunas = treinar_modelo(df_treino, esparso=esparso)
+            segundos_treino = time.perf_counter() - inicio
+            pico_treino = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            if esparso:
+                montar = lambda: montar_matriz_lote(df_jogos, encoder, time_stats, colunas)
+                prever = lambda: prever_lote(df_jogos, modelos, encoder, time_stats, colunas)[
+                    ['Casa', 'Empate', 'Visitante', 'Over25', 'BTTS']].to_numpy()
+            else:
+                montar = lambda: preparar_features_lote(df_jogos, encoder, time_stats, colunas)
+                prever = lambda: _prever_denso(df_jogos, modelos, encoder, time_stats, colunas)
+
+            prever()  # aquecimento
+            inicio = time.perf_counter()
+            saidas[modo] = prever()
+            segundos_previsao = time.perf_counter() - inicio
+
+            # Matriz de treino com o mesmo layout do treinar_modelo: bytes por linha x linhas
+            X_prev = montar()
+            bytes_por_linha = _bytes_matriz(X_prev) / len(df_jogos)
+            resultados.append({
+                'times': n_times,
+                'temporadas': n_temporadas,
+                'jogos_treino': len(df_treino),
+                'colunas': len(colunas),
+                'modo': modo,
+                'matriz_treino_mb': round(bytes_por_linha * len(df_treino) / 2 ** 20, 2),
+                'treino_segundos': round(segundos_treino, 3),
+                'treino_pico_mb': round(pico_treino / 2 ** 20, 2),
+                'previsao_ms': round(segundos_previsao * 1000, 2),
+                'jogos_previstos': n_previsoes,
+            })
+
+        diferenca = float(np.abs(saidas['denso'] - saidas['esparso']).max())
+        for r in resultados[-2:]:
+            r['max_diferenca_probabilidade'] = diferenca
+    return resultados
+
+
+def _iteracoes(modelos):
+    return {key: int(np.max(m.n_iter_)) for key, m in modelos.items()}
+
+
+def benchmark_retreino(tamanhos=(5, 20), n_times=20, workers=(1, 3), repeticoes=3, seed=0):
+    """
+    Custo de retreinar depois de uma rodada: treino completo (do zero) x incremental (warm start
+    a partir dos modelos de antes da rodada), com diferentes números de workers. Informa também
+    as iterações do solver e a maior diferença de probabilidade entre os dois modelos.
+    """
+    resultados = []
+    for n_temporadas in tamanhos:
+        df_total = _liga_para_df_total(gerar_liga(n_temporadas, n_times, seed=seed))
+        df_treino, _ = preparar_dados_para_modelo(df_total.copy())
+        # Última rodada de fora do treino anterior (df_treino está em ordem de data)
+        df_antes = df_treino.iloc[:-(n_times // 2)]
+        anteriores = treinar_modelo(df_antes)
+        X = sparse.hstack([
+            anteriores[1].transform(df_treino[['HomeTeam', 'AwayTeam']]),
+            sparse.csr_matrix(df_treino[COLS_BASE].to_numpy(dtype=float))
+        ], format='csr')
+
+        for n_workers in workers:
+            tempos = {}
+            for modo, base in [('completo', None), ('incremental', anteriores)]:
+                melhores = []
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    modelos, _, _ = treinar_modelo(df_treino, anteriores=base, n_workers=n_workers)
+                    melhores.append(time.perf_counter() - inicio)
+                tempos[modo] = (min(melhores), modelos)
+
+            # Mesmas colunas nos dois modelos: compara as probabilidades nos próprios jogos de treino
+            diferenca = max(
+                float(np.abs(tempos['completo'][1][key].predict_proba(X) - m.predict_proba(X)).max())
+                for key, m in tempos['incremental'][1].items()
+            )
+            resultados.append({
+                'temporadas': n_temporadas,
+                'jogos': len(df_treino),
+                'workers': n_workers,
+                'completo_segundos': round(tempos['completo'][0], 4),
+                'incremental_segundos': round(tempos['incremental'][0], 4),
+                'speedup': round(tempos['completo'][0] / tempos['incremental'][0], 2),
+                'iteracoes_completo': _iteracoes(tempos['completo'][1]),
+                'iteracoes_incremental': _iteracoes(tempos['incremental'][1]),
+                'max_diferenca_probabilidade': diferenca,
+            })
+    return resultados
+
+
+def comparar_com_baseline(resultados, baseline, tolerancia=0.25, minimo_segundos=0.005):
+    """
+    Compara os tempos com um resultado anterior (mesmo formato) e devolve as regressões:
+    etapas mais de `tolerancia` mais lentas. Etapas abaixo de `minimo_segundos` são ignoradas (ruído).
+    """
+    base = {(r['temporadas'], r['etapa']): r for r in baseline}
+    regressoes = []
+    for r in resultados:
+        anterior = base.get((r['temporadas'], r['etapa']))
+        if anterior is None or max(r['segundos'], anterior['segundos']) < minimo_segundos:
+            continue
+        razao = r['segundos'] / max(anterior['segundos'], 1e-9)
+        if razao > 1 + tolerancia:
+            regressoes.append(dict(r, segundos_baseline=anterior['segundos'], razao=round(razao, 2)))
+    return regressoes
+
+
+def _metadados():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'cpus': os.cpu_count(),
+        'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do AtletiQ")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_sim = sub.add_parser('simulacao', help="Escalabilidade do Monte Carlo com múltiplos processos")
+    p_sim.add_argument('--simulacoes', type=int, default=200000)
+    p_sim.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    p_sim.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+
+    p_pipe = sub.add_parser('pipeline', help="Tempo e pico de memória de cada etapa em ligas sintéticas")
+    p_pipe.add_argument('--temporadas', type=int, nargs='+', default=[5, 20, 50])
+    p_pipe.add_argument('--times', type=int, default=20)
+    p_pipe.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    p_pipe.add_argument('--baseline', help="JSON de uma execução anterior para detectar regressões")
+    p_pipe.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Aumento relativo de tempo aceito antes de acusar regressão (padrão 0.25)")
+
+    p_onehot = sub.add_parser('onehot', help="One-hot denso x esparso: memória, treino e latência de previsão")
+    p_onehot.add_argument('--tamanhos', nargs='+', default=['20x50', '60x5', '120x2'],
+                          help="Ligas como TIMESxTEMPORADAS (padrão 20x50 60x5 120x2)")
+    p_onehot.add_argument('--previsoes', type=int, default=1000, help="Jogos por lote de previsão")
+    p_onehot.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+
+    p_retreino = sub.add_parser('retreino', help="Retreino após uma rodada: completo x incremental (warm start)")
+    p_retreino.add_argument('--temporadas', type=int, nargs='+', default=[5, 20])
+    p_retreino.add_argument('--times', type=int, default=20)
+    p_retreino.add_argument('--workers', type=int, nargs='+', default=[1, 3])
+    p_retreino.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+
+    args = parser.parse_args()
+    regressoes = []
+
+    if args.comando == 'simulacao':
+        print(f"CPUs disponíveis: {os.cpu_count()}")
+        resultados = benchmark_simulacao(args.simulacoes, args.workers)
+        for r in resultados:
+            print(f"{r['workers']:>2} workers: {r['segundos']:.3f}s  speedup {r['speedup']:.2f}x  "
+                  f"eficiência {r['eficiencia']:.0%}  idêntico={r['identico']}")
+
+    if args.comando == 'pipeline':
+        resultados = benchmark_pipeline(args.temporadas, args.times)
+        for r in resultados:
+            print(f"{r['temporadas']:>3} temporadas  {r['etapa']:<32} {r['segundos']:>9.4f}s  "
+                  f"({r['chamadas']} chamada(s))  pico {r['pico_memoria_mb']:>8.2f} MB")
+
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressoes = comparar_com_baseline(resultados, baseline.get('resultados', baseline), args.tolerancia)
+            for r in regressoes:
+                print(f"REGRESSÃO: {r['etapa']} ({r['temporadas']} temporadas) "
+                      f"{r['segundos_baseline']:.4f}s -> {r['segundos']:.4f}s ({r['razao']:.2f}x)")
+            if not regressoes:
+                print("Nenhuma regressão em relação ao baseline.")
+        resultados = {'meta': _metadados(), 'resultados': resultados}
+
+    if args.comando == 'onehot':
+        tamanhos = [tuple(int(x) for x in t.lower().split('x')) for t in args.tamanhos]
+        resultados = benchmark_onehot(tamanhos, args.previsoes)
+        for r in resultados:
+            print(f"{r['times']:>3} times x {r['temporadas']:>2} temporadas ({r['jogos_treino']:>6} jogos, "
+                  f"{r['colunas']} colunas)  {r['modo']:<8} matriz {r['matriz_treino_mb']:>8.2f} MB  "
+                  f"treino {r['treino_segundos']:>7.3f}s (pico {r['treino_pico_mb']:>8.2f} MB)  "
+                  f"previsão {r['previsao_ms']:>8.2f} ms  dif. máx {r['max_diferenca_probabilidade']:.1e}")
+        resultados = {'meta': _metadados(), 'resultados': resultados}
+
+    if args.comando == 'retreino':
+        print(f"CPUs disponíveis: {os.cpu_count()}")
+        resultados = benchmark_retreino(args.temporadas, args.times, args.workers)
+        for r in resultados:
+            print(f"{r['temporadas']:>3} temporadas ({r['jogos']:>6} jogos)  {r['workers']} worker(s)  "
+                  f"completo {r['completo_segundos']:.3f}s  incremental {r['incremental_segundos']:.3f}s  "
+                  f"({r['speedup']:.1f}x)  iterações {r['iteracoes_completo']} -> {r['iteracoes_incremental']}  "
+                  f"dif. máx {r['max_diferenca_probabilidade']:.1e}")
+        resultados = {'meta': _metadados(), 'resultados': resultados}
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+
+    sys.exit(1 if regressoes else 0)
@@ -0,0 +1,129 @@
+"""
+Teste de carga do serviço local de previsões (server.py).
+
+Uso:
+    python carga_servidor.py --iniciar --requisicoes 5000 --concorrencia 32
+    python carga_servidor.py --url http://127.0.0.1:8765 --pares 40 --saida carga.json
+
+Dispara GET /prever concorrentes, com pares de times sorteados numa distribuição
+concentrada (poucos pares "quentes", como na prática), e mede vazão e latências.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(porta, janela_ms=5.0):
+    """Sobe um server.py local em outro processo e espera ele responder /saude."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    processo = subprocess.Popen([sys.executable, script, '--porta', str(porta), '--janela-ms', str(janela_ms)])
+    url = f"http://127.0.0.1:{porta}"
+    limite = time.time() + 120
+    while time.time() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("O servidor terminou antes de ficar pronto.")
+        try:
+            requests.get(f"{url}/saude", timeout=1).raise_for_status()
+            return processo, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("O servidor não respondeu a tempo.")
+
+
+def rodar_carga(url, n_requisicoes=2000, concorrencia=16, n_pares=50, seed=0):
+    """Executa a carga e devolve vazão, percentis de latência, erros e o que o servidor reportou."""
+    times = requests.get(f"{url}/times", timeout=10).json()
+    rng = np.random.default_rng(seed)
+    pares = []
+    while len(pares) < n_pares:
+        casa, fora = rng.choice(times, 2, replace=False)
+        pares.append((str(casa), str(fora)))
+    # Distribuição de Zipf sobre os pares: alguns muito consultados, a maioria raramente
+    pesos = 1 / np.arange(1, n_pares + 1)
+    sorteio = rng.choice(n_pares, n_requisicoes, p=pesos / pesos.sum())
+
+    saude_antes = requests.get(f"{url}/saude", timeout=10).json()
+    local = threading.local()
+    latencias = np.zeros(n_requisicoes)
+    erros = []
+
+    def requisitar(i):
+        sessao = getattr(local, 'sessao', None)
+        if sessao is None:
+            sessao = local.sessao = requests.Session()
+        casa, fora = pares[sorteio[i]]
+        inicio = time.perf_counter()
+        try:
+            resposta = sessao.get(f"{url}/prever", params={'casa': casa, 'fora': fora}, timeout=30)
+            if resposta.status_code != 200:
+                erros.append(resposta.status_code)
+        except requests.RequestException as e:
+            erros.append(type(e).__name__)
+        latencias[i] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        list(pool.map(requisitar, range(n_requisicoes)))
+    duracao = time.perf_counter() - inicio
+    saude_depois = requests.get(f"{url}/saude", timeout=10).json()
+
+    cache_antes, cache_depois = saude_antes['cache_previsoes'], saude_depois['cache_previsoes']
+    lotes = saude_depois['lotes'] - saude_antes['lotes']
+    itens = saude_depois['previsoes_em_lote'] - saude_antes['previsoes_em_lote']
+    return {
+        'requisicoes': n_requisicoes,
+        'concorrencia': concorrencia,
+        'pares_distintos': n_pares,
+        'segundos': round(duracao, 3),
+        'requisicoes_por_segundo': round(n_requisicoes / duracao, 1),
+        'latencia_ms': {
+            f'p{p}': round(float(np.percentile(latencias, p)) * 1000, 2) for p in (50, 95, 99)
+        },
+        'erros': len(erros),
+        'acertos_cache': cache_depois['acertos'] - cache_antes['acertos'],
+        'lotes_modelo': lotes,
+        'media_itens_por_lote': round(itens / lotes, 2) if lotes else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do server.py")
+    parser.add_argument('--url', default="http://127.0.0.1:8765")
+    parser.add_argument('--iniciar', action='store_true', help="Sobe um server.py local numa porta livre")
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--pares', type=int, default=50, help="Pares de times distintos consultados")
+    parser.add_argument('--janela-ms', type=float, default=5.0, help="Janela de agrupamento (com --iniciar)")
+    parser.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    processo, url = None, args.url
+    if args.iniciar:
+        processo, url = iniciar_servidor(_porta_livre(), args.janela_ms)
+    try:
+        resultado = rodar_carga(url, args.requisicoes, args.concorrencia, args.pares)
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    print(json.dumps(resultado, indent=2))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2)
@@ -0,0 +1,139 @@
+"""
+Previsões em lote sem a interface gráfica (não importa o Flet). Pensado para rodar via cron.
+
+Uso:
+    python cli.py --sincronizar --formato parquet --saida previsoes/
+    python cli.py --rodada 12 --formato json
+    python cli.py --motor placar --linhas-gols 1.5 2.5 3.5
+
+Gera `previsoes.<formato>` (probabilidades de cada jogo ainda não disputado da temporada atual)
+e `tabela_simulada.<formato>` (Monte Carlo da tabela final). Com `--motor placar`, tudo sai do
+modelo de placares Poisson/Dixon-Coles (scoreline_model): um só ajuste, Over/Under em várias
+linhas e a simulação sorteando placares (com GP/GC/SG).
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import tracing
+from pipeline import carregar_partidas, preparar_recursos, CACHE_DIR, CACHE_FILE, ESTADO_FILE, MODELO_FILE
+from predictor import prever_lote, simular_campeonato_monte_carlo
+from scoreline_model import treinar_modelo_placar, prever_placar_lote, simular_campeonato_placar
+
+FORMATOS = ('csv', 'json', 'parquet')
+MOTORES = ('classificadores', 'placar')
+
+
+def salvar_tabela(df, caminho, formato):
+    """Grava o DataFrame no formato pedido (csv, json em registros ou parquet)."""
+    if formato == 'csv':
+        df.to_csv(caminho, index=False)
+    elif formato == 'json':
+        df.to_json(caminho, orient='records', date_format='iso', force_ascii=False, indent=2)
+    elif formato == 'parquet':
+        df.to_parquet(caminho, index=False)
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+
+def prever_proximos_jogos(df_total, ano_atual, recursos, rodada=None, linhas_gols=(2.5,)):
+    """
+    Probabilidades de todos os jogos ainda sem resultado da temporada (ou só de uma rodada).
+    Com `recursos['placar']` (motor de placares) as probabilidades saem da grade de placares.
+    """
+    df_fut = df_total[(df_total['Date'].dt.year == ano_atual) & df_total['FTHG'].isna()]
+    if rodada is not None:
+        df_fut = df_fut[pd.to_numeric(df_fut['Rodada'], errors='coerce') == rodada]
+    df_fut = df_fut.reset_index(drop=True)
+
+    if 'placar' in recursos:
+        previsoes = prever_placar_lote(recursos['placar'], df_fut, linhas_gols)
+    else:
+        previsoes = prever_lote(
+            df_fut, recursos['modelos'], recursos['encoder'], recursos['time_stats'], recursos['colunas_modelo']
+        )
+    colunas_jogo = [c for c in ['id', 'Rodada', 'Date'] if c in df_fut.columns]
+    return pd.concat([df_fut[colunas_jogo], previsoes], axis=1)
+
+
+def executar(args):
+    inicio = time.perf_counter()
+    ano_atual = args.ano or datetime.now().year
+    anos = list(range(ano_atual - args.temporadas + 1, ano_atual + 1))
+
+    scraper = None
+    if args.sincronizar:
+        # Importado só quando necessário: sem sincronização não há nada de rede no caminho
+        from web_scraper import AtletiQScraper
+        scraper = AtletiQScraper()
+
+    df_total = carregar_partidas(scraper, anos, ano_atual, args.cache_dir, csv_legado=CACHE_FILE)
+    if df_total is None:
+        print("Erro: sem dados no cache (rode com --sincronizar).")
+        return 1
+
+    if args.motor == 'placar':
+        recursos = {'placar': treinar_modelo_placar(df_total[df_total['FTHG'].notna()])}
+    else:
+        recursos = preparar_recursos(df_total, args.estado, args.modelo, n_workers=args.workers)
+
+    os.makedirs(args.saida, exist_ok=True)
+    previsoes = prever_proximos_jogos(df_total, ano_atual, recursos, args.rodada, args.linhas_gols)
+    caminho_prev = os.path.join(args.saida, f"previsoes.{args.formato}")
+    salvar_tabela(previsoes, caminho_prev, args.formato)
+    print(f"{len(previsoes)} jogo(s) previstos -> {caminho_prev}")
+
+    if args.simulacoes > 0:
+        df_temporada = df_total[df_total['Date'].dt.year == ano_atual]
+        df_fut, df_res = df_temporada[df_temporada['FTHG'].isna()], df_temporada[df_temporada['FTHG'].notna()]
+        if 'placar' in recursos:
+            tabela = simular_campeonato_placar(
+                38, df_fut, df_res, recursos['placar'], n_simulacoes=args.simulacoes, seed=args.seed
+            )
+        else:
+            tabela = simular_campeonato_monte_carlo(
+                38, df_fut, df_res,
+                recursos['modelos'], recursos['encoder'], recursos['time_stats'], recursos['colunas_modelo'],
+                n_simulacoes=args.simulacoes, seed=args.seed, n_workers=args.workers
+            )
+        caminho_tab = os.path.join(args.saida, f"tabela_simulada.{args.formato}")
+        salvar_tabela(tabela, caminho_tab, args.formato)
+        print(f"Tabela simulada ({args.simulacoes} temporadas) -> {caminho_tab}")
+
+    print(f"Concluído em {time.perf_counter() - inicio:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AtletiQ: previsões em lote sem interface gráfica")
+    parser.add_argument('--sincronizar', action='store_true', help="Atualiza o cache pela API antes de prever")
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--motor', choices=MOTORES, default='classificadores',
+                        help="Três classificadores (padrão) ou modelo de placares Poisson/Dixon-Coles")
+    parser.add_argument('--linhas-gols', type=float, nargs='+', default=[2.5],
+                        help="Linhas de Over/Under (só com --motor placar)")
+    parser.add_argument('--saida', default="atletiq_saida", help="Diretório dos arquivos gerados")
+    parser.add_argument('--rodada', type=int, help="Prevê só os jogos desta rodada")
+    parser.add_argument('--ano', type=int, help="Temporada atual (padrão: ano corrente)")
+    parser.add_argument('--temporadas', type=int, default=5, help="Temporadas usadas no treino (padrão 5)")
+    parser.add_argument('--simulacoes', type=int, default=10000, help="Temporadas do Monte Carlo (0 desliga)")
+    parser.add_argument('--seed', type=int, help="Semente do Monte Carlo (resultado reprodutível)")
+    parser.add_argument('--workers', type=int, default=1, help="Processos do Monte Carlo e threads do treino dos modelos")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--estado', default=ESTADO_FILE, help="Snapshot de time_stats")
+    parser.add_argument('--modelo', default=MODELO_FILE, help="Cache de modelos")
+    parser.add_argument('--profile', metavar="TRACE_JSON", help="Grava o trace de tempos (spans) em JSON")
+    args = parser.parse_args()
+
+    if args.profile:
+        tracing.ativar()
+    try:
+        codigo = executar(args)
+    finally:
+        if args.profile:
+            tracing.exportar_json(args.profile)
+    sys.exit(codigo)
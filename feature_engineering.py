@@ -1,74 +1,308 @@
 import pandas as pd
 import numpy as np
+import os
+import pickle
+from bisect import bisect_right
 
-def preparar_dados_para_modelo(df_historico):
+from elo import RatingsElo, ELO_INICIAL, elo_feature
+from tracing import medido, definir
+
+# Versão do formato do snapshot de time_stats (atualizar_dados_para_modelo)
+ESTADO_VERSAO = 3
+
+# Listas guardadas por time em time_stats, em ordem cronológica ('elo' = rating depois do jogo)
+COLUNAS_HISTORICO = ['pontos', 'gm', 'gs', 'seq', 'data', 'mando', 'elo']
+
+def _tabela_longa(df_historico, elo_depois):
     """
-    Cria as variáveis alvo e calcula features de forma, incluindo a sequência de resultados.
+    Reorganiza as partidas em formato longo: uma linha por (jogo, time), na ordem
+    cronológica em que o histórico de cada time é construído (mandante antes do visitante).
+    `elo_depois` tem o rating de mandante e visitante após cada jogo (jogos x 2).
     """
-    if df_historico is None or df_historico.empty:
-        return pd.DataFrame(), {}
+    g_casa = df_historico['FTHG'].to_numpy()
+    g_vis = df_historico['FTAG'].to_numpy()
+    res_casa = np.where(g_casa > g_vis, 'V', np.where(g_casa == g_vis, 'E', 'D'))
+    res_vis = np.where(g_vis > g_casa, 'V', np.where(g_vis == g_casa, 'E', 'D'))
 
-    print("Preparando dados e calculando features avançadas...")
-    df_historico['Date'] = pd.to_datetime(df_historico['Date'])
-    df_historico = df_historico.sort_values(by='Date').reset_index(drop=True)
+    # Intercala mandante/visitante: posições pares = Home, ímpares = Away
+    longa = pd.DataFrame({
+        'time': np.column_stack([df_historico['HomeTeam'].to_numpy(), df_historico['AwayTeam'].to_numpy()]).ravel(),
+        'pontos': np.column_stack([df_historico['HomePoints'].to_numpy(), df_historico['AwayPoints'].to_numpy()]).ravel(),
+        'gm': np.column_stack([g_casa, g_vis]).ravel(),
+        'gs': np.column_stack([g_vis, g_casa]).ravel(),
+        'seq': np.column_stack([res_casa, res_vis]).ravel(),
+        'data': np.repeat(df_historico['Date'].to_numpy(dtype=object), 2),
+        'mando': np.tile(['C', 'F'], len(df_historico)),
+        'elo': elo_depois.ravel(),
+    })
+    return longa
+
+def _sementes(longa, time_stats, janela):
+    """
+    Monta as linhas-semente para continuar o cálculo a partir de um time_stats existente:
+    os últimos `janela` jogos de cada time, mais o que ficou de fora da janela
+    (quantidade de jogos e soma de pontos) como deslocamento.
+    """
+    linhas, base_n, base_pontos = [], {}, {}
+    for time in pd.unique(longa['time']):
+        hist = time_stats.get(time)
+        if not hist or not hist['pontos']:
+            continue
+        for p, gm, gs, seq in zip(hist['pontos'][-janela:], hist['gm'][-janela:], hist['gs'][-janela:], hist['seq'][-janela:]):
+            linhas.append({'time': time, 'pontos': p, 'gm': gm, 'gs': gs, 'seq': seq})
+        n_fora = max(len(hist['pontos']) - janela, 0)
+        base_n[time] = n_fora
+        base_pontos[time] = sum(hist['pontos'][:n_fora])
+    sementes = pd.DataFrame(linhas, columns=longa.columns).astype(longa.dtypes.to_dict())
+    return sementes, base_n, base_pontos
+
+def _calcular_features(longa, time_stats=None, janela=5):
+    """
+    Calcula, para cada linha da tabela longa, as features com base apenas nos jogos
+    anteriores do mesmo time (shift + janelas móveis agrupadas por time).
+    Se `time_stats` for informado, o histórico já processado é levado em conta.
+    """
+    longa = longa[['time', 'pontos', 'gm', 'gs', 'seq']]
+    n_sementes, base_n, base_pontos = 0, {}, {}
+    if time_stats:
+        sementes, base_n, base_pontos = _sementes(longa, time_stats, janela)
+        n_sementes = len(sementes)
+        longa = pd.concat([sementes, longa], ignore_index=True)
+
+    grupos = longa.groupby('time', sort=False)
+    n_ant = grupos.cumcount().to_numpy() + longa['time'].map(base_n).fillna(0).to_numpy(dtype=int)
+
+    feats = {}
+    # Soma acumulada *antes* do jogo atual; a janela móvel é a diferença entre somas acumuladas
+    for col in ['pontos', 'gm', 'gs']:
+        acum = grupos[col].cumsum() - longa[col]
+        if col == 'pontos':
+            acum = acum + longa['time'].map(base_pontos).fillna(0)
+        acum_janela = acum - acum.groupby(longa['time'], sort=False).shift(janela).fillna(0)
+        feats[col] = (acum.to_numpy(dtype=float)[n_sementes:], acum_janela.to_numpy(dtype=float)[n_sementes:])
+
+    n_ant = n_ant[n_sementes:]
+    n_janela = np.minimum(n_ant, janela)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        forca = np.where(n_ant > 0, feats['pontos'][0] / n_ant, 1.0)
+        media_gm = np.where(n_ant > 0, feats['gm'][1] / n_janela, 0)
+        media_gs = np.where(n_ant > 0, feats['gs'][1] / n_janela, 0)
+
+    return pd.DataFrame({
+        'ForcaGeral': forca,
+        'FormaPontos': feats['pontos'][1].astype(longa['pontos'].dtype),
+        'MediaGolsMarcados': media_gm,
+        'MediaGolsSofridos': media_gs,
+    })
+
+def _montar_time_stats(longa, time_stats=None):
+    """
+    Agrupa o histórico de cada time em listas (pontos, gols marcados/sofridos, sequência V/E/D,
+    data, mando 'C'/'F' e rating Elo após cada jogo).
+    Se `time_stats` for informado, os novos jogos são acrescentados a ele.
+    """
+    time_stats = {} if time_stats is None else time_stats
+    codigos, times = pd.factorize(longa['time'])
+    ordem = np.argsort(codigos, kind='stable')
+    limites = np.cumsum(np.bincount(codigos, minlength=len(times)))[:-1]
+    listas = {col: np.split(longa[col].to_numpy()[ordem], limites) for col in COLUNAS_HISTORICO}
+    for i, time in enumerate(times):
+        hist = time_stats.setdefault(time, {col: [] for col in COLUNAS_HISTORICO})
+        for col in COLUNAS_HISTORICO:
+            hist[col].extend(listas[col][i].tolist())
+    return time_stats
+
+def _ordenar_historico(df_historico):
+    """Ordem cronológica determinística (desempate por mandante/visitante), igual em todas as execuções."""
+    if not pd.api.types.is_datetime64_any_dtype(df_historico['Date']):
+        df_historico['Date'] = pd.to_datetime(df_historico['Date'])
+    return df_historico.sort_values(by=['Date', 'HomeTeam', 'AwayTeam'], kind='stable').reset_index(drop=True)
+
+def _processar_jogos(df_historico, time_stats=None):
+    """
+    Acrescenta alvos e features a jogos já ordenados e devolve (df_final, time_stats).
+    Com `time_stats`, os jogos são tratados como continuação daquele histórico.
+    """
+    df_historico = df_historico.copy()
 
     # Targets
     df_historico['Resultado'] = np.where(df_historico['FTHG'] > df_historico['FTAG'], 'Casa',
                                        np.where(df_historico['FTHG'] < df_historico['FTAG'], 'Visitante', 'Empate'))
     df_historico['Target_Over25'] = np.where((df_historico['FTHG'] + df_historico['FTAG']) > 2.5, 1, 0)
     df_historico['Target_BTTS'] = np.where((df_historico['FTHG'] > 0) & (df_historico['FTAG'] > 0), 1, 0)
-    
+
     # Pontos para cálculo
-    def get_points(res):
-        if res == 'Casa': return 3, 0
-        elif res == 'Visitante': return 0, 3
-        return 1, 1
-
-    df_historico['HomePoints'], df_historico['AwayPoints'] = zip(*df_historico['Resultado'].apply(get_points))
-
-    time_stats = {}
-    features_calculadas = []
-
-    for index, row in df_historico.iterrows():
-        time_casa, time_visitante = row['HomeTeam'], row['AwayTeam']
-        features_jogo = {}
-        
-        for time, lado in [(time_casa, 'Home'), (time_visitante, 'Away')]:
-            if time not in time_stats:
-                # 'seq' vai guardar ['V', 'E', 'D', ...]
-                time_stats[time] = {'pontos': [], 'gm': [], 'gs': [], 'seq': []}
-            
-            # Features
-            if len(time_stats[time]['pontos']) > 0:
-                features_jogo[f'ForcaGeral_{lado}'] = np.mean(time_stats[time]['pontos'])
-            else:
-                features_jogo[f'ForcaGeral_{lado}'] = 1.0
-            
-            features_jogo[f'FormaPontos_{lado}'] = sum(time_stats[time]['pontos'][-5:])
-            features_jogo[f'MediaGolsMarcados_{lado}'] = np.mean(time_stats[time]['gm'][-5:]) if time_stats[time]['gm'] else 0
-            features_jogo[f'MediaGolsSofridos_{lado}'] = np.mean(time_stats[time]['gs'][-5:]) if time_stats[time]['gs'] else 0
-        
-        features_calculadas.append(features_jogo)
-        
-        # Lógica para definir a letra do resultado (V, E, D)
-        g_casa, g_vis = row['FTHG'], row['FTAG']
-        res_c = 'V' if g_casa > g_vis else 'E' if g_casa == g_vis else 'D'
-        res_v = 'V' if g_vis > g_casa else 'E' if g_vis == g_casa else 'D'
-
-        # Atualiza histórico
-        time_stats[time_casa]['pontos'].append(3 if res_c == 'V' else 1 if res_c == 'E' else 0)
-        time_stats[time_casa]['seq'].append(res_c) # Salva a letra
-        time_stats[time_casa]['gm'].append(g_casa); time_stats[time_casa]['gs'].append(g_vis)
-        
-        time_stats[time_visitante]['pontos'].append(3 if res_v == 'V' else 1 if res_v == 'E' else 0)
-        time_stats[time_visitante]['seq'].append(res_v) # Salva a letra
-        time_stats[time_visitante]['gm'].append(g_vis); time_stats[time_visitante]['gs'].append(g_casa)
-
-    df_features = pd.DataFrame(features_calculadas, index=df_historico.index)
-    df_final = pd.concat([df_historico, df_features], axis=1)
-    
+    df_historico['HomePoints'] = np.select(
+        [df_historico['Resultado'] == 'Casa', df_historico['Resultado'] == 'Visitante'], [3, 0], default=1)
+    df_historico['AwayPoints'] = np.select(
+        [df_historico['Resultado'] == 'Visitante', df_historico['Resultado'] == 'Casa'], [3, 0], default=1)
+
+    # Elo em fluxo, continuando dos ratings que já estão em time_stats
+    ratings = RatingsElo({time: hist['elo'][-1] for time, hist in (time_stats or {}).items() if hist['elo']})
+    elos = np.array(list(ratings.processar(zip(
+        df_historico['HomeTeam'], df_historico['AwayTeam'],
+        df_historico['FTHG'].astype(float), df_historico['FTAG'].astype(float)
+    ))), dtype=float).reshape(-1, 4)
+
+    longa = _tabela_longa(df_historico, elos[:, 2:])
+    feats = _calcular_features(longa, time_stats)
+    time_stats = _montar_time_stats(longa, time_stats)
+
+    # Volta para o formato largo: como a tabela longa intercala Home/Away, basta um reshape
+    df_features = pd.DataFrame({
+        f'{feat}_{lado}': feats[feat].to_numpy().reshape(-1, 2)[:, i]
+        for i, lado in enumerate(['Home', 'Away'])
+        for feat in ['ForcaGeral', 'FormaPontos', 'MediaGolsMarcados', 'MediaGolsSofridos']
+    }, index=df_historico.index)
+    df_features['Elo_Home'], df_features['Elo_Away'] = elo_feature(elos[:, 0]), elo_feature(elos[:, 1])
+
+    return pd.concat([df_historico, df_features], axis=1), time_stats
+
+@medido('features')
+def preparar_dados_para_modelo(df_historico):
+    """
+    Cria as variáveis alvo e calcula features de forma, incluindo a sequência de resultados.
+    """
+    if df_historico is None or df_historico.empty:
+        return pd.DataFrame(), {}
+
+    print("Preparando dados e calculando features avançadas...")
+    definir(jogos=len(df_historico), modo='completo')
+    df_final, time_stats = _processar_jogos(_ordenar_historico(df_historico))
+
+    return df_final.iloc[20:].reset_index(drop=True), time_stats
+
+def _hashes_jogos(df_historico):
+    """Hash por linha das colunas que definem um jogo processado (chave + placar)."""
+    chaves = pd.DataFrame({
+        'Date': df_historico['Date'].to_numpy(dtype='datetime64[ns]').astype('int64'),
+        'HomeTeam': df_historico['HomeTeam'].astype(str),
+        'AwayTeam': df_historico['AwayTeam'].astype(str),
+        'FTHG': df_historico['FTHG'].astype(float),
+        'FTAG': df_historico['FTAG'].astype(float),
+    })
+    return pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+
+def _carregar_estado(caminho_estado):
+    """Lê o snapshot de time_stats; qualquer falha (arquivo ausente, corrompido, versão antiga) devolve None."""
+    try:
+        with open(caminho_estado, 'rb') as f:
+            estado = pickle.load(f)
+        if estado.get('versao') != ESTADO_VERSAO:
+            return None
+        return estado
+    except Exception:
+        return None
+
+def _salvar_estado(caminho_estado, estado):
+    """Grava o snapshot de forma atômica (arquivo temporário + rename)."""
+    tmp = f"{caminho_estado}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, caminho_estado)
+
+@medido('features')
+def atualizar_dados_para_modelo(df_historico, caminho_estado):
+    """
+    Versão incremental de preparar_dados_para_modelo: reaproveita o snapshot salvo em
+    `caminho_estado` (time_stats + jogos já processados) e processa apenas os jogos novos.
+    Se o histórico salvo não for um prefixo do atual (placar corrigido, jogo antigo inserido,
+    colunas diferentes), refaz o cálculo completo. O resultado é o mesmo do cálculo completo.
+    """
+    if df_historico is None or df_historico.empty:
+        return pd.DataFrame(), {}
+
+    df_ordenado = _ordenar_historico(df_historico.copy())
+    hashes = _hashes_jogos(df_ordenado)
+    estado = _carregar_estado(caminho_estado)
+
+    n = estado['n_jogos'] if estado else 0
+    prefixo_valido = (
+        estado is not None
+        and estado['colunas'] == list(df_ordenado.columns)
+        and n <= len(df_ordenado)
+        and np.array_equal(estado['hashes'], hashes[:n])
+    )
+
+    definir(jogos=len(df_ordenado), novos=len(df_ordenado) - n if prefixo_valido else len(df_ordenado))
+    if prefixo_valido and n == len(df_ordenado):
+        definir(modo='snapshot')
+        df_final, time_stats = estado['df_final'], estado['time_stats']
+    elif prefixo_valido:
+        definir(modo='incremental')
+        print(f"Atualizando features com {len(df_ordenado) - n} jogos novos...")
+        df_novos, time_stats = _processar_jogos(df_ordenado.iloc[n:].reset_index(drop=True), estado['time_stats'])
+        df_final = pd.concat([estado['df_final'], df_novos], ignore_index=True)
+    else:
+        definir(modo='completo')
+        print("Preparando dados e calculando features avançadas...")
+        df_final, time_stats = _processar_jogos(df_ordenado)
+
+    if not prefixo_valido or n != len(df_ordenado):
+        _salvar_estado(caminho_estado, {
+            'versao': ESTADO_VERSAO,
+            'colunas': list(df_ordenado.columns),
+            'n_jogos': len(df_ordenado),
+            'hashes': hashes,
+            'time_stats': time_stats,
+            'df_final': df_final,
+        })
+
     return df_final.iloc[20:].reset_index(drop=True), time_stats
 
+def forma_recente(time_stats, time, n=5, ano=None, mando=None):
+    """
+    Últimos `n` resultados ('V'/'E'/'D') do time, do mais antigo para o mais recente.
+    Pode filtrar pela temporada (`ano`) e pelo mando ('C' em casa, 'F' fora).
+    Percorre o histórico de trás para frente, parando assim que tem `n` jogos.
+    """
+    hist = time_stats.get(time)
+    if not hist:
+        return []
+    resultados = []
+    for i in range(len(hist['seq']) - 1, -1, -1):
+        if len(resultados) == n:
+            break
+        if ano is not None and hist['data'][i].year != ano:
+            if hist['data'][i].year < ano:
+                break
+            continue
+        if mando is not None and hist['mando'][i] != mando:
+            continue
+        resultados.append(hist['seq'][i])
+    resultados.reverse()
+    return resultados
+
+def pontos_forma(time_stats, time, n=5):
+    """Soma dos pontos nos últimos `n` jogos (a feature FormaPontos)."""
+    hist = time_stats.get(time)
+    return sum(hist['pontos'][-n:]) if hist else 0
+
+def elo_atual(time_stats, time, data=None):
+    """
+    Rating Elo do time depois do último jogo processado, ou o de uma data: o rating após o último
+    jogo até `data` (inclusive), por busca binária no histórico. Sem jogos, o rating inicial.
+    """
+    hist = time_stats.get(time)
+    if not hist or not hist['elo']:
+        return ELO_INICIAL
+    if data is None:
+        return hist['elo'][-1]
+    i = bisect_right(hist['data'], data)
+    return hist['elo'][i - 1] if i else ELO_INICIAL
+
+def sequencia_atual(time_stats, time):
+    """Sequência em aberto do time: (resultado, quantidade de jogos seguidos), ex. ('V', 3)."""
+    hist = time_stats.get(time)
+    if not hist or not hist['seq']:
+        return None, 0
+    ultimo, qtd = hist['seq'][-1], 0
+    for res in reversed(hist['seq']):
+        if res != ultimo:
+            break
+        qtd += 1
+    return ultimo, qtd
+
 def gerar_dados_evolucao(df_total):
     """Gera histórico de posições para o gráfico."""
     if df_total is None or df_total.empty: return {}
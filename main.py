@@ -1,19 +1,24 @@
 import flet as ft
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import os
+from datetime import datetime
 import json
+import time
+import threading
+import argparse
+import cProfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 try:
     from web_scraper import AtletiQScraper
-    from feature_engineering import preparar_dados_para_modelo
-    from model_trainer import treinar_modelo
-    from predictor import prever_jogo_especifico, simular_campeonato
-    from analysis import gerar_confronto_direto
+    from feature_engineering import forma_recente, sequencia_atual
+    from predictor import simular_campeonato_monte_carlo
+    from analysis import gerar_confronto_direto, construir_indice_h2h
+    import tracing
+    from pipeline import Etapa, em_segundo_plano, executar_etapa, carregar_partidas, preparar_modelo
+    from pipeline import CACHE_DIR, CACHE_FILE, ESTADO_FILE, MODELO_FILE, versao_partidas
+    from memo import CacheLRU
 except ImportError as e:
     print(f"Erro crítico: {e}")
     raise e
@@ -25,7 +30,8 @@ COR_SURFACE = "#1E1E1E"
 COR_TEXT_SEC = "#9E9E9E"
 COR_BORDER = "#333333"
 COR_ENCERRADO = "#797979"
-CACHE_FILE = "atletiq_dataset.csv"
+METRICAS_FILE = "atletiq_metricas.json"
+N_SIMULACOES = 10000
 
 CORES_TIMES = {
     'Flamengo': '#C3281E',
@@ -78,6 +84,14 @@ def criar_card(content, padding=20, on_click=None):
     )
 
 
+def criar_carregando(texto=None):
+    # Indicador para partes da tela que aguardam uma etapa em segundo plano
+    controles = [ft.ProgressRing(width=14, height=14, stroke_width=2, color=COR_ACCENT)]
+    if texto:
+        controles.append(ft.Text(texto, size=11, color=COR_TEXT_SEC))
+    return ft.Row(controles, spacing=8, alignment="center")
+
+
 def criar_stat_box(label, value, color="white", odd=None):
     # Probabilidades em porcentagens
     content_list = [
@@ -185,6 +199,7 @@ def criar_tabela_estilizada(df):
 
 
 def main(page: ft.Page):
+    inicio_app = time.perf_counter()
     page.title = "AtletiQ 2.5"
     page.theme_mode = "dark"
     page.bgcolor = COR_BG
@@ -205,562 +220,743 @@ def main(page: ft.Page):
     page.update()
 
     # LÓGICA DE CARREGAMENTO
+    # Só os dados das partidas seguram a tela inicial; features, modelo e artilharia
+    # terminam em segundo plano e liberam as partes da interface que dependem deles
     scraper = AtletiQScraper()
     ano_atual = datetime.now().year
     anos_para_processar = list(range(ano_atual - 4, ano_atual + 1))
 
-    df_cache = pd.DataFrame()
-    if os.path.exists(CACHE_FILE):
-        try:
-            df_cache = pd.read_csv(CACHE_FILE)
-            df_cache['Date'] = pd.to_datetime(df_cache['Date'], utc=True)
-        except Exception:
-            df_cache = pd.DataFrame()
-
-    dfs_finais = []
-    for ano in anos_para_processar:
-        txt_load.value = f"Sincronizando Temporada {ano}..."
-        page.update()
+    etapa_artilharia = Etapa('artilharia')
+    etapa_features = Etapa('features')
+    etapa_modelo = Etapa('modelo')
+    # A artilharia é baixada junto com as temporadas (mesma sessão e limitador)
+    em_segundo_plano(executar_etapa, etapa_artilharia, scraper.fetch_scorers, str(ano_atual))
 
-        if not df_cache.empty and ano < ano_atual:
-            dados_ano = df_cache[df_cache['Date'].dt.year == ano]
-            if len(dados_ano) > 50:
-                dfs_finais.append(dados_ano)
-                continue
+    def progresso_carga(msg):
+        txt_load.value = msg
+        page.update()
 
-        try:
-            df_download = scraper.buscar_dados_hibrido(str(ano))
-            if df_download is not None and not df_download.empty:
-                df_download['Date'] = pd.to_datetime(
-                    df_download['Date'], utc=True
-                )
-                dfs_finais.append(df_download)
-        except Exception:
-            continue
+    df_total = carregar_partidas(
+        scraper, anos_para_processar, ano_atual, CACHE_DIR,
+        csv_legado=CACHE_FILE, progresso=progresso_carga
+    )
 
-    if not dfs_finais:
+    if df_total is None:
         txt_load.value = "Erro: Sem dados (Internet ou Cache falhou)."
         page.update()
         return
 
-    df_total = pd.concat(dfs_finais).drop_duplicates().reset_index(drop=True)
-    df_total['Date'] = pd.to_datetime(df_total['Date'], utc=True)
-    # Converte para o horário de Brasília (UTC-3)
-    df_total['Date'] = df_total['Date'].dt.tz_convert('America/Sao_Paulo')
-    df_total.to_csv(CACHE_FILE, index=False)
-
     df_res = df_total[df_total['FTHG'].notna()].copy()
     df_calendario = df_total[df_total['Date'].dt.year == ano_atual].copy()
 
-    df_treino, time_stats = preparar_dados_para_modelo(df_res)
-    modelos, encoder, cols_model = treinar_modelo(df_treino)
-    df_artilharia_completa = scraper.fetch_scorers(str(ano_atual))
+    # Status das etapas em segundo plano, exibido no cabeçalho
+    txt_status = ft.Text("Calculando features...", size=10, color=COR_TEXT_SEC)
+
+    def progresso_modelo(msg):
+        txt_status.value = msg
+        page.update()
+
+    em_segundo_plano(
+        preparar_modelo, df_total, ESTADO_FILE, MODELO_FILE,
+        etapa_features, etapa_modelo, progresso_modelo
+    )
+
+    # Índice de confronto direto: montado uma vez por carga dos dados
+    indice_h2h = construir_indice_h2h(df_total)
+
+    # Memo do Match Center: reabrir um jogo não recalcula nada. As chaves levam a versão dos
+    # jogos (forma, H2H) ou dos jogos + modelo (probabilidades) usada no cálculo, então dados
+    # novos nunca reaproveitam um valor antigo
+    memo_match_center = CacheLRU(capacidade=256)
+    versao_dados = versao_partidas(df_total)
 
     times_list = sorted(list(
         set(df_total['HomeTeam']).union(set(df_total['AwayTeam']))
     ))
     page.clean()
+    with tracing.span('ui.construir'):
+        def quando_pronta(etapa, preencher):
+            """Preenche já se a etapa terminou; senão, quando ela terminar (e atualiza a tela)."""
+            if etapa.pronta:
+                preencher(etapa)
+            else:
+                etapa.ao_concluir(lambda et: (preencher(et), page.update()))
 
-    # UI: MODAL DETALHES
-    def abrir_detalhes(row):
-
-        mandante, visitante = row['HomeTeam'], row['AwayTeam']
-        ano_atual = datetime.now().year # Garante que os dados sejam do ano atual
-
-        foi_realizado = pd.notna(row['FTHG'])
-        status_text = "PARTIDA ENCERRADA" if foi_realizado else "PARTIDA AGENDADA"
-        status_color = COR_ACCENT if foi_realizado else COR_TEXT_SEC
-        mandante, visitante = row['HomeTeam'], row['AwayTeam']
-        
-        # Lógica de Placar
-        foi_realizado = pd.notna(row['FTHG'])
-        placar_mandante = str(int(row['FTHG'])) if foi_realizado else "-"
-        placar_visitante = str(int(row['FTAG'])) if foi_realizado else "-"
-
-        # Adicionar bolinhas com resultados dos últimos jogos 
-        def obter_forma(time):
-            # Filtra jogos do time no ano atual que já possuem resultado
-            jogos_time = df_total[
-                ((df_total['HomeTeam'] == time) | (df_total['AwayTeam'] == time)) & 
-                (df_total['FTHG'].notna()) &
-                (df_total['Date'].dt.year == ano_atual)
-            ].sort_values(by='Date', ascending=False).head(5)
-            
-            icones_forma = []
-            resultados = []
-            
-            for _, j in jogos_time.iterrows():
-                if j['FTHG'] == j['FTAG']:
-                    resultados.append("E")
-                elif (j['HomeTeam'] == time and j['FTHG'] > j['FTAG']) or \
-                    (j['AwayTeam'] == time and j['FTAG'] > j['FTHG']):
-                    resultados.append("V")
-                else:
-                    resultados.append("D")
-
-            resultados.reverse() 
+        # UI: MODAL DETALHES
+        @tracing.medido('ui.abrir_detalhes')
+        def abrir_detalhes(row):
 
-            for i in range(5):
-                if i < len(resultados):
-                    res = resultados[i]
-                    cor = COR_ACCENT if res == "V" else "red" if res == "D" else "grey"
-                    icones_forma.append(ft.Container(width=8, height=8, bgcolor=cor, border_radius=4))
-                else:
-                    # Bolinhas vazias para completar as 5
-                    icones_forma.append(ft.Container(width=8, height=8, border=ft.border.all(1, COR_TEXT_SEC), border_radius=4))
-            
-            return ft.Row(icones_forma, spacing=3, alignment="center")
+            mandante, visitante = row['HomeTeam'], row['AwayTeam']
+            ano_atual = datetime.now().year # Garante que os dados sejam do ano atual
 
-        forma_mandante = obter_forma(mandante)
-        forma_visitante = obter_forma(visitante)
+            foi_realizado = pd.notna(row['FTHG'])
+            status_text = "PARTIDA ENCERRADA" if foi_realizado else "PARTIDA AGENDADA"
+            status_color = COR_ACCENT if foi_realizado else COR_TEXT_SEC
+            mandante, visitante = row['HomeTeam'], row['AwayTeam']
         
-        odds_ia = prever_jogo_especifico(
-            mandante, visitante, modelos, encoder, time_stats, cols_model
-        )
-
-        # Probabilidades em %
-        prob_casa = odds_ia.get('Casa', 0)
-        prob_empate = odds_ia.get('Empate', 0)
-        prob_visitante = odds_ia.get('Visitante', 0)
-
-        # Cálculo de odds decimais
-        odd_casa = 1 / prob_casa if prob_casa > 0 else 0
-        odd_empate = 1 / prob_empate if prob_empate > 0 else 0
-        odd_visitante = 1 / prob_visitante if prob_visitante > 0 else 0
-
-        res_h2h, df_h2h = gerar_confronto_direto(
-            df_total, mandante, visitante
-        )
+            # Lógica de Placar
+            foi_realizado = pd.notna(row['FTHG'])
+            placar_mandante = str(int(row['FTHG'])) if foi_realizado else "-"
+            placar_visitante = str(int(row['FTAG'])) if foi_realizado else "-"
+
+            # Adicionar bolinhas com resultados dos últimos jogos 
+            def obter_forma(time, time_stats):
+                # Últimos 5 resultados do time no ano atual, direto do índice por time (time_stats)
+                icones_forma = []
+                resultados = memo_match_center.obter_ou_calcular(
+                    ('forma', versao_dados, time, ano_atual),
+                    lambda: forma_recente(time_stats, time, n=5, ano=ano_atual)
+                )
 
-        def fechar(e):
-            modal.open = False
-            page.update()
+                for i in range(5):
+                    if i < len(resultados):
+                        res = resultados[i]
+                        cor = COR_ACCENT if res == "V" else "red" if res == "D" else "grey"
+                        icones_forma.append(ft.Container(width=8, height=8, bgcolor=cor, border_radius=4))
+                    else:
+                        # Bolinhas vazias para completar as 5
+                        icones_forma.append(ft.Container(width=8, height=8, border=ft.border.all(1, COR_TEXT_SEC), border_radius=4))
+
+                # Sequência em aberto (todas as temporadas), ex.: "Sequência: 3V"
+                resultado, qtd = memo_match_center.obter_ou_calcular(
+                    ('sequencia', versao_dados, time),
+                    lambda: sequencia_atual(time_stats, time)
+                )
+                controles = [ft.Row(icones_forma, spacing=3, alignment="center")]
+                if qtd:
+                    controles.append(ft.Text(f"Sequência: {qtd}{resultado}", size=10, color=COR_TEXT_SEC))
+                return ft.Column(controles, spacing=2, horizontal_alignment="center")
+
+            # Forma e probabilidades dependem das etapas em segundo plano: até lá, indicador de carregamento
+            forma_mandante = ft.Container(content=criar_carregando(), alignment=ft.alignment.center)
+            forma_visitante = ft.Container(content=criar_carregando(), alignment=ft.alignment.center)
+            area_probabilidades = ft.Container(content=criar_carregando("Modelo em treinamento..."))
+
+            def preencher_forma(etapa):
+                if etapa.erro is not None:
+                    for forma in (forma_mandante, forma_visitante):
+                        forma.content = ft.Text("Forma indisponível.", size=11, color=COR_TEXT_SEC)
+                    return
+                forma_mandante.content = obter_forma(mandante, etapa.resultado)
+                forma_visitante.content = obter_forma(visitante, etapa.resultado)
+
+            def preencher_probabilidades(etapa):
+                if etapa.erro is not None:
+                    area_probabilidades.content = ft.Text("Modelo indisponível.", color=COR_TEXT_SEC)
+                    return
+                recursos = etapa.resultado
+                odds_ia = memo_match_center.obter_ou_calcular(
+                    ('prever', recursos['versao'], mandante, visitante),
+                    lambda: recursos['plano'].prever(mandante, visitante)
+                )
 
-        modal_content = ft.Column([
-            ft.Row([
-                ft.Column([
-                    ft.Container(
-                        content=ft.Text(status_text, size=10, weight="bold", color="black"),
-                        bgcolor=status_color, padding=ft.padding.symmetric(horizontal=8, vertical=2), border_radius=5,
+                # Probabilidades em %
+                prob_casa = odds_ia.get('Casa', 0)
+                prob_empate = odds_ia.get('Empate', 0)
+                prob_visitante = odds_ia.get('Visitante', 0)
+
+                # Cálculo de odds decimais
+                odd_casa = 1 / prob_casa if prob_casa > 0 else 0
+                odd_empate = 1 / prob_empate if prob_empate > 0 else 0
+                odd_visitante = 1 / prob_visitante if prob_visitante > 0 else 0
+
+                area_probabilidades.content = ft.Row([
+                    criar_stat_box(
+                        "Vitória " + mandante, 
+                        f"{prob_casa:.0%}",
+                        CORES_TIMES.get(mandante, COR_ACCENT),
+                        odd=odd_casa
+                    ),
+                    criar_stat_box(
+                        "Empate", 
+                        f"{prob_empate:.0%}", 
+                        "grey",
+                        odd=odd_empate
                     ),
-                    ft.Text(row['Date'].strftime("%d/%m/%Y - %H:%M"), size=12, weight="bold"),
-                ], spacing=5),
-                ft.IconButton(ft.Icons.CLOSE, on_click=fechar)
-            ], alignment="spaceBetween"),
+                    criar_stat_box(
+                        "Vitória " + visitante, 
+                        f"{prob_visitante:.0%}", 
+                        "#00B0FF",
+                        odd=odd_visitante
+                    )
+                ], spacing=10)
+
+            res_h2h, df_h2h = memo_match_center.obter_ou_calcular(
+                ('h2h', versao_dados, mandante, visitante),
+                lambda: gerar_confronto_direto(df_total, mandante, visitante, indice=indice_h2h)
+            )
 
-            ft.Divider(color=COR_BORDER),
-            
-            # Cabeçalho com Placar
-            ft.Container(
-                content=ft.Row([
+            def fechar(e):
+                modal.open = False
+                page.update()
+
+            modal_content = ft.Column([
+                ft.Row([
                     ft.Column([
-                        # ft.Text("Mandante", size=10, color=COR_TEXT_SEC, text_align="center"),
-                        obter_escudo(mandante, 50),
-                        ft.Text(mandante, weight="bold", size=20, text_align="center"),
-                        ft.Text("Últimos jogos", size=9),
-                        forma_mandante, # Bolinhas dos úlimos jogos
-                    ], expand=True, horizontal_alignment="center", spacing=5),
+                        ft.Container(
+                            content=ft.Text(status_text, size=10, weight="bold", color="black"),
+                            bgcolor=status_color, padding=ft.padding.symmetric(horizontal=8, vertical=2), border_radius=5,
+                        ),
+                        ft.Text(row['Date'].strftime("%d/%m/%Y - %H:%M"), size=12, weight="bold"),
+                    ], spacing=5),
+                    ft.IconButton(ft.Icons.CLOSE, on_click=fechar)
+                ], alignment="spaceBetween"),
+
+                ft.Divider(color=COR_BORDER),
+            
+                # Cabeçalho com Placar
+                ft.Container(
+                    content=ft.Row([
+                        ft.Column([
+                            # ft.Text("Mandante", size=10, color=COR_TEXT_SEC, text_align="center"),
+                            obter_escudo(mandante, 50),
+                            ft.Text(mandante, weight="bold", size=20, text_align="center"),
+                            ft.Text("Últimos jogos", size=9),
+                            forma_mandante, # Bolinhas dos úlimos jogos
+                        ], expand=True, horizontal_alignment="center", spacing=5),
                     
-                    # Área do Placar Central
-                    ft.Container(
-                        content=ft.Row([
-                            ft.Text(placar_mandante, size=24, weight="bold"),
-                            ft.Text("x", size=14, color=COR_TEXT_SEC),
-                            ft.Text(placar_visitante, size=24, weight="bold"),
-                        ], alignment="center", spacing=15),
-                        bgcolor="#1AFFFFFF",
-                        padding=ft.padding.symmetric(horizontal=20, vertical=10),
-                        border_radius=10,
-                    ),
+                        # Área do Placar Central
+                        ft.Container(
+                            content=ft.Row([
+                                ft.Text(placar_mandante, size=24, weight="bold"),
+                                ft.Text("x", size=14, color=COR_TEXT_SEC),
+                                ft.Text(placar_visitante, size=24, weight="bold"),
+                            ], alignment="center", spacing=15),
+                            bgcolor="#1AFFFFFF",
+                            padding=ft.padding.symmetric(horizontal=20, vertical=10),
+                            border_radius=10,
+                        ),
                     
-                    ft.Column([
-                        # ft.Text("Visitante", size=10, color=COR_TEXT_SEC, text_align="center"),
-                        obter_escudo(visitante, 50),
-                        ft.Text(visitante, weight="bold", size=20, text_align="center"),
-                        ft.Text("Últimos jogos", size=9),
-                        forma_visitante, # Bolinhas dos úlimos jogos
-                    ], expand=True, horizontal_alignment="center", spacing=5),
-                ], alignment="center"),
-                margin=ft.margin.symmetric(vertical=10)
-            ),
-
-            ft.Text("Análise de Probabilidades (IA)", size=13, color=COR_ACCENT, weight="bold"),
-            ft.Row([
-                criar_stat_box(
-                    "Vitória " + mandante, 
-                    f"{prob_casa:.0%}",
-                    CORES_TIMES.get(mandante, COR_ACCENT),
-                    odd=odd_casa
+                        ft.Column([
+                            # ft.Text("Visitante", size=10, color=COR_TEXT_SEC, text_align="center"),
+                            obter_escudo(visitante, 50),
+                            ft.Text(visitante, weight="bold", size=20, text_align="center"),
+                            ft.Text("Últimos jogos", size=9),
+                            forma_visitante, # Bolinhas dos úlimos jogos
+                        ], expand=True, horizontal_alignment="center", spacing=5),
+                    ], alignment="center"),
+                    margin=ft.margin.symmetric(vertical=10)
                 ),
-                criar_stat_box(
-                    "Empate", 
-                    f"{prob_empate:.0%}", 
-                    "grey",
-                    odd=odd_empate
+
+                ft.Text("Análise de Probabilidades (IA)", size=13, color=COR_ACCENT, weight="bold"),
+                area_probabilidades,
+            
+                ft.Text(
+                    f"Histórico Geral ({res_h2h['total_partidas']} partidas)",
+                    size=13, color=COR_ACCENT, weight="bold"
                 ),
-                criar_stat_box(
-                    "Vitória " + visitante, 
-                    f"{prob_visitante:.0%}", 
-                    "#00B0FF",
-                    odd=odd_visitante
-                )
-            ], spacing=10),
+                ft.Row([
+                    criar_stat_box(
+                        "Vitórias " + mandante, res_h2h['vitorias'].get(mandante, 0)
+                    ),
+                    criar_stat_box("Empates", res_h2h['empates']),
+                    criar_stat_box(
+                        "Vitórias " + visitante,
+                        res_h2h['vitorias'].get(visitante, 0)
+                    ),
+                ], spacing=10),
             
-            ft.Text(
-                f"Histórico Geral ({res_h2h['total_partidas']} partidas)",
-                size=13, color=COR_ACCENT, weight="bold"
-            ),
-            ft.Row([
-                criar_stat_box(
-                    "Vitórias " + mandante, res_h2h['vitorias'].get(mandante, 0)
+                ft.Text("Últimos confrontos diretos:", size=11, color=COR_TEXT_SEC),
+                ft.Container(
+                    content=criar_tabela_estilizada(df_h2h.head(5)),
+                    padding=5,
+                    bgcolor="#0DFFFFFF",
+                    border_radius=10
                 ),
-                criar_stat_box("Empates", res_h2h['empates']),
-                criar_stat_box(
-                    "Vitórias " + visitante,
-                    res_h2h['vitorias'].get(visitante, 0)
+            ], scroll=ft.ScrollMode.AUTO, spacing=15)
+
+            modal = ft.BottomSheet(
+                ft.Container(
+                    content=modal_content,
+                    padding=25,
+                    bgcolor=COR_SURFACE,
+                    border_radius=ft.border_radius.only(top_left=20, top_right=20)
                 ),
-            ], spacing=10),
-            
-            ft.Text("Últimos confrontos diretos:", size=11, color=COR_TEXT_SEC),
-            ft.Container(
-                content=criar_tabela_estilizada(df_h2h.head(5)),
-                padding=5,
-                bgcolor="#0DFFFFFF",
-                border_radius=10
-            ),
-        ], scroll=ft.ScrollMode.AUTO, spacing=15)
-
-        modal = ft.BottomSheet(
-            ft.Container(
-                content=modal_content,
-                padding=25,
-                bgcolor=COR_SURFACE,
-                border_radius=ft.border_radius.only(top_left=20, top_right=20)
-            ),
-            is_scroll_controlled=True
-        )
-        page.overlay.append(modal)
-        modal.open = True
-        page.update()
-
-    # ABA 1: CALENDÁRIO
-    times_atuais = sorted(list(
-        set(df_calendario['HomeTeam']).union(set(df_calendario['AwayTeam']))
-    ))
-    
-    lista_jogos_container = ft.Column()
-
-    # Filtrar o calendário por times
-    def filtrar_calendario(e):
-        termo = dd_filtro_jogos.value
-        conteudo_filtrado = []
-
-        if termo != "Todos os Times":
-            mask = (df_calendario['HomeTeam'] == termo) | \
-                   (df_calendario['AwayTeam'] == termo)
-            df_f = df_calendario[mask].copy()
-        else:
-            df_f = df_calendario.copy()
-
-        if df_f.empty:
-            lista_jogos_container.controls = [
-                ft.Text("Nenhum jogo encontrado.", color=COR_TEXT_SEC)
-            ]
+                is_scroll_controlled=True
+            )
+            quando_pronta(etapa_features, preencher_forma)
+            quando_pronta(etapa_modelo, preencher_probabilidades)
+            page.overlay.append(modal)
+            modal.open = True
             page.update()
-            return
 
-        df_f['Rodada_Num'] = pd.to_numeric(df_f['Rodada'], errors='coerce')
-
-        for r in sorted(df_f['Rodada_Num'].dropna().unique()):
-            jogos_r = ft.ResponsiveRow(spacing=10)
-            df_rodada = df_f[df_f['Rodada_Num'] == r]
+        # ABA 1: CALENDÁRIO
+        times_atuais = sorted(list(
+            set(df_calendario['HomeTeam']).union(set(df_calendario['AwayTeam']))
+        ))
+    
+        # Índice do calendário, montado uma vez por carga: os jogos viram dicts (mesmo acesso por
+        # chave que as linhas do DataFrame) agrupados por rodada, então filtrar não varre o DataFrame
+        jogos_calendario = df_calendario.to_dict('records')
+        posicoes_por_rodada = {}
+        for pos, rodada in enumerate(pd.to_numeric(df_calendario['Rodada'], errors='coerce')):
+            if pd.notna(rodada):
+                posicoes_por_rodada.setdefault(int(rodada), []).append(pos)
+        rodadas_calendario = sorted(posicoes_por_rodada)
+
+        # Cada card é montado uma única vez e reaproveitado por todos os filtros; as seções
+        # (título da rodada + cards) ficam num LRU por (filtro, rodada)
+        cards_calendario = {}
+        secoes_calendario = CacheLRU(capacidade=256)
+
+        # A lista só recebe os primeiros jogos do filtro; o resto entra por lotes conforme a
+        # rolagem se aproxima do fim (e o ListView só desenha o que está visível)
+        JOGOS_POR_LOTE = 20
+        estado_calendario = {'termo': None, 'rodadas': [], 'exibidas': 0}
+        trava_calendario = threading.Lock()
+
+        lista_jogos_container = ft.ListView(
+            spacing=10, expand=True, build_controls_on_demand=True,
+            on_scroll_interval=100
+        )
 
-            conteudo_filtrado.append(
-                ft.Text(f"Rodada {int(r)}", size=16,
-                        weight="bold", color=COR_ACCENT)
+        def card_jogo(pos):
+            card = cards_calendario.get(pos)
+            if card is not None:
+                return card
+
+            row = jogos_calendario[pos]
+            foi_realizado = pd.notna(row['FTHG'])
+            status_txt = "ENCERRADO" if foi_realizado else "AGENDADO"
+            status_bg = COR_ENCERRADO if foi_realizado else COR_TEXT_SEC
+
+            status_label = ft.Container(
+                content=ft.Text(status_txt, size=9,
+                                weight="bold", color="black"),
+                bgcolor=status_bg,
+                padding=ft.padding.symmetric(horizontal=8, vertical=2),
+                border_radius=5,
+                margin=ft.margin.only(bottom=5)
             )
 
-            for _, row in df_rodada.iterrows():
-                foi_realizado = pd.notna(row['FTHG'])
-                status_txt = "ENCERRADO" if foi_realizado else "AGENDADO"
-                status_bg = COR_ENCERRADO if foi_realizado else COR_TEXT_SEC
-
-                status_label = ft.Container(
-                    content=ft.Text(status_txt, size=9,
-                                    weight="bold", color="black"),
-                    bgcolor=status_bg,
-                    padding=ft.padding.symmetric(horizontal=8, vertical=2),
-                    border_radius=5,
-                    margin=ft.margin.only(bottom=5)
-                )
+            if foi_realizado:
+                info_central = ft.Row([
+                    ft.Text(str(int(row['FTHG'])), size=14,
+                            weight="bold", color=COR_ACCENT),
+                    ft.Text("x", size=12, color=COR_TEXT_SEC),
+                    ft.Text(str(int(row['FTAG'])), size=14,
+                            weight="bold", color=COR_ACCENT)
+                ], spacing=10)
+            else:
+                info_central = ft.Text("vs", size=10, color=COR_TEXT_SEC)
 
-                if foi_realizado:
-                    info_central = ft.Row([
-                        ft.Text(str(int(row['FTHG'])), size=14,
-                                weight="bold", color=COR_ACCENT),
-                        ft.Text("x", size=12, color=COR_TEXT_SEC),
-                        ft.Text(str(int(row['FTAG'])), size=14,
-                                weight="bold", color=COR_ACCENT)
+            card_content = ft.Row([
+                ft.Column([
+                    ft.Row([
+                        status_label,
+                        ft.Text(row['Date'].strftime("%d/%m - %H:%M"),
+                                size=11, color=COR_TEXT_SEC, weight="bold")
+                    ], spacing=10),
+                    ft.Row([
+                        ft.Text(row['HomeTeam'], size=13, weight="bold",
+                                expand=True, text_align="right"),
+                                obter_escudo(row['HomeTeam'], 20),
+                        info_central,
+                        obter_escudo(row['AwayTeam'], 20),
+                        ft.Text(row['AwayTeam'], size=13, weight="bold",
+                                expand=True, text_align="left")
                     ], spacing=10)
-                else:
-                    info_central = ft.Text("vs", size=10, color=COR_TEXT_SEC)
+                ], expand=True),
+                ft.Icon(ft.Icons.CHEVRON_RIGHT, color=COR_TEXT_SEC, size=16)
+            ], alignment="center")
 
-                card_content = ft.Row([
-                    ft.Column([
-                        ft.Row([
-                            status_label,
-                            ft.Text(row['Date'].strftime("%d/%m - %H:%M"),
-                                    size=11, color=COR_TEXT_SEC, weight="bold")
-                        ], spacing=10),
-                        ft.Row([
-                            ft.Text(row['HomeTeam'], size=13, weight="bold",
-                                    expand=True, text_align="right"),
-                                    obter_escudo(row['HomeTeam'], 20),
-                            info_central,
-                            obter_escudo(row['AwayTeam'], 20),
-                            ft.Text(row['AwayTeam'], size=13, weight="bold",
-                                    expand=True, text_align="left")
-                        ], spacing=10)
-                    ], expand=True),
-                    ft.Icon(ft.Icons.CHEVRON_RIGHT, color=COR_TEXT_SEC, size=16)
-                ], alignment="center")
-
-                card = criar_card(
+            card = ft.Container(
+                content=criar_card(
                     card_content, padding=12,
                     on_click=lambda _, r=row: abrir_detalhes(r)
+                ),
+                col={"xs": 12, "sm": 6}
+            )
+            cards_calendario[pos] = card
+            return card
+
+        def secao_rodada(termo, rodada, posicoes):
+            return secoes_calendario.obter_ou_calcular((termo, rodada), lambda: ft.Column([
+                ft.Text(f"Rodada {rodada}", size=16,
+                        weight="bold", color=COR_ACCENT),
+                ft.ResponsiveRow([card_jogo(p) for p in posicoes], spacing=10)
+            ]))
+
+        def rodadas_do_filtro(termo):
+            """Lista de (rodada, posições dos jogos) que o filtro mostra, em ordem de rodada."""
+            if termo == "Todos os Times":
+                return [(r, posicoes_por_rodada[r]) for r in rodadas_calendario]
+            rodadas = []
+            for r in rodadas_calendario:
+                posicoes = [
+                    p for p in posicoes_por_rodada[r]
+                    if termo in (jogos_calendario[p]['HomeTeam'], jogos_calendario[p]['AwayTeam'])
+                ]
+                if posicoes:
+                    rodadas.append((r, posicoes))
+            return rodadas
+
+        def exibir_proximo_lote():
+            """
+            Acrescenta rodadas à lista até somar JOGOS_POR_LOTE jogos. Devolve se acrescentou algo.
+            Enquanto faltarem rodadas, a lista termina num botão "Carregar mais rodadas": se o lote
+            não preencher a tela (janela alta, filtro por time), não há rolagem para disparar o próximo.
+            """
+            controles = lista_jogos_container.controls
+            if controles and controles[-1] is botao_mais_rodadas:
+                controles.pop()
+
+            rodadas = estado_calendario['rodadas']
+            inicio = i = estado_calendario['exibidas']
+            jogos = 0
+            while i < len(rodadas) and jogos < JOGOS_POR_LOTE:
+                rodada, posicoes = rodadas[i]
+                lista_jogos_container.controls.append(
+                    secao_rodada(estado_calendario['termo'], rodada, posicoes)
                 )
-                jogos_r.controls.append(
-                    ft.Container(content=card, col={"xs": 12, "sm": 6})
+                jogos += len(posicoes)
+                i += 1
+            estado_calendario['exibidas'] = i
+            if i < len(rodadas):
+                controles.append(botao_mais_rodadas)
+            return i > inicio
+
+        def carregar_mais_rodadas(_=None):
+            with trava_calendario:
+                acrescentou = exibir_proximo_lote()
+            if acrescentou:
+                lista_jogos_container.update()
+
+        def rolar_calendario(e):
+            if e.max_scroll_extent is None or e.pixels is None:
+                return
+            if e.pixels >= e.max_scroll_extent - 400:
+                carregar_mais_rodadas()
+
+        botao_mais_rodadas = ft.Container(
+            content=ft.TextButton("Carregar mais rodadas", icon=ft.Icons.EXPAND_MORE,
+                                  on_click=carregar_mais_rodadas),
+            alignment=ft.alignment.center
+        )
+        lista_jogos_container.on_scroll = rolar_calendario
+
+        # Filtrar o calendário por times
+        @tracing.medido('ui.filtrar_calendario')
+        def filtrar_calendario(e):
+            termo = dd_filtro_jogos.value
+
+            with trava_calendario:
+                estado_calendario.update(termo=termo, rodadas=rodadas_do_filtro(termo), exibidas=0)
+                lista_jogos_container.controls = []
+                if estado_calendario['rodadas']:
+                    exibir_proximo_lote()
+                else:
+                    lista_jogos_container.controls.append(
+                        ft.Text("Nenhum jogo encontrado.", color=COR_TEXT_SEC)
+                    )
+                tracing.definir(
+                    termo=termo, rodadas=estado_calendario['exibidas'],
+                    cards_em_cache=len(cards_calendario)
                 )
-            conteudo_filtrado.append(jogos_r)
 
-        lista_jogos_container.controls = conteudo_filtrado
-        page.update()
-
-    dd_filtro_jogos = ft.Dropdown(
-        label="Filtrar Calendário por Time",
-        options=[ft.dropdown.Option("Todos os Times")] +
-                [ft.dropdown.Option(t) for t in times_atuais],
-        value="Todos os Times",
-        on_change=filtrar_calendario,
-        expand=True
-    )
-
-    filtrar_calendario(None)
-
-    tab_jogos = ft.Container(
-        content=ft.Column([
-            criar_card(ft.Row([dd_filtro_jogos, ft.IconButton(ft.Icons.REFRESH, on_click=lambda _: setattr(dd_filtro_jogos, "value", "Todos os Times") or filtrar_calendario(None))])),
-            lista_jogos_container
-        ], scroll=ft.ScrollMode.AUTO),
-        padding=20
-    )
+            # Só a lista é diferenciada e enviada, não a página inteira
+            if lista_jogos_container.page is not None:
+                lista_jogos_container.scroll_to(offset=0, duration=0)
+                lista_jogos_container.update()
+
+        dd_filtro_jogos = ft.Dropdown(
+            label="Filtrar Calendário por Time",
+            options=[ft.dropdown.Option("Todos os Times")] +
+                    [ft.dropdown.Option(t) for t in times_atuais],
+            value="Todos os Times",
+            on_change=filtrar_calendario,
+            expand=True
+        )
 
-    # ABA 2: ARTILHARIA
-    opts_art = [ft.dropdown.Option("Todos")] + [
-        ft.dropdown.Option(t) for t in times_list
-    ]
-    dd_time_art = ft.Dropdown(
-        label="Filtrar por Clube", options=opts_art,
-        value="Todos", expand=True
-    )
-    lista_artilharia = ft.Column()
+        filtrar_calendario(None)
 
-    def atualizar_artilharia(e):
-        if df_artilharia_completa is None:
-            return
-        df_f = df_artilharia_completa.copy()
-        if dd_time_art.value != "Todos":
-            df_f = df_f[df_f['Time'] == dd_time_art.value]
+        # O ListView rola sozinho (e só desenha o visível), então a coluna não rola: só expande
+        tab_jogos = ft.Container(
+            content=ft.Column([
+                criar_card(ft.Row([dd_filtro_jogos, ft.IconButton(ft.Icons.REFRESH, on_click=lambda _: setattr(dd_filtro_jogos, "value", "Todos os Times") or filtrar_calendario(None))])),
+                lista_jogos_container
+            ], expand=True),
+            padding=20, expand=True
+        )
 
-        lista_artilharia.controls = [
-            ft.Text(f"Top Marcadores - {dd_time_art.value}", size=18, weight="bold"),
-            criar_tabela_estilizada(df_f)
+        # ABA 2: ARTILHARIA
+        opts_art = [ft.dropdown.Option("Todos")] + [
+            ft.dropdown.Option(t) for t in times_list
         ]
-        page.update()
+        dd_time_art = ft.Dropdown(
+            label="Filtrar por Clube", options=opts_art,
+            value="Todos", expand=True
+        )
+        lista_artilharia = ft.Column([criar_carregando("Carregando artilharia...")])
+
+        def atualizar_artilharia(e):
+            df_artilharia_completa = etapa_artilharia.resultado
+            if df_artilharia_completa is None:
+                if etapa_artilharia.pronta:
+                    lista_artilharia.controls = [ft.Text("Sem dados disponíveis.", color=COR_TEXT_SEC)]
+                    page.update()
+                return
+            df_f = df_artilharia_completa.copy()
+            if dd_time_art.value != "Todos":
+                df_f = df_f[df_f['Time'] == dd_time_art.value]
+
+            lista_artilharia.controls = [
+                ft.Text(f"Top Marcadores - {dd_time_art.value}", size=18, weight="bold"),
+                criar_tabela_estilizada(df_f)
+            ]
+            page.update()
 
-    def limpar_filtro_artilharia(e):
-        dd_time_art.value = "Todos"
-        atualizar_artilharia(None)
+        def limpar_filtro_artilharia(e):
+            dd_time_art.value = "Todos"
+            atualizar_artilharia(None)
 
-    btn_filtro_art = ft.IconButton("search", on_click=atualizar_artilharia)
-    btn_limpar_art = ft.IconButton(
-        "refresh", on_click=limpar_filtro_artilharia, icon_color=COR_TEXT_SEC
-    )
+        btn_filtro_art = ft.IconButton("search", on_click=atualizar_artilharia)
+        btn_limpar_art = ft.IconButton(
+            "refresh", on_click=limpar_filtro_artilharia, icon_color=COR_TEXT_SEC
+        )
 
-    atualizar_artilharia(None)
-    row_filtros = ft.Row([dd_time_art, btn_filtro_art, btn_limpar_art], spacing=10)
-    tab_artilharia = ft.Container(
-        content=ft.Column([
-            criar_card(row_filtros),
-            lista_artilharia
-        ], scroll=ft.ScrollMode.AUTO),
-        padding=20
-    )
+        etapa_artilharia.ao_concluir(lambda _: atualizar_artilharia(None))
+        row_filtros = ft.Row([dd_time_art, btn_filtro_art, btn_limpar_art], spacing=10)
+        tab_artilharia = ft.Container(
+            content=ft.Column([
+                criar_card(row_filtros),
+                lista_artilharia
+            ], scroll=ft.ScrollMode.AUTO),
+            padding=20
+        )
 
-    # ABA 3: EVOLUÇÃO 
-    dd_time_ev = ft.Dropdown(
-        label="Selecione o Time para Análise",
-        options=[ft.dropdown.Option(t) for t in times_list],
-        expand=True
-    )
+        # ABA 3: EVOLUÇÃO 
+        dd_time_ev = ft.Dropdown(
+            label="Selecione o Time para Análise",
+            options=[ft.dropdown.Option(t) for t in times_list],
+            expand=True
+        )
 
-    chart = ft.LineChart(
-        data_series=[],
-        border=ft.border.all(1, COR_BORDER),
-        horizontal_grid_lines=ft.ChartGridLines(
-            interval=5, color=ft.Colors.with_opacity(0.1, COR_TEXT_SEC), width=1
-        ),
-        vertical_grid_lines=ft.ChartGridLines(
-            interval=1, color=ft.Colors.with_opacity(0.1, COR_TEXT_SEC), width=1
-        ),
-        left_axis=ft.ChartAxis(
-            labels=[ft.ChartAxisLabel(value=i, label=ft.Text(str(i), size=10))
-                    for i in range(0, 120, 10)],
-            title=ft.Text("Pontos Acumulados", size=12, weight="bold"),
-            title_size=40
-        ),
-        bottom_axis=ft.ChartAxis(
-            title=ft.Text("Jornadas", size=12, weight="bold"),
-            title_size=40
-        ),
-        tooltip_bgcolor=ft.Colors.with_opacity(0.8, COR_SURFACE),
-        expand=True
-    )
+        chart = ft.LineChart(
+            data_series=[],
+            border=ft.border.all(1, COR_BORDER),
+            horizontal_grid_lines=ft.ChartGridLines(
+                interval=5, color=ft.Colors.with_opacity(0.1, COR_TEXT_SEC), width=1
+            ),
+            vertical_grid_lines=ft.ChartGridLines(
+                interval=1, color=ft.Colors.with_opacity(0.1, COR_TEXT_SEC), width=1
+            ),
+            left_axis=ft.ChartAxis(
+                labels=[ft.ChartAxisLabel(value=i, label=ft.Text(str(i), size=10))
+                        for i in range(0, 120, 10)],
+                title=ft.Text("Pontos Acumulados", size=12, weight="bold"),
+                title_size=40
+            ),
+            bottom_axis=ft.ChartAxis(
+                title=ft.Text("Jornadas", size=12, weight="bold"),
+                title_size=40
+            ),
+            tooltip_bgcolor=ft.Colors.with_opacity(0.8, COR_SURFACE),
+            expand=True
+        )
 
-    def gerar_grafico(e):
-        if not dd_time_ev.value:
-            return
+        def gerar_grafico(e):
+            if not dd_time_ev.value:
+                return
         
-        time_sel = dd_time_ev.value
-        mask_time = (
-            (df_res['HomeTeam'] == time_sel) | (df_res['AwayTeam'] == time_sel)
-        ) & (df_res['Date'].dt.year == ano_atual)
+            time_sel = dd_time_ev.value
+            mask_time = (
+                (df_res['HomeTeam'] == time_sel) | (df_res['AwayTeam'] == time_sel)
+            ) & (df_res['Date'].dt.year == ano_atual)
         
-        jogos_time = df_res[mask_time].sort_values('Date').copy()
+            jogos_time = df_res[mask_time].sort_values('Date').copy()
         
-        pontos_acumulados = 0
-        data_points = [ft.LineChartDataPoint(0, 0)]
+            pontos_acumulados = 0
+            data_points = [ft.LineChartDataPoint(0, 0)]
         
-        for idx, row in enumerate(jogos_time.itertuples(), 1):
-            if row.HomeTeam == time_sel:
-                pts = 3 if row.FTHG > row.FTAG else (1 if row.FTHG == row.FTAG else 0)
-            else:
-                pts = 3 if row.FTAG > row.FTHG else (1 if row.FTAG == row.FTHG else 0)
+            for idx, row in enumerate(jogos_time.itertuples(), 1):
+                if row.HomeTeam == time_sel:
+                    pts = 3 if row.FTHG > row.FTAG else (1 if row.FTHG == row.FTAG else 0)
+                else:
+                    pts = 3 if row.FTAG > row.FTHG else (1 if row.FTAG == row.FTHG else 0)
             
-            pontos_acumulados += pts
-            data_points.append(ft.LineChartDataPoint(idx, pontos_acumulados))
+                pontos_acumulados += pts
+                data_points.append(ft.LineChartDataPoint(idx, pontos_acumulados))
         
-        chart.data_series = [
-            ft.LineChartData(
-                data_points=data_points,
-                stroke_width=4,
-                color=COR_ACCENT,
-                curved=True,
-                below_line_bgcolor=ft.Colors.with_opacity(0.1, COR_ACCENT),
-                below_line_gradient=ft.LinearGradient(
-                    begin=ft.alignment.top_center,
-                    end=ft.alignment.bottom_center,
-                    colors=[ft.Colors.with_opacity(0.2, COR_ACCENT), ft.Colors.TRANSPARENT]
-                ),
-                point=True
-            )
-        ]
-        page.update()
+            chart.data_series = [
+                ft.LineChartData(
+                    data_points=data_points,
+                    stroke_width=4,
+                    color=COR_ACCENT,
+                    curved=True,
+                    below_line_bgcolor=ft.Colors.with_opacity(0.1, COR_ACCENT),
+                    below_line_gradient=ft.LinearGradient(
+                        begin=ft.alignment.top_center,
+                        end=ft.alignment.bottom_center,
+                        colors=[ft.Colors.with_opacity(0.2, COR_ACCENT), ft.Colors.TRANSPARENT]
+                    ),
+                    point=True
+                )
+            ]
+            page.update()
 
-    dd_time_ev.on_change = gerar_grafico
-    tab_evolucao = ft.Container(
-        content=ft.Column([
-            ft.Text("Evolução de Pontos na Temporada", size=20, weight="bold"),
-            criar_card(dd_time_ev),
-            ft.Container(
-                content=chart,
-                height=400,
-                padding=20,
-                bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.WHITE),
-                border_radius=15
-            )
-        ], scroll=ft.ScrollMode.AUTO, spacing=20),
-        padding=20
-    )
+        dd_time_ev.on_change = gerar_grafico
+        tab_evolucao = ft.Container(
+            content=ft.Column([
+                ft.Text("Evolução de Pontos na Temporada", size=20, weight="bold"),
+                criar_card(dd_time_ev),
+                ft.Container(
+                    content=chart,
+                    height=400,
+                    padding=20,
+                    bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.WHITE),
+                    border_radius=15
+                )
+            ], scroll=ft.ScrollMode.AUTO, spacing=20),
+            padding=20
+        )
 
-    # ABA 4: SIMULAÇÃO
-    area_sim = ft.Column()
+        # ABA 4: SIMULAÇÃO
+        area_sim = ft.Column()
 
-    def rodar(e):
-        btn_s.content = ft.ProgressRing(width=20, color="black")
-        page.update()
+        @tracing.medido('ui.simular')
+        def rodar(e):
+            btn_s.content = ft.ProgressRing(width=20, color="black")
+            page.update()
         
-        df_res_at = df_total[
-            (df_total['Date'].dt.year == ano_atual) & df_total['FTHG'].notna()
-        ]
-        df_fut_at = df_total[
-            (df_total['Date'].dt.year == ano_atual) & df_total['FTHG'].isna()
-        ]
+            df_res_at = df_total[
+                (df_total['Date'].dt.year == ano_atual) & df_total['FTHG'].notna()
+            ]
+            df_fut_at = df_total[
+                (df_total['Date'].dt.year == ano_atual) & df_total['FTHG'].isna()
+            ]
         
-        res = simular_campeonato(
-            38, df_fut_at, df_res_at, modelos, encoder, time_stats, cols_model
-        )
+            recursos = etapa_modelo.resultado
+            res_mc = simular_campeonato_monte_carlo(
+                38, df_fut_at, df_res_at, recursos['modelos'], recursos['encoder'],
+                recursos['time_stats'], recursos['colunas_modelo'],
+                n_simulacoes=N_SIMULACOES
+            )
+
+            # Tabela de exibição: pontos esperados e chances (%) de cada zona
+            res = pd.DataFrame({
+                'Time': (res_mc.index + 1).astype(str) + "   " + res_mc['Time'],
+                'Pts': res_mc['P'].round(1),
+                'Título': (res_mc['Titulo'] * 100).round(1).astype(str) + "%",
+                'Liberta': (res_mc['Libertadores'] * 100).round(1).astype(str) + "%",
+                'Sula': (res_mc['SulAmericana'] * 100).round(1).astype(str) + "%",
+                'Z4': (res_mc['Rebaixamento'] * 100).round(1).astype(str) + "%",
+            })
         
-        # Atualização da área de simulação com a legenda e a nova tabela
-        area_sim.controls = [
-            criar_legenda_tabela(),
-            criar_tabela_estilizada(res)
-        ]
+            # Atualização da área de simulação com a legenda e a nova tabela
+            area_sim.controls = [
+                criar_legenda_tabela(),
+                criar_tabela_estilizada(res)
+            ]
         
-        btn_s.content = ft.Text("SIMULAR CAMPEONATO")
-        page.update()
+            btn_s.content = ft.Text("SIMULAR CAMPEONATO")
+            page.update()
 
-    btn_s = ft.ElevatedButton(
-        "SIMULAR CAMPEONATO", bgcolor=COR_ACCENT,
-        color="black", on_click=rodar, width=float('inf')
-    )
+        # Desabilitado até o modelo ficar pronto
+        btn_s = ft.ElevatedButton(
+            content=criar_carregando("Aguardando o modelo..."), bgcolor=COR_ACCENT,
+            color="black", on_click=rodar, width=float('inf'), disabled=True
+        )
+
+        def habilitar_simulacao(etapa):
+            if etapa.erro is not None:
+                btn_s.content = ft.Text("MODELO INDISPONÍVEL")
+                return
+            btn_s.content = ft.Text("SIMULAR CAMPEONATO")
+            btn_s.disabled = False
     
-    tab_sim = ft.Container(
-        content=ft.Column([
-            ft.Text(
-                "Tabela simulada utilizando o modelo de IA da AtletiQ\n"
-                "Os resultados são imparciais e baseados puramente em cálculos matemáticos.",
-                color=COR_TEXT_SEC,
-            ),
-            ft.Divider(height=20, color=ft.Colors.TRANSPARENT), 
-            btn_s, 
-            ft.Text("Resultado da Simulação:", size=18, weight="bold"),
-            area_sim
-        ], scroll=ft.ScrollMode.AUTO),
-        padding=20
-    )
+        tab_sim = ft.Container(
+            content=ft.Column([
+                ft.Text(
+                    "Tabela simulada utilizando o modelo de IA da AtletiQ\n"
+                    f"Cada jogo restante é sorteado a partir das probabilidades do modelo em {N_SIMULACOES} temporadas simuladas.\n"
+                    "Os resultados são imparciais e baseados puramente em cálculos matemáticos.",
+                    color=COR_TEXT_SEC,
+                ),
+                ft.Divider(height=20, color=ft.Colors.TRANSPARENT), 
+                btn_s, 
+                ft.Text("Resultado da Simulação:", size=18, weight="bold"),
+                area_sim
+            ], scroll=ft.ScrollMode.AUTO),
+            padding=20
+        )
 
-    # HEADER E TABS
-    header_content = ft.Row([
-        ft.Row([
-            ft.Icon("sports_soccer", color=COR_ACCENT),
-            ft.Text("AtletiQ 2.5", size=22, weight="bold", color="white")
-        ]),
-        ft.Text("v2.5", size=10, color=COR_TEXT_SEC)
-    ], alignment="spaceBetween")
-
-    header = ft.Container(
-        content=header_content, padding=15,
-        border=ft.border.only(bottom=ft.border.BorderSide(1, COR_BORDER))
-    )
+        # HEADER E TABS
+        header_content = ft.Row([
+            ft.Row([
+                ft.Icon("sports_soccer", color=COR_ACCENT),
+                ft.Text("AtletiQ 2.5", size=22, weight="bold", color="white")
+            ]),
+            ft.Row([txt_status, ft.Text("v2.5", size=10, color=COR_TEXT_SEC)], spacing=15)
+        ], alignment="spaceBetween")
+
+        header = ft.Container(
+            content=header_content, padding=15,
+            border=ft.border.only(bottom=ft.border.BorderSide(1, COR_BORDER))
+        )
 
-    tabs = ft.Tabs(
-        selected_index=0,
-        indicator_color=COR_ACCENT,
-        label_color=COR_ACCENT,     
-        unselected_label_color=COR_TEXT_SEC,
-        tabs=[
-            ft.Tab(text="Jogos", icon="calendar_today", content=tab_jogos),
-            ft.Tab(text="Evolução", icon="show_chart", content=tab_evolucao),
-            ft.Tab(text="Artilharia", icon="local_fire_department", content=tab_artilharia),
-            ft.Tab(text="Simulação", icon="table_chart", content=tab_sim)
-        ],
-        expand=True
-    )
+        tabs = ft.Tabs(
+            selected_index=0,
+            indicator_color=COR_ACCENT,
+            label_color=COR_ACCENT,     
+            unselected_label_color=COR_TEXT_SEC,
+            tabs=[
+                ft.Tab(text="Jogos", icon="calendar_today", content=tab_jogos),
+                ft.Tab(text="Evolução", icon="show_chart", content=tab_evolucao),
+                ft.Tab(text="Artilharia", icon="local_fire_department", content=tab_artilharia),
+                ft.Tab(text="Simulação", icon="table_chart", content=tab_sim)
+            ],
+            expand=True
+        )
 
-    page.add(header, tabs)
+        page.add(header, tabs)
+    quando_pronta(etapa_modelo, habilitar_simulacao)
+
+    # Tempo até a primeira interação: calendário na tela, com o restante ainda em segundo plano
+    metricas = {'primeira_interacao': round(time.perf_counter() - inicio_app, 3)}
+    print(f"Calendário interativo em {metricas['primeira_interacao']:.2f}s")
+
+    def registrar_metricas(_):
+        etapas = (etapa_features, etapa_modelo, etapa_artilharia)
+        if not all(etapa.pronta for etapa in etapas):
+            return
+        for etapa in etapas:
+            metricas[etapa.nome] = round(etapa.segundos, 3)
+        with open(METRICAS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(metricas, f, indent=2)
+
+    for etapa in (etapa_features, etapa_modelo, etapa_artilharia):
+        etapa.ao_concluir(registrar_metricas)
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="AtletiQ")
+    parser.add_argument('--profile', nargs='?', const="atletiq_trace.json", metavar="TRACE_JSON",
+                        help="Mede as etapas (spans) e grava o trace em JSON ao fechar o app")
+    parser.add_argument('--cprofile', metavar="ARQUIVO_PROF",
+                        help="Com --profile, grava também um dump do cProfile da inicialização")
+    args = parser.parse_args()
+
+    if not args.profile:
+        ft.app(target=main)
+    else:
+        tracing.ativar()
+        perfil = cProfile.Profile() if args.cprofile else None
+
+        def main_com_perfil(page: ft.Page):
+            # O cProfile cobre a thread da inicialização; as etapas em segundo plano aparecem no trace
+            if perfil is not None:
+                perfil.enable()
+            try:
+                with tracing.span('app.inicializacao'):
+                    main(page)
+            finally:
+                if perfil is not None:
+                    perfil.disable()
+                    perfil.dump_stats(args.cprofile)
+
+        try:
+            ft.app(target=main_com_perfil)
+        finally:
+            tracing.exportar_json(args.profile)
+            print(f"Trace salvo em {args.profile}")
\ No newline at end of file
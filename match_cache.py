@@ -0,0 +1,205 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import json
+import os
+from datetime import timedelta
+
+from tracing import medido, definir
+
+# Tipos compactos usados em disco (um arquivo Arrow/Feather por temporada)
+DTYPES_DISCO = {
+    'id': 'Int64',
+    'Status': 'category',
+    'Rodada': 'Int8',
+    'HomeTeam': 'category',
+    'AwayTeam': 'category',
+    'FTHG': 'Int8',
+    'FTAG': 'Int8',
+}
+
+# Tipos usados em memória pelo restante do app (os mesmos que o CSV antigo produzia:
+# gols em float com NaN para jogos futuros e nomes de times como texto)
+TIPOS_MEMORIA = {
+    'id': pa.int64(),
+    'Status': pa.string(),
+    'Rodada': pa.int64(),
+    'HomeTeam': pa.string(),
+    'AwayTeam': pa.string(),
+    'FTHG': pa.float64(),
+    'FTAG': pa.float64(),
+}
+
+MANIFESTO = "manifesto.json"
+
+# Status de jogos que ainda podem ter o resultado atualizado na data marcada
+STATUS_PENDENTE = ('SCHEDULED', 'TIMED', 'IN_PLAY', 'PAUSED')
+
+
+def _caminho_temporada(diretorio, ano):
+    return os.path.join(diretorio, f"temporada_{int(ano)}.arrow")
+
+
+def _escrever_atomico(caminho, escrever):
+    """Escreve num arquivo temporário e só então substitui o destino (nunca deixa arquivo pela metade)."""
+    tmp = f"{caminho}.tmp"
+    try:
+        escrever(tmp)
+        os.replace(tmp, caminho)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, MANIFESTO), 'r', encoding='utf-8') as f:
+            return {int(ano): info for ano, info in json.load(f).items()}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _salvar_manifesto(diretorio, manifesto):
+    def escrever(caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({str(ano): info for ano, info in sorted(manifesto.items())}, f, indent=2)
+    _escrever_atomico(os.path.join(diretorio, MANIFESTO), escrever)
+
+
+def _para_disco(df):
+    """Converte uma temporada para uma tabela Arrow com tipos compactos (datas nativas em UTC)."""
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], utc=True)
+    df = df.astype({c: t for c, t in DTYPES_DISCO.items() if c in df.columns})
+    return pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+
+
+def _para_memoria(tabela):
+    """Converte a tabela (já concatenada) para os tipos de trabalho numa única passada."""
+    colunas = [
+        tabela[c].cast(TIPOS_MEMORIA[c]) if c in TIPOS_MEMORIA else tabela[c]
+        for c in tabela.column_names
+    ]
+    return pa.table(colunas, names=tabela.column_names).to_pandas()
+
+
+def _migrar_csv_legado(diretorio, csv_legado):
+    """Importa uma única vez o antigo atletiq_dataset.csv, separando-o por temporada."""
+    try:
+        df = pd.read_csv(csv_legado)
+        df['Date'] = pd.to_datetime(df['Date'], utc=True)
+    except Exception:
+        return
+    print("Migrando cache CSV para partições por temporada...")
+    for ano, df_ano in df.groupby(df['Date'].dt.year):
+        # Sem como saber se a temporada estava completa: fica aberta para ser baixada de novo
+        salvar_temporada(diretorio, ano, df_ano, fechada=False)
+
+
+@medido('cache.ler_temporadas')
+def carregar_temporadas(diretorio, anos=None, csv_legado=None):
+    """
+    Lê as partições do cache. Retorna (temporadas, manifesto): um dict ano -> DataFrame
+    e um dict ano -> {'fechada': bool, 'linhas': int}.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto = _ler_manifesto(diretorio)
+    if not manifesto and csv_legado and os.path.exists(csv_legado):
+        _migrar_csv_legado(diretorio, csv_legado)
+        manifesto = _ler_manifesto(diretorio)
+
+    tabelas = {}
+    for ano in sorted(manifesto):
+        if anos is not None and ano not in anos:
+            continue
+        try:
+            tabelas[ano] = feather.read_table(_caminho_temporada(diretorio, ano), memory_map=True)
+        except Exception:
+            # Partição ilegível: tratada como ausente (será baixada de novo)
+            manifesto.pop(ano, None)
+
+    if not tabelas:
+        definir(temporadas=0, linhas=0)
+        return {}, manifesto
+
+    # Uma única conversão para pandas e depois fatias por temporada
+    df = _para_memoria(pa.concat_tables(tabelas.values(), promote_options='permissive'))
+    temporadas, inicio = {}, 0
+    for ano, tabela in tabelas.items():
+        temporadas[ano] = df.iloc[inicio:inicio + tabela.num_rows].reset_index(drop=True)
+        inicio += tabela.num_rows
+    definir(temporadas=len(temporadas), linhas=len(df))
+    return temporadas, manifesto
+
+
+@medido('cache.salvar_temporada')
+def salvar_temporada(diretorio, ano, df, fechada=False):
+    """
+    Grava a partição de uma temporada. Temporadas fechadas já gravadas nunca são reescritas;
+    a temporada em andamento só é regravada se o conteúdo mudou. Retorna True se gravou.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto = _ler_manifesto(diretorio)
+    ano = int(ano)
+    caminho = _caminho_temporada(diretorio, ano)
+    info = manifesto.get(ano)
+    definir(ano=ano, linhas=len(df))
+
+    if info and info.get('fechada') and os.path.exists(caminho):
+        definir(gravou=False)
+        return False
+
+    tabela = _para_disco(df.reset_index(drop=True))
+    if info and os.path.exists(caminho) and not fechada:
+        try:
+            if feather.read_table(caminho).equals(tabela):
+                definir(gravou=False)
+                return False
+        except Exception:
+            pass
+
+    _escrever_atomico(caminho, lambda tmp: feather.write_feather(tabela, tmp, compression='lz4'))
+    manifesto[ano] = {'fechada': bool(fechada), 'linhas': tabela.num_rows}
+    _salvar_manifesto(diretorio, manifesto)
+    definir(gravou=True)
+    return True
+
+
+def periodo_incremental(df_temporada, agora, dias_antes=3, dias_depois=7, max_dias=10):
+    """
+    Janela de datas (dateFrom, dateTo) para atualizar uma temporada em andamento já salva:
+    de alguns dias atrás (ou do jogo pendente mais antigo) até alguns dias à frente.
+    Retorna None quando é preciso baixar a temporada inteira (sem ids salvos ou janela longa demais).
+    """
+    if df_temporada is None or df_temporada.empty or 'id' not in df_temporada.columns:
+        return None
+    if df_temporada['id'].isna().any():
+        return None
+
+    datas = pd.to_datetime(df_temporada['Date'], utc=True)
+    pendentes = datas[df_temporada['FTHG'].isna() & df_temporada['Status'].isin(STATUS_PENDENTE) & (datas <= agora)]
+    inicio = agora - timedelta(days=dias_antes)
+    if not pendentes.empty:
+        inicio = min(inicio, pendentes.min())
+    fim = agora + timedelta(days=dias_depois)
+
+    if (fim - inicio).days > max_dias:
+        return None
+    return inicio, fim
+
+
+def mesclar_por_id(df_base, df_novos):
+    """
+    Upsert pelo id da partida: linhas de `df_novos` substituem as de mesmo id em `df_base`
+    e as novas são acrescentadas. Cada partida aparece uma única vez no resultado, com os
+    mesmos tipos de uma temporada lida do cache (TIPOS_MEMORIA), venha o que vier da API.
+    """
+    if df_base is None or df_base.empty:
+        return _para_memoria(_para_disco(df_novos.reset_index(drop=True)))
+    df_novos = df_novos.copy()
+    df_novos['Date'] = pd.to_datetime(df_novos['Date'], utc=True)
+    df_base = df_base[~df_base['id'].isin(df_novos['id'])]
+    df = pd.concat([df_base, df_novos], ignore_index=True)
+    df = df.sort_values(by=['Date', 'id'], kind='stable').reset_index(drop=True)
+    return _para_memoria(_para_disco(df))
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache LRU de tamanho limitado e seguro entre threads.
+    Para nunca servir um valor de uma versão antiga dos dados/modelo, inclua a versão na chave
+    (ex.: (versao, casa, fora)) e chame `invalidar(nova_versao)` quando ela mudar, liberando o resto.
+    """
+
+    def __init__(self, capacidade=256):
+        self.capacidade = capacidade
+        self.versao = None
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            valor = self._itens.get(chave, _AUSENTE)
+            if valor is _AUSENTE:
+                self.falhas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o valor em cache ou calcula (fora do lock), guarda e devolve."""
+        valor = self.obter(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def invalidar(self, versao=None):
+        """Descarta tudo e passa a registrar `versao` como a atual."""
+        with self._lock:
+            self._itens.clear()
+            self.versao = versao
+
+    def __len__(self):
+        return len(self._itens)
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'tamanho': len(self._itens),
+                'capacidade': self.capacidade,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / total, 4) if total else 0.0,
+                'versao': self.versao,
+            }
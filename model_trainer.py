@@ -1,25 +1,102 @@
 import pandas as pd
+import numpy as np
+import sklearn
+import copy
+import hashlib
+import json
+import os
+import pickle
+import platform
+from concurrent.futures import ThreadPoolExecutor
+from scipy import sparse
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import OneHotEncoder
 
-def treinar_modelo(df_treino):
+from tracing import medido, definir, span
+
+# Versão do formato do cache de modelos (carregar_ou_treinar_modelo)
+MODELO_CACHE_VERSAO = 5
+
+# Solver e critério de parada, iguais para treino do zero, warm start e para os caminhos denso e
+# esparso. O newton-cholesky (Newton com a Hessiana exata, pequena aqui: colunas x classes)
+# converge em 3-5 iterações até o ótimo: denso e esparso coincidem a ~1e-15 e o warm start fica a
+# ~1e-8 de probabilidade do treino do zero. O lbfgs parava a ~1e-2 (tol=1e-4) e não passava de ~1e-5 entre
+# denso e esparso mesmo com tol menor, por causa das colunas sem escala (Elo na casa de 1500)
+SOLVER = 'newton-cholesky'
+SOLVER_TOL = 1e-8
+SOLVER_MAX_ITER = 100
+
+# Features base (numéricas) que já vêm do feature_engineering
+COLS_BASE = [
+    'ForcaGeral_Home', 'ForcaGeral_Away',
+    'FormaPontos_Home', 'FormaPontos_Away',
+    'MediaGolsMarcados_Home', 'MediaGolsMarcados_Away',
+    'MediaGolsSofridos_Home', 'MediaGolsSofridos_Away',
+    'Elo_Home', 'Elo_Away'
+]
+
+# Lista de alvos para treinar
+# Tuplas: (Nome da coluna no DataFrame, Chave para guardar no dicionário de modelos)
+ALVOS = [
+    ('Resultado', 'resultado'),
+    ('Target_Over25', 'over25'),
+    ('Target_BTTS', 'btts')
+]
+
+def _ajustar_alvo(X_final, y, key_modelo, anterior=None):
+    """
+    Ajusta o modelo de um alvo. Com `anterior` (mesmas colunas e classes), parte dos coeficientes
+    dele (warm start) em vez de do zero: poucas iterações quando só entraram alguns jogos.
+    Os dois chegam ao mesmo ótimo (ver SOLVER): o warm start só economiza iterações.
+    """
+    if anterior is not None and np.array_equal(anterior.classes_, np.unique(y)):
+        m = copy.deepcopy(anterior)
+        m.set_params(warm_start=True, solver=SOLVER, tol=SOLVER_TOL, max_iter=SOLVER_MAX_ITER)
+    else:
+        # Configuração do modelo Logístico
+        m = LogisticRegression(solver=SOLVER, max_iter=SOLVER_MAX_ITER, tol=SOLVER_TOL)
+
+    with span('modelo.fit', alvo=key_modelo, linhas=X_final.shape[0], colunas=X_final.shape[1],
+              warm_start=m.warm_start) as s:
+        m.fit(X_final, y)
+        s.definir(iteracoes=int(np.max(m.n_iter_)))
+    m.set_params(warm_start=False)
+    return m
+
+def ajustar_modelos(X_final, alvos, anteriores=None, n_workers=1):
+    """
+    Ajusta um modelo por alvo ({chave: y}) sobre uma matriz de features já montada, partindo
+    dos modelos `anteriores` ({chave: modelo}) quando houver. Devolve {chave: modelo}.
+    """
+    anteriores = anteriores or {}
+    tarefas = [(X_final, y, key_modelo, anteriores.get(key_modelo)) for key_modelo, y in alvos.items()]
+
+    # Os três ajustes são independentes: com n_workers > 1 rodam em threads. Fica desligado por
+    # padrão porque o ganho depende da máquina (o newton-cholesky passa a maior parte do tempo em BLAS, que já usa várias threads; medir
+    # com `python benchmark.py retreino --workers 1 3` antes de ligar)
+    if n_workers > 1 and len(tarefas) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            ajustados = list(pool.map(lambda t: _ajustar_alvo(*t), tarefas))
+    else:
+        ajustados = [_ajustar_alvo(*t) for t in tarefas]
+    return dict(zip(alvos, ajustados))
+
+@medido('modelo.treinar')
+def treinar_modelo(df_treino, esparso=True, anteriores=None, n_workers=1):
     """
     Treina três modelos distintos (Resultado, Over 2.5, BTTS) e retorna
     os modelos, o encoder e a lista de colunas finais para garantir a ordem na previsão.
+    Com `esparso` (padrão), os times ficam codificados numa matriz esparsa (CSR) empilhada
+    com o bloco numérico; `esparso=False` mantém o caminho denso antigo (DataFrame).
+
+    `anteriores` (modelos, encoder, colunas) de um treino passado ativa o modo incremental:
+    se as colunas forem as mesmas (mesmo conjunto de times), cada modelo parte dos coeficientes
+    anteriores; se mudarem, o treino é completo. Com `n_workers` > 1 os alvos são treinados em
+    threads (padrão: em sequência).
     """
-    print("Treinando modelos de previsão...")
-    
-    # Features base (numéricas) que já vêm do feature_engineering
-    cols_base = [
-        'ForcaGeral_Home', 'ForcaGeral_Away', 
-        'FormaPontos_Home', 'FormaPontos_Away', 
-        'MediaGolsMarcados_Home', 'MediaGolsMarcados_Away',
-        'MediaGolsSofridos_Home', 'MediaGolsSofridos_Away'
-    ]
-    
     # Verifica se todas as colunas base existem no DataFrame
     # (Segurança caso o feature_engineering mude no futuro)
-    cols_existentes = [c for c in cols_base if c in df_treino.columns]
+    cols_existentes = [c for c in COLS_BASE if c in df_treino.columns]
     
     # Separação das variáveis preditoras (X)
     # Começamos apenas com os times para o OneHotEncoder
@@ -27,43 +104,114 @@ def treinar_modelo(df_treino):
     
     # One-Hot Encoding para os nomes dos times
     # handle_unknown='ignore' é importante para não quebrar se aparecer um time novo no futuro
-    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-    
-    # Cria o DataFrame com as colunas dos times (ex: HomeTeam_Flamengo, AwayTeam_Palmeiras...)
-    X_enc = pd.DataFrame(
-        encoder.fit_transform(X_times), 
-        columns=encoder.get_feature_names_out(['HomeTeam', 'AwayTeam'])
-    )
-    
-    # Junta as features numéricas (Força, Forma, Gols) com as codificadas (Times)
-    # reset_index(drop=True) é vital para alinhar os índices na concatenação
-    X_final = pd.concat([X_enc, df_treino[cols_existentes].reset_index(drop=True)], axis=1)
-    
-    modelos = {}
+    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=esparso)
+    colunas_enc = encoder.fit(X_times).get_feature_names_out(['HomeTeam', 'AwayTeam']).tolist()
+    colunas_finais = colunas_enc + cols_existentes
+
+    modelos_anteriores = {}
+    if anteriores is not None and list(anteriores[2]) == colunas_finais:
+        modelos_anteriores = anteriores[0]
+        print("Atualizando modelos de previsão (warm start)...")
+    else:
+        print("Treinando modelos de previsão...")
+    definir(incremental=bool(modelos_anteriores))
+
+    if esparso:
+        # Só 2 valores não nulos por linha nos times: a matriz cresce com os jogos, não com times x jogos
+        X_final = sparse.hstack([
+            encoder.transform(X_times),
+            sparse.csr_matrix(df_treino[cols_existentes].to_numpy(dtype=float))
+        ], format='csr')
+    else:
+        # Cria o DataFrame com as colunas dos times (ex: HomeTeam_Flamengo, AwayTeam_Palmeiras...)
+        X_enc = pd.DataFrame(encoder.transform(X_times), columns=colunas_enc)
+
+        # Junta as features numéricas (Força, Forma, Gols) com as codificadas (Times)
+        # reset_index(drop=True) é vital para alinhar os índices na concatenação
+        X_final = pd.concat([X_enc, df_treino[cols_existentes].reset_index(drop=True)], axis=1)
+
+        # Ajuste sem nomes de colunas, como no caminho esparso: a ordem vem de colunas_finais e a
+        # previsão (CSR ou ndarray) não dispara o aviso de "feature names" do sklearn
+        X_final = X_final.to_numpy(dtype=float)
     
-    # Lista de alvos para treinar
-    # Tuplas: (Nome da coluna no DataFrame, Chave para guardar no dicionário de modelos)
-    alvos = [
-        ('Resultado', 'resultado'), 
-        ('Target_Over25', 'over25'), 
-        ('Target_BTTS', 'btts')
-    ]
-
-    for col_alvo, key_modelo in alvos:
-        if col_alvo in df_treino.columns:
-            # Configuração do modelo Logístico
-            # solver='lbfgs' é eficiente para datasets pequenos/médios
-            # max_iter=2000 garante convergência
-            m = LogisticRegression(solver='lbfgs', max_iter=2000)
-            
-            # Treina o modelo
-            m.fit(X_final, df_treino[col_alvo])
-            
-            # Salva no dicionário
-            modelos[key_modelo] = m
+    alvos = {key_modelo: df_treino[col_alvo].to_numpy() for col_alvo, key_modelo in ALVOS if col_alvo in df_treino.columns}
+    modelos = ajustar_modelos(X_final, alvos, modelos_anteriores, n_workers)
 
     # Retorna:
     # 1. Dicionário com os 3 modelos treinados
     # 2. O encoder usado para transformar os nomes dos times (precisaremos dele na previsão)
     # 3. A lista de colunas finais (CRUCIAL para garantir a mesma ordem na hora de prever)
-    return modelos, encoder, X_final.columns.tolist()
\ No newline at end of file
+    return modelos, encoder, colunas_finais
+
+def _hash_linhas(df_treino):
+    """Hash de cada linha do treino (times, features e alvos) e as colunas usadas."""
+    colunas = [c for c in ['HomeTeam', 'AwayTeam'] + COLS_BASE + [a for a, _ in ALVOS] if c in df_treino.columns]
+    return pd.util.hash_pandas_object(df_treino[colunas], index=False).to_numpy(), colunas
+
+def assinatura_treino(df_treino):
+    """
+    Impressão digital do treino: hash das linhas usadas (times, features e alvos), da lista de
+    colunas e das versões das bibliotecas. Qualquer mudança nos dados invalida o cache.
+    """
+    hash_linhas, colunas = _hash_linhas(df_treino)
+
+    h = hashlib.sha256(hash_linhas.tobytes())
+    h.update(json.dumps({
+        'colunas': colunas,
+        'cache': MODELO_CACHE_VERSAO,
+        'python': platform.python_version(),
+        'sklearn': sklearn.__version__,
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }, sort_keys=True).encode())
+    return h.hexdigest()
+
+@medido('modelo.carregar_ou_treinar')
+def carregar_ou_treinar_modelo(df_treino, caminho_cache, incremental=True, n_workers=1):
+    """
+    Igual a treinar_modelo, mas reaproveita os artefatos salvos em `caminho_cache` quando a
+    assinatura do treino não mudou. Cache ausente, corrompido ou incompatível leva a um novo treino.
+    Com `incremental`, o cache serve de ponto de partida (warm start) só quando o treino dele é
+    um prefixo do atual (jogos novos acrescentados no fim) e o conjunto de times é o mesmo;
+    qualquer outra mudança (placar corrigido, janela de temporadas deslocada) treina do zero,
+    então o modelo não depende de qual cache estava no disco.
+    """
+    assinatura = assinatura_treino(df_treino)
+    hash_linhas = _hash_linhas(df_treino)[0]
+    anteriores = None
+
+    try:
+        with open(caminho_cache, 'rb') as f:
+            artefato = pickle.load(f)
+        if artefato['assinatura'] == assinatura:
+            print("Modelos carregados do cache.")
+            definir(cache='hit')
+            return artefato['modelos'], artefato['encoder'], artefato['colunas_modelo']
+        linhas_cache = artefato.get('hash_linhas') if artefato.get('versao') == MODELO_CACHE_VERSAO else None
+        if incremental and linhas_cache is not None and len(linhas_cache) < len(hash_linhas) \
+                and np.array_equal(hash_linhas[:len(linhas_cache)], linhas_cache):
+            anteriores = (artefato['modelos'], artefato['encoder'], artefato['colunas_modelo'])
+    except Exception:
+        pass
+
+    definir(cache='miss', linhas=len(df_treino))
+    modelos, encoder, colunas_modelo = treinar_modelo(df_treino, anteriores=anteriores, n_workers=n_workers)
+
+    tmp = f"{caminho_cache}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'versao': MODELO_CACHE_VERSAO,
+                'assinatura': assinatura,
+                'hash_linhas': hash_linhas,
+                'modelos': modelos,
+                'encoder': encoder,
+                'colunas_modelo': colunas_modelo,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, caminho_cache)
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        print(f"Aviso: não foi possível salvar o cache de modelos: {e}")
+
+    return modelos, encoder, colunas_modelo
@@ -0,0 +1,203 @@
+import hashlib
+import threading
+import time
+
+import pandas as pd
+
+from feature_engineering import atualizar_dados_para_modelo
+from model_trainer import carregar_ou_treinar_modelo, assinatura_treino
+from predictor import PlanoInferencia
+from match_cache import carregar_temporadas, salvar_temporada, periodo_incremental, mesclar_por_id
+from tracing import medido, definir
+
+FUSO_EXIBICAO = 'America/Sao_Paulo'
+
+# Arquivos locais compartilhados pelo app e pela linha de comando
+CACHE_DIR = "atletiq_cache"
+CACHE_FILE = "atletiq_dataset.csv"  # cache CSV antigo, migrado para CACHE_DIR na primeira execução
+ESTADO_FILE = "atletiq_team_state.pkl"
+MODELO_FILE = "atletiq_modelos.pkl"
+
+
+class Etapa:
+    """
+    Etapa da inicialização que termina em segundo plano (features, modelo, artilharia...).
+    Guarda o resultado (ou o erro) e o tempo gasto, e avisa quem pediu para ser chamado ao final.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.resultado = None
+        self.erro = None
+        self.segundos = None
+        self._inicio = time.perf_counter()
+        self._pronta = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def pronta(self):
+        return self._pronta.is_set()
+
+    def concluir(self, resultado=None, erro=None):
+        with self._lock:
+            if self._pronta.is_set():
+                return
+            self.resultado, self.erro = resultado, erro
+            self.segundos = time.perf_counter() - self._inicio
+            self._pronta.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def ao_concluir(self, callback):
+        """Chama `callback(etapa)` quando a etapa terminar (na hora, se já terminou)."""
+        with self._lock:
+            if not self._pronta.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def aguardar(self, timeout=None):
+        """Bloqueia até a etapa terminar e devolve o resultado (relança o erro, se houve)."""
+        self._pronta.wait(timeout)
+        if self.erro is not None:
+            raise self.erro
+        return self.resultado
+
+
+def em_segundo_plano(funcao, *args):
+    """Roda `funcao(*args)` numa thread daemon (não segura o fechamento do app)."""
+    thread = threading.Thread(target=funcao, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def executar_etapa(etapa, funcao, *args):
+    """Executa `funcao` e registra o resultado (ou o erro) na etapa."""
+    try:
+        etapa.concluir(funcao(*args))
+    except Exception as e:
+        print(f"Erro na etapa {etapa.nome}: {e}")
+        etapa.concluir(erro=e)
+
+
+@medido('carga.partidas')
+def carregar_partidas(scraper, anos, ano_atual, cache_dir, csv_legado=None, progresso=print):
+    """
+    Junta cache local e API: temporadas encerradas vêm do cache, as demais são baixadas
+    (a temporada em andamento só na janela de datas recente) e regravadas no cache.
+    Com `scraper` None, usa só o cache, sem acessar a rede.
+    Retorna df_total com as datas no horário de Brasília, ou None se não houver dados.
+    """
+    temporadas_cache, manifesto = carregar_temporadas(cache_dir, anos, csv_legado=csv_legado)
+
+    # Temporadas encerradas ficam gravadas de vez no cache; as demais são baixadas em paralelo
+    anos_download = [
+        ano for ano in anos
+        if not (ano < ano_atual and manifesto.get(ano, {}).get('fechada'))
+    ]
+    # Temporada em andamento já salva: só a janela de datas recente é consultada
+    periodos = {}
+    periodo = periodo_incremental(temporadas_cache.get(ano_atual), pd.Timestamp.now(tz='UTC'))
+    if periodo is not None:
+        periodos[ano_atual] = periodo
+
+    downloads = {}
+    if scraper is not None:
+        progresso(f"Sincronizando {len(anos_download)} temporada(s)...")
+        downloads, _ = scraper.sincronizar(anos_download, periodos=periodos)
+
+    dfs_finais = []
+    for ano in anos:
+        df_download = downloads.get(ano)
+
+        if df_download is not None and not df_download.empty:
+            df_download['Date'] = pd.to_datetime(df_download['Date'], utc=True)
+            if ano in periodos:
+                df_download = mesclar_por_id(temporadas_cache[ano], df_download)
+            encerrada = ano < ano_atual and df_download['FTHG'].notna().all()
+            salvar_temporada(cache_dir, ano, df_download, fechada=encerrada)
+            dfs_finais.append(df_download)
+        elif ano in temporadas_cache:
+            # Temporada encerrada ou sem conexão: usa a versão salva
+            dfs_finais.append(temporadas_cache[ano])
+
+    if not dfs_finais:
+        return None
+
+    # Cada temporada já tem cada partida uma única vez (upsert por id)
+    df_total = pd.concat(dfs_finais).reset_index(drop=True)
+    df_total['Date'] = pd.to_datetime(df_total['Date'], utc=True)
+    # Converte para o horário de Brasília (UTC-3)
+    df_total['Date'] = df_total['Date'].dt.tz_convert(FUSO_EXIBICAO)
+    definir(temporadas=len(dfs_finais), baixadas=len(downloads), linhas=len(df_total))
+    return df_total
+
+
+def versao_partidas(df_total):
+    """Identificador curto dos jogos carregados: muda quando algum jogo, data ou placar muda."""
+    chaves = df_total[['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']]
+    return hashlib.sha1(pd.util.hash_pandas_object(chaves, index=False).to_numpy().tobytes()).hexdigest()[:12]
+
+
+def versao_recursos(df_total, df_treino):
+    """
+    Identificador curto dos dados + modelo em uso: muda quando algum jogo, placar ou
+    o treino muda (e só então), para invalidar caches de previsões e consultas.
+    """
+    h = hashlib.sha1(versao_partidas(df_total).encode())
+    h.update(assinatura_treino(df_treino).encode())
+    return h.hexdigest()[:12]
+
+
+@medido('carga.recursos')
+def preparar_recursos(df_total, caminho_estado=ESTADO_FILE, caminho_modelo=MODELO_FILE, n_workers=1):
+    """
+    Features e modelo de uma vez, sem etapas em segundo plano (linha de comando e servidor).
+    `n_workers` > 1 treina os alvos em threads (ver model_trainer.ajustar_modelos). Retorna o dict modelos/encoder/colunas_modelo/time_stats/df_treino/versao/plano.
+    """
+    df_res = df_total[df_total['FTHG'].notna()]
+    df_treino, time_stats = atualizar_dados_para_modelo(df_res, caminho_estado)
+    modelos, encoder, colunas_modelo = carregar_ou_treinar_modelo(df_treino, caminho_modelo, n_workers=n_workers)
+    return {
+        'modelos': modelos,
+        'encoder': encoder,
+        'colunas_modelo': colunas_modelo,
+        'time_stats': time_stats,
+        'df_treino': df_treino,
+        'versao': versao_recursos(df_total, df_treino),
+        'plano': PlanoInferencia(modelos, encoder, time_stats, colunas_modelo),
+    }
+
+
+@medido('carga.modelo')
+def preparar_modelo(df_total, caminho_estado, caminho_modelo, etapa_features, etapa_modelo, progresso=print,
+                    n_workers=1):
+    """
+    Features e modelo, em sequência: conclui `etapa_features` com o time_stats assim que ele
+    fica pronto (a forma recente já pode ser exibida) e `etapa_modelo` com um dict
+    modelos/encoder/colunas_modelo/time_stats/versao/plano depois do treino (ou do cache).
+    """
+    try:
+        progresso("Calculando features...")
+        df_res = df_total[df_total['FTHG'].notna()]
+        df_treino, time_stats = atualizar_dados_para_modelo(df_res, caminho_estado)
+        etapa_features.concluir(time_stats)
+
+        progresso("Treinando modelo...")
+        modelos, encoder, colunas_modelo = carregar_ou_treinar_modelo(df_treino, caminho_modelo, n_workers=n_workers)
+        etapa_modelo.concluir({
+            'modelos': modelos,
+            'encoder': encoder,
+            'colunas_modelo': colunas_modelo,
+            'time_stats': time_stats,
+            'versao': versao_recursos(df_total, df_treino),
+            'plano': PlanoInferencia(modelos, encoder, time_stats, colunas_modelo),
+        })
+        progresso("Modelo pronto")
+    except Exception as e:
+        print(f"Erro ao preparar o modelo: {e}")
+        progresso("Modelo indisponível")
+        for etapa in (etapa_features, etapa_modelo):
+            etapa.concluir(erro=e)
@@ -1,78 +1,255 @@
 import pandas as pd
 import numpy as np
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
 
-def preparar_features_jogo(time_casa, time_visitante, encoder, time_stats, colunas_modelo=None):
+from elo import ELO_INICIAL, elo_feature
+from feature_engineering import pontos_forma, elo_atual
+from tracing import medido, definir
+
+# Features numéricas de cada time, repetidas com os sufixos _Home e _Away
+FEATURES_TIME = ['ForcaGeral', 'FormaPontos', 'MediaGolsMarcados', 'MediaGolsSofridos', 'Elo']
+
+def _features_time(time, time_stats):
+    """Features numéricas de um time a partir do seu histórico (valores neutros se não houver histórico)."""
+    if time not in time_stats:
+        return {'ForcaGeral': 1.0, 'FormaPontos': 0, 'MediaGolsMarcados': 0, 'MediaGolsSofridos': 0, 'Elo': elo_feature(ELO_INICIAL)}
+    stats = time_stats[time]
+    return {
+        'ForcaGeral': np.mean(stats['pontos']) if stats['pontos'] else 1.0,
+        'FormaPontos': pontos_forma(time_stats, time, 5),
+        'MediaGolsMarcados': np.mean(stats['gm'][-5:]) if stats['gm'] else 0,
+        'MediaGolsSofridos': np.mean(stats['gs'][-5:]) if stats['gs'] else 0,
+        'Elo': elo_feature(elo_atual(time_stats, time)),
+    }
+
+def _features_numericas(df_jogos, time_stats):
     """
-    Função auxiliar para preparar a linha de dados de um único jogo.
+    Features numéricas (ForcaGeral_Home, ..., MediaGolsSofridos_Away) de vários jogos.
+    As estatísticas de cada time são calculadas uma única vez, mesmo que ele apareça em vários jogos.
     """
-    dados_jogo = {}
-    for time, lado in [(time_casa, 'Home'), (time_visitante, 'Away')]:
-        if time not in time_stats:
-            dados_jogo[f'ForcaGeral_{lado}'] = 1.0
-            dados_jogo[f'FormaPontos_{lado}'] = 0
-            dados_jogo[f'MediaGolsMarcados_{lado}'] = 0
-            dados_jogo[f'MediaGolsSofridos_{lado}'] = 0
-        else:
-            dados_jogo[f'ForcaGeral_{lado}'] = np.mean(time_stats[time]['pontos']) if time_stats[time]['pontos'] else 1.0
-            dados_jogo[f'FormaPontos_{lado}'] = sum(time_stats[time]['pontos'][-5:])
-            dados_jogo[f'MediaGolsMarcados_{lado}'] = np.mean(time_stats[time]['gm'][-5:]) if time_stats[time]['gm'] else 0
-            dados_jogo[f'MediaGolsSofridos_{lado}'] = np.mean(time_stats[time]['gs'][-5:]) if time_stats[time]['gs'] else 0
+    times = pd.unique(pd.concat([df_jogos['HomeTeam'], df_jogos['AwayTeam']]))
+    stats = {time: _features_time(time, time_stats) for time in times}
+
+    dados_num = {}
+    for col_time, lado in [('HomeTeam', 'Home'), ('AwayTeam', 'Away')]:
+        for feat in FEATURES_TIME:
+            dados_num[f'{feat}_{lado}'] = [stats[time][feat] for time in df_jogos[col_time]]
+    return pd.DataFrame(dados_num)
+
+def preparar_features_lote(df_jogos, encoder, time_stats, colunas_modelo=None):
+    """
+    Monta a matriz de features de vários jogos de uma vez (colunas HomeTeam/AwayTeam), como DataFrame denso.
+    """
+    df_jogos = df_jogos[['HomeTeam', 'AwayTeam']].reset_index(drop=True)
+    df_features_num = _features_numericas(df_jogos, time_stats)
 
-    df_jogo = pd.DataFrame([{'HomeTeam': time_casa, 'AwayTeam': time_visitante}])
     try:
-        df_jogo_encoded = pd.DataFrame(
-            encoder.transform(df_jogo[['HomeTeam', 'AwayTeam']]), 
+        codificado = encoder.transform(df_jogos)
+        df_jogos_encoded = pd.DataFrame(
+            codificado.toarray() if sparse.issparse(codificado) else codificado,
             columns=encoder.get_feature_names_out(['HomeTeam', 'AwayTeam'])
         )
     except:
-        df_jogo_encoded = pd.DataFrame()
+        df_jogos_encoded = pd.DataFrame(index=df_jogos.index)
+
+    X_input = pd.concat([df_jogos_encoded, df_features_num], axis=1)
 
-    df_features_num = pd.DataFrame([dados_jogo])
-    X_input = pd.concat([df_jogo_encoded, df_features_num], axis=1)
-    
     if colunas_modelo is not None:
-        for col in colunas_modelo:
-            if col not in X_input.columns:
-                X_input[col] = 0
-        X_input = X_input[colunas_modelo]
-        
+        X_input = X_input.reindex(columns=colunas_modelo, fill_value=0)
+
     return X_input
 
-def prever_jogo_especifico(time_casa, time_visitante, modelos, encoder, time_stats, colunas_modelo):
+def montar_matriz_lote(df_jogos, encoder, time_stats, colunas_modelo):
     """
-    Prevê Resultado, Over 2.5 e BTTS para um jogo específico.
+    Matriz de features esparsa (CSR) de vários jogos, na ordem de `colunas_modelo`: o one-hot
+    dos times sai esparso do encoder e é empilhado com o bloco numérico, sem materializar os zeros.
     """
-    X_input = preparar_features_jogo(time_casa, time_visitante, encoder, time_stats, colunas_modelo)
-    
-    if X_input is None or X_input.empty:
-        return {}
-    
-    odds = {}
+    df_jogos = df_jogos[['HomeTeam', 'AwayTeam']].reset_index(drop=True)
+    try:
+        codificado = encoder.transform(df_jogos)
+        colunas_enc = encoder.get_feature_names_out(['HomeTeam', 'AwayTeam']).tolist()
+    except Exception:
+        colunas_enc = None
+
+    # Layout inesperado (encoder falhou ou colunas fora da ordem do treino): caminho denso
+    if colunas_enc is None or list(colunas_modelo[:len(colunas_enc)]) != colunas_enc:
+        X_denso = preparar_features_lote(df_jogos, encoder, time_stats, colunas_modelo)
+        return sparse.csr_matrix(X_denso.to_numpy(dtype=float))
+
+    df_num = _features_numericas(df_jogos, time_stats).reindex(
+        columns=colunas_modelo[len(colunas_enc):], fill_value=0
+    )
+    return sparse.hstack([
+        sparse.csr_matrix(codificado),
+        sparse.csr_matrix(df_num.to_numpy(dtype=float))
+    ], format='csr')
+
+def preparar_features_jogo(time_casa, time_visitante, encoder, time_stats, colunas_modelo=None):
+    """
+    Função auxiliar para preparar a linha de dados de um único jogo.
+    """
+    df_jogo = pd.DataFrame([{'HomeTeam': time_casa, 'AwayTeam': time_visitante}])
+    return preparar_features_lote(df_jogo, encoder, time_stats, colunas_modelo)
+
+@medido('predicao.lote')
+def prever_lote(df_jogos, modelos, encoder, time_stats, colunas_modelo):
+    """
+    Prevê Resultado, Over 2.5 e BTTS para vários jogos com uma única matriz de features
+    e uma chamada de predict_proba por modelo.
+    Retorna um DataFrame com HomeTeam, AwayTeam e as probabilidades Casa/Empate/Visitante/Over25/BTTS.
+    """
+    df_saida = df_jogos[['HomeTeam', 'AwayTeam']].reset_index(drop=True)
+    if df_saida.empty:
+        return df_saida.reindex(columns=['HomeTeam', 'AwayTeam', 'Casa', 'Empate', 'Visitante', 'Over25', 'BTTS'])
+
+    definir(jogos=len(df_saida))
+    X_input = montar_matriz_lote(df_saida, encoder, time_stats, colunas_modelo)
 
     if 'resultado' in modelos:
         try:
-            probs_res = modelos['resultado'].predict_proba(X_input)[0]
-            classes_res = modelos['resultado'].classes_
-            odds = {classe: prob for classe, prob in zip(classes_res, probs_res)}
+            probs_res = modelos['resultado'].predict_proba(X_input)
+            for i, classe in enumerate(modelos['resultado'].classes_):
+                df_saida[classe] = probs_res[:, i]
         except Exception as e:
             print(f"Erro na previsão de resultado: {e}")
-    
-    if 'over25' in modelos:
-        try:
-            prob_over = modelos['over25'].predict_proba(X_input)[0][1] 
-            odds['Over25'] = prob_over
-        except:
-            odds['Over25'] = 0.0
-    
-    if 'btts' in modelos:
-        try:
-            prob_btts = modelos['btts'].predict_proba(X_input)[0][1]
-            odds['BTTS'] = prob_btts
-        except:
-            odds['BTTS'] = 0.0
-    
-    return odds
 
+    for key_modelo, col in [('over25', 'Over25'), ('btts', 'BTTS')]:
+        if key_modelo in modelos:
+            try:
+                df_saida[col] = modelos[key_modelo].predict_proba(X_input)[:, 1]
+            except:
+                df_saida[col] = 0.0
+
+    return df_saida
+
+def prever_jogo_especifico(time_casa, time_visitante, modelos, encoder, time_stats, colunas_modelo):
+    """
+    Prevê Resultado, Over 2.5 e BTTS para um jogo específico.
+    """
+    df_jogo = pd.DataFrame([{'HomeTeam': time_casa, 'AwayTeam': time_visitante}])
+    previsao = prever_lote(df_jogo, modelos, encoder, time_stats, colunas_modelo)
+    return previsao.drop(columns=['HomeTeam', 'AwayTeam']).iloc[0].to_dict()
+
+class PlanoInferencia:
+    """
+    Plano de inferência compilado uma vez após o treino: posição do slot one-hot de cada time
+    como mandante e visitante, posições das features numéricas, features de cada time já
+    calculadas e os coeficientes dos três modelos empilhados numa só matriz. Um jogo vira um
+    vetor preenchido direto num array pré-alocado e um único produto matriz-vetor
+    (softmax para o resultado, sigmoide para Over 2.5/BTTS). Mesmas saídas de prever_jogo_especifico.
+    Vários jogos de uma vez (`prever_pares`) viram uma matriz N x colunas e um só produto matricial.
+    """
+
+    def __init__(self, modelos, encoder, time_stats, colunas_modelo):
+        posicao = {col: i for i, col in enumerate(colunas_modelo)}
+        self.n_colunas = len(colunas_modelo)
+        self.slot_casa, self.slot_fora = {}, {}
+        for slots, lado, categorias in zip((self.slot_casa, self.slot_fora), ('HomeTeam', 'AwayTeam'), encoder.categories_):
+            for time in categorias:
+                if f'{lado}_{time}' in posicao:
+                    slots[time] = posicao[f'{lado}_{time}']
+
+        # Features numéricas ausentes de colunas_modelo são ignoradas, como no reindex do caminho em DataFrame
+        feats = {lado: [f for f in FEATURES_TIME if f'{f}_{lado}' in posicao] for lado in ('Home', 'Away')}
+        self.pos_casa = np.array([posicao[f'{f}_Home'] for f in feats['Home']], dtype=np.intp)
+        self.pos_fora = np.array([posicao[f'{f}_Away'] for f in feats['Away']], dtype=np.intp)
+        self._feats = feats
+        self.valores_casa, self.valores_fora = {}, {}
+        for time in time_stats:
+            self.valores_casa[time], self.valores_fora[time] = self._valores_time(time, time_stats)
+
+        self.classes = []
+        coefs, interceptos = [], []
+        if 'resultado' in modelos:
+            self.classes = [str(c) for c in modelos['resultado'].classes_]
+            # Com 2 classes o sklearn guarda uma única linha de coeficientes (logística binária)
+            # e a softmax abaixo daria probabilidades erradas sem aviso
+            if len(self.classes) < 3:
+                raise ValueError(
+                    f"Modelo 'resultado' treinado com {len(self.classes)} classe(s) ({', '.join(self.classes)}); "
+                    "o plano de inferência precisa de pelo menos 3 (Casa, Empate, Visitante)."
+                )
+            coefs.append(modelos['resultado'].coef_)
+            interceptos.append(modelos['resultado'].intercept_)
+        self.binarios = []
+        for key_modelo, col in [('over25', 'Over25'), ('btts', 'BTTS')]:
+            if key_modelo in modelos:
+                self.binarios.append(col)
+                coefs.append(modelos[key_modelo].coef_)
+                interceptos.append(modelos[key_modelo].intercept_)
+        self.coef = np.ascontiguousarray(np.vstack(coefs)) if coefs else np.zeros((0, self.n_colunas))
+        self.intercepto = np.concatenate(interceptos) if interceptos else np.zeros(0)
+        self._local = threading.local()
+
+    def _valores_time(self, time, time_stats):
+        stats = _features_time(time, time_stats)
+        return (np.array([stats[f] for f in self._feats['Home']], dtype=float),
+                np.array([stats[f] for f in self._feats['Away']], dtype=float))
+
+    def vetor(self, time_casa, time_visitante):
+        """Vetor de features do jogo no array pré-alocado desta thread (reaproveitado a cada chamada)."""
+        x = getattr(self._local, 'x', None)
+        if x is None:
+            x = self._local.x = np.zeros(self.n_colunas)
+        else:
+            x.fill(0.0)
+        self._preencher(x, time_casa, time_visitante)
+        return x
+
+    def _preencher(self, x, time_casa, time_visitante):
+        """Escreve as features do jogo em `x` (uma linha zerada com n_colunas posições)."""
+        # Time sem slot (desconhecido do encoder) fica com o one-hot zerado, como no handle_unknown='ignore'
+        i = self.slot_casa.get(time_casa)
+        if i is not None:
+            x[i] = 1.0
+        i = self.slot_fora.get(time_visitante)
+        if i is not None:
+            x[i] = 1.0
+
+        casa = self.valores_casa.get(time_casa)
+        if casa is None:
+            casa = self._valores_time(time_casa, {})[0]
+        fora = self.valores_fora.get(time_visitante)
+        if fora is None:
+            fora = self._valores_time(time_visitante, {})[1]
+        x[self.pos_casa] = casa
+        x[self.pos_fora] = fora
+
+    def prever(self, time_casa, time_visitante):
+        """Probabilidades Casa/Empate/Visitante/Over25/BTTS de um jogo (mesmo dict de prever_jogo_especifico)."""
+        logits = self.coef @ self.vetor(time_casa, time_visitante) + self.intercepto
+        k = len(self.classes)
+        saida = {}
+        if k:
+            z = logits[:k] - logits[:k].max()
+            e = np.exp(z)
+            saida.update(zip(self.classes, (e / e.sum()).tolist()))
+        saida.update(zip(self.binarios, (1.0 / (1.0 + np.exp(-logits[k:]))).tolist()))
+        return saida
+
+    def prever_pares(self, pares):
+        """Como `prever`, para uma lista de (casa, visitante): uma matriz N x colunas e um produto por lote."""
+        X = np.zeros((len(pares), self.n_colunas))
+        for linha, (time_casa, time_visitante) in zip(X, pares):
+            self._preencher(linha, time_casa, time_visitante)
+        logits = X @ self.coef.T + self.intercepto
+
+        k = len(self.classes)
+        colunas = []
+        if k:
+            e = np.exp(logits[:, :k] - logits[:, :k].max(axis=1, keepdims=True))
+            colunas.append((self.classes, e / e.sum(axis=1, keepdims=True)))
+        colunas.append((self.binarios, 1.0 / (1.0 + np.exp(-logits[:, k:]))))
+
+        saidas = [{} for _ in pares]
+        for nomes, valores in colunas:
+            for saida, linha in zip(saidas, valores.tolist()):
+                saida.update(zip(nomes, linha))
+        return saidas
+
+@medido('simulacao.deterministica')
 def simular_campeonato(rodada_final, df_jogos_futuros, df_resultados_atuais, modelos, encoder, time_stats, colunas_modelo):
     """
     Simula o restante do campeonato e retorna a tabela com a posição junto ao nome do time.
@@ -100,28 +277,28 @@ def simular_campeonato(rodada_final, df_jogos_futuros, df_resultados_atuais, mod
             else:
                 tabela[casa]['P'] += 1; tabela[casa]['E'] += 1; tabela[visitante]['P'] += 1; tabela[visitante]['E'] += 1
 
-    # 2. Simula jogos futuros
+    # 2. Simula jogos futuros (uma única matriz de features para todos os jogos)
     jogos_a_simular = df_jogos_futuros[pd.to_numeric(df_jogos_futuros['Rodada']) <= rodada_final]
-    
-    for _, jogo in jogos_a_simular.iterrows():
-        casa, visitante = jogo['HomeTeam'], jogo['AwayTeam']
-        if casa not in tabela or visitante not in tabela: continue
+    jogos_a_simular = jogos_a_simular[
+        jogos_a_simular['HomeTeam'].isin(tabela) & jogos_a_simular['AwayTeam'].isin(tabela)
+    ]
 
-        X_input = preparar_features_jogo(casa, visitante, encoder, time_stats, colunas_modelo)
-        
-        if X_input is not None and not X_input.empty:
-            try:
-                resultado_previsto = modelos['resultado'].predict(X_input)[0]
-                tabela[casa]['J'] += 1; tabela[visitante]['J'] += 1
-                
-                if resultado_previsto == 'Casa':
-                    tabela[casa]['P'] += 3; tabela[casa]['V'] += 1; tabela[visitante]['D'] += 1
-                elif resultado_previsto == 'Visitante':
-                    tabela[visitante]['P'] += 3; tabela[visitante]['V'] += 1; tabela[casa]['D'] += 1
-                else:
-                    tabela[casa]['P'] += 1; tabela[casa]['E'] += 1; tabela[visitante]['P'] += 1; tabela[visitante]['E'] += 1
-            except Exception:
-                continue
+    if not jogos_a_simular.empty:
+        X_input = montar_matriz_lote(jogos_a_simular, encoder, time_stats, colunas_modelo)
+        try:
+            resultados_previstos = modelos['resultado'].predict(X_input)
+        except Exception:
+            resultados_previstos = []
+
+        for casa, visitante, resultado_previsto in zip(jogos_a_simular['HomeTeam'], jogos_a_simular['AwayTeam'], resultados_previstos):
+            tabela[casa]['J'] += 1; tabela[visitante]['J'] += 1
+
+            if resultado_previsto == 'Casa':
+                tabela[casa]['P'] += 3; tabela[casa]['V'] += 1; tabela[visitante]['D'] += 1
+            elif resultado_previsto == 'Visitante':
+                tabela[visitante]['P'] += 3; tabela[visitante]['V'] += 1; tabela[casa]['D'] += 1
+            else:
+                tabela[casa]['P'] += 1; tabela[casa]['E'] += 1; tabela[visitante]['P'] += 1; tabela[visitante]['E'] += 1
 
     # 3. Formata para DataFrame
     df_tabela = pd.DataFrame.from_dict(tabela, orient='index')
@@ -135,4 +312,146 @@ def simular_campeonato(rodada_final, df_jogos_futuros, df_resultados_atuais, mod
         df_tabela['Time'] = (df_tabela.index + 1).astype(str) + "   " + df_tabela['Time']
     
     cols = ['Time', 'P', 'J', 'V', 'E', 'D', 'GP', 'GC', 'SG']
-    return df_tabela[cols] if not df_tabela.empty else pd.DataFrame(columns=cols)
\ No newline at end of file
+    return df_tabela[cols] if not df_tabela.empty else pd.DataFrame(columns=cols)
+
+# Tamanho fixo de cada shard do Monte Carlo: o número de shards depende só de n_simulacoes,
+# nunca do número de workers, o que garante o mesmo resultado com 1 ou N processos.
+TAMANHO_SHARD = 10000
+
+# Faixas de classificação usadas no resumo da simulação (mesmas da legenda da tabela no app).
+# A zona de rebaixamento é sempre formada pelas 4 últimas posições.
+ZONAS_TABELA = {
+    'Titulo': (1, 1),
+    'Libertadores': (1, 5),
+    'SulAmericana': (6, 11),
+}
+
+def _tabela_atual_arrays(df_resultados_atuais, times):
+    """Pontos, vitórias e saldo de gols atuais de cada time, na ordem de `times`."""
+    idx = {time: i for i, time in enumerate(times)}
+    casa = df_resultados_atuais['HomeTeam'].map(idx).to_numpy()
+    vis = df_resultados_atuais['AwayTeam'].map(idx).to_numpy()
+    g_casa = df_resultados_atuais['FTHG'].to_numpy(dtype=float)
+    g_vis = df_resultados_atuais['FTAG'].to_numpy(dtype=float)
+    n = len(times)
+
+    pontos = (np.bincount(casa, weights=np.where(g_casa > g_vis, 3, np.where(g_casa == g_vis, 1, 0)), minlength=n)
+              + np.bincount(vis, weights=np.where(g_vis > g_casa, 3, np.where(g_casa == g_vis, 1, 0)), minlength=n))
+    vitorias = (np.bincount(casa, weights=g_casa > g_vis, minlength=n)
+                + np.bincount(vis, weights=g_vis > g_casa, minlength=n))
+    saldo = (np.bincount(casa, weights=g_casa - g_vis, minlength=n)
+             + np.bincount(vis, weights=g_vis - g_casa, minlength=n))
+    return pontos, vitorias, saldo
+
+def _simular_temporadas(probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, rng, tamanho_lote=5000):
+    """
+    Núcleo vetorizado do Monte Carlo: sorteia o resultado de todos os jogos (matriz simulações x jogos)
+    a partir das probabilidades Casa/Empate/Visitante e acumula, por time, a soma de pontos finais
+    e o histograma de posições (times x posições).
+    """
+    n_times, n_jogos = len(pontos), len(idx_casa)
+    mando_casa = np.zeros((n_jogos, n_times)); mando_casa[np.arange(n_jogos), idx_casa] = 1
+    mando_vis = np.zeros((n_jogos, n_times)); mando_vis[np.arange(n_jogos), idx_vis] = 1
+    lim_casa = probs[:, 0]
+    lim_empate = probs[:, 0] + probs[:, 1]
+
+    soma_pontos = np.zeros(n_times)
+    histograma = np.zeros((n_times, n_times), dtype=np.int64)
+
+    for inicio in range(0, n_simulacoes, tamanho_lote):
+        n_lote = min(tamanho_lote, n_simulacoes - inicio)
+        u = rng.random((n_lote, n_jogos))
+        vitoria_casa = u < lim_casa
+        empate = ~vitoria_casa & (u < lim_empate)
+        vitoria_vis = ~vitoria_casa & ~empate
+
+        pts = pontos + (3 * vitoria_casa + empate) @ mando_casa + (3 * vitoria_vis + empate) @ mando_vis
+        vit = vitorias + vitoria_casa @ mando_casa + vitoria_vis @ mando_vis
+
+        # Critérios: pontos, vitórias, saldo atual; empates restantes são decididos por sorteio
+        chave = pts * 1e6 + vit * 1e3 + saldo + rng.random((n_lote, n_times))
+        ordem = np.argsort(-chave, axis=1)
+        histograma += np.bincount(
+            (ordem * n_times + np.arange(n_times)).ravel(), minlength=n_times * n_times
+        ).reshape(n_times, n_times)
+        soma_pontos += pts.sum(axis=0)
+
+    return soma_pontos, histograma
+
+def _simular_shard(args):
+    """Executa um shard do Monte Carlo com seu próprio gerador (usado pelos processos do pool)."""
+    probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, seed_seq = args
+    return _simular_temporadas(
+        probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, np.random.default_rng(seed_seq)
+    )
+
+@medido('simulacao.sorteios')
+def simular_monte_carlo_paralelo(probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, seed=None, n_workers=1):
+    """
+    Divide as simulações em shards de TAMANHO_SHARD, cada um com um fluxo aleatório independente
+    derivado de uma única semente mestre (SeedSequence.spawn), e soma os histogramas no fim.
+    O resultado é idêntico para qualquer `n_workers`; com n_workers > 1 os shards rodam em processos.
+    """
+    tamanhos = [min(TAMANHO_SHARD, n_simulacoes - i) for i in range(0, n_simulacoes, TAMANHO_SHARD)]
+    seeds = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    tarefas = [(probs, idx_casa, idx_vis, pontos, vitorias, saldo, n, s) for n, s in zip(tamanhos, seeds)]
+    definir(simulacoes=n_simulacoes, shards=len(tarefas), workers=n_workers)
+
+    if n_workers > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tarefas))) as pool:
+            parciais = list(pool.map(_simular_shard, tarefas))
+    else:
+        parciais = [_simular_shard(t) for t in tarefas]
+
+    soma_pontos = np.zeros(len(pontos))
+    histograma = np.zeros((len(pontos), len(pontos)), dtype=np.int64)
+    for soma_shard, hist_shard in parciais:
+        soma_pontos += soma_shard
+        histograma += hist_shard
+    return soma_pontos, histograma
+
+@medido('simulacao.monte_carlo')
+def simular_campeonato_monte_carlo(rodada_final, df_jogos_futuros, df_resultados_atuais, modelos, encoder, time_stats, colunas_modelo, n_simulacoes=10000, seed=None, n_workers=1):
+    """
+    Simula o restante do campeonato `n_simulacoes` vezes, sorteando cada jogo a partir das
+    probabilidades do modelo. Retorna, por time, os pontos esperados, a chance de título,
+    Libertadores, Sul-Americana e rebaixamento e a probabilidade de cada posição (Pos_1, Pos_2, ...).
+    Com `n_workers` > 1 os lotes de simulações são distribuídos em processos; o resultado para
+    uma mesma `seed` não depende do número de workers.
+    """
+    times = sorted(set(df_resultados_atuais['HomeTeam']).union(set(df_resultados_atuais['AwayTeam'])))
+    n_times = len(times)
+    colunas_pos = [f'Pos_{i}' for i in range(1, n_times + 1)]
+    cols = ['Time', 'P', 'Titulo', 'Libertadores', 'SulAmericana', 'Rebaixamento'] + colunas_pos
+    if n_times == 0:
+        return pd.DataFrame(columns=cols)
+
+    jogos_a_simular = df_jogos_futuros[pd.to_numeric(df_jogos_futuros['Rodada']) <= rodada_final]
+    jogos_a_simular = jogos_a_simular[
+        jogos_a_simular['HomeTeam'].isin(times) & jogos_a_simular['AwayTeam'].isin(times)
+    ]
+
+    definir(times=n_times, jogos=len(jogos_a_simular), simulacoes=n_simulacoes)
+    previsoes = prever_lote(jogos_a_simular, modelos, encoder, time_stats, colunas_modelo)
+    probs = previsoes.reindex(columns=['Casa', 'Empate', 'Visitante']).fillna(0).to_numpy(dtype=float, copy=True)
+    # Jogos sem probabilidade válida viram empate certo, em vez de quebrar a simulação
+    probs[probs.sum(axis=1) == 0] = [0, 1, 0]
+    probs = probs / probs.sum(axis=1, keepdims=True)
+
+    idx = {time: i for i, time in enumerate(times)}
+    idx_casa = previsoes['HomeTeam'].map(idx).to_numpy(dtype=int)
+    idx_vis = previsoes['AwayTeam'].map(idx).to_numpy(dtype=int)
+    pontos, vitorias, saldo = _tabela_atual_arrays(df_resultados_atuais, times)
+
+    soma_pontos, histograma = simular_monte_carlo_paralelo(
+        probs, idx_casa, idx_vis, pontos, vitorias, saldo, n_simulacoes, seed=seed, n_workers=n_workers
+    )
+
+    prob_pos = histograma / n_simulacoes
+    zonas = dict(ZONAS_TABELA, Rebaixamento=(n_times - 3, n_times))
+    df_tabela = pd.DataFrame({'Time': times, 'P': soma_pontos / n_simulacoes})
+    for zona, (ini, fim) in zonas.items():
+        df_tabela[zona] = prob_pos[:, ini - 1:fim].sum(axis=1)
+    df_tabela = pd.concat([df_tabela, pd.DataFrame(prob_pos, columns=colunas_pos)], axis=1)
+
+    return df_tabela.sort_values(by=['P', 'Titulo'], ascending=False).reset_index(drop=True)[cols]
@@ -0,0 +1,260 @@
+"""
+Motor de placares Poisson/Dixon-Coles: um único ajuste (ataque e defesa de cada time + mando
+de campo) gera a grade de probabilidades de placar de cada jogo, e todos os mercados saem dela
+em forma fechada (1X2, Over/Under em qualquer linha, BTTS). Alternativa aos três classificadores
+do model_trainer; também sorteia gols para o Monte Carlo da tabela (GP/GC/SG realistas).
+"""
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize, minimize_scalar
+from scipy.stats import poisson
+
+from predictor import ZONAS_TABELA
+from tracing import medido, definir
+
+# Placar máximo considerado por time na grade (a massa acima disso é desprezível e renormalizada)
+MAX_GOLS = 10
+
+# Regularização mínima para o problema ficar bem posto (ataque/defesa são definidos a menos de uma constante)
+L2 = 1e-6
+
+
+def _pesos_tempo(datas, meia_vida_dias):
+    """Peso de cada jogo: 1 para o mais recente, caindo pela metade a cada `meia_vida_dias`."""
+    if meia_vida_dias is None:
+        return np.ones(len(datas))
+    idade = (datas.max() - datas).dt.total_seconds().to_numpy() / 86400
+    return 0.5 ** (idade / meia_vida_dias)
+
+
+def _tau(gols_casa, gols_fora, lam, mu, rho):
+    """Correção de Dixon-Coles para os placares baixos (0x0, 1x0, 0x1, 1x1); 1 nos demais."""
+    tau = np.ones(np.broadcast(gols_casa, gols_fora, lam).shape)
+    tau = np.where((gols_casa == 0) & (gols_fora == 0), 1 - lam * mu * rho, tau)
+    tau = np.where((gols_casa == 0) & (gols_fora == 1), 1 + lam * rho, tau)
+    tau = np.where((gols_casa == 1) & (gols_fora == 0), 1 + mu * rho, tau)
+    tau = np.where((gols_casa == 1) & (gols_fora == 1), 1 - rho, tau)
+    return tau
+
+
+@medido('placar.treinar')
+def treinar_modelo_placar(df_resultados, meia_vida_dias=365, max_gols=MAX_GOLS):
+    """
+    Ajusta o modelo de placares nos jogos com resultado (HomeTeam, AwayTeam, FTHG, FTAG, Date):
+        gols mandante  ~ Poisson(exp(intercepto + mando + ataque[casa] - defesa[fora]))
+        gols visitante ~ Poisson(exp(intercepto + ataque[fora] - defesa[casa]))
+    por máxima verossimilhança (L-BFGS com gradiente analítico), seguido do rho de Dixon-Coles.
+    Jogos antigos pesam menos (meia-vida em dias; None = todos iguais).
+    Retorna um dict com times, ataque, defesa, intercepto, mando, rho e max_gols.
+    """
+    df = df_resultados.dropna(subset=['FTHG', 'FTAG'])
+    times = sorted(set(df['HomeTeam']).union(df['AwayTeam']))
+    indice = {time: i for i, time in enumerate(times)}
+    casa = df['HomeTeam'].map(indice).to_numpy()
+    fora = df['AwayTeam'].map(indice).to_numpy()
+    gols_casa = df['FTHG'].to_numpy(dtype=float)
+    gols_fora = df['FTAG'].to_numpy(dtype=float)
+    pesos = _pesos_tempo(df['Date'], meia_vida_dias)
+    n = len(times)
+    definir(jogos=len(df), times=n)
+
+    def custo(theta):
+        ataque, defesa, intercepto, mando = theta[:n], theta[n:2 * n], theta[2 * n], theta[2 * n + 1]
+        eta_casa = intercepto + mando + ataque[casa] - defesa[fora]
+        eta_fora = intercepto + ataque[fora] - defesa[casa]
+        lam, mu = np.exp(eta_casa), np.exp(eta_fora)
+        # -log verossimilhança de Poisson (sem o termo log(k!), constante)
+        valor = np.sum(pesos * (lam - gols_casa * eta_casa + mu - gols_fora * eta_fora)) + L2 * theta @ theta
+
+        r_casa, r_fora = pesos * (lam - gols_casa), pesos * (mu - gols_fora)
+        grad = np.empty_like(theta)
+        grad[:n] = np.bincount(casa, r_casa, n) + np.bincount(fora, r_fora, n)
+        grad[n:2 * n] = -np.bincount(fora, r_casa, n) - np.bincount(casa, r_fora, n)
+        grad[2 * n] = r_casa.sum() + r_fora.sum()
+        grad[2 * n + 1] = r_casa.sum()
+        return valor, grad + 2 * L2 * theta
+
+    theta0 = np.zeros(2 * n + 2)
+    theta0[2 * n] = np.log(max(np.average(np.r_[gols_casa, gols_fora], weights=np.r_[pesos, pesos]), 1e-3))
+    theta = minimize(custo, theta0, jac=True, method='L-BFGS-B').x
+
+    # Ataque e defesa centrados em zero; o intercepto absorve a diferença (mesmas taxas de gols)
+    ataque, defesa = theta[:n], theta[n:2 * n]
+    intercepto = theta[2 * n] + ataque.mean() - defesa.mean()
+    ataque, defesa = ataque - ataque.mean(), defesa - defesa.mean()
+    mando = theta[2 * n + 1]
+
+    # rho de Dixon-Coles com as taxas fixas (só os placares baixos dependem dele)
+    lam = np.exp(intercepto + mando + ataque[casa] - defesa[fora])
+    mu = np.exp(intercepto + ataque[fora] - defesa[casa])
+    baixo = (gols_casa <= 1) & (gols_fora <= 1)
+    limite = min(0.3, 1 / np.max(lam[baixo] * mu[baixo])) if baixo.any() else 0.3
+
+    def custo_rho(rho):
+        tau = _tau(gols_casa[baixo], gols_fora[baixo], lam[baixo], mu[baixo], rho)
+        return -np.sum(pesos[baixo] * np.log(np.maximum(tau, 1e-12)))
+
+    rho = minimize_scalar(custo_rho, bounds=(-limite, limite), method='bounded').x if baixo.any() else 0.0
+
+    return {
+        'times': times,
+        'indice': indice,
+        'ataque': ataque,
+        'defesa': defesa,
+        'intercepto': float(intercepto),
+        'mando': float(mando),
+        'rho': float(rho),
+        'max_gols': max_gols,
+    }
+
+
+def taxas_gols(modelo, times_casa, times_fora):
+    """Gols esperados (lambda do mandante, mu do visitante) de cada jogo; time desconhecido = média."""
+    ataque = np.append(modelo['ataque'], 0.0)
+    defesa = np.append(modelo['defesa'], 0.0)
+    desconhecido = len(modelo['times'])
+    casa = np.array([modelo['indice'].get(t, desconhecido) for t in times_casa], dtype=np.intp)
+    fora = np.array([modelo['indice'].get(t, desconhecido) for t in times_fora], dtype=np.intp)
+    lam = np.exp(modelo['intercepto'] + modelo['mando'] + ataque[casa] - defesa[fora])
+    mu = np.exp(modelo['intercepto'] + ataque[fora] - defesa[casa])
+    return lam, mu
+
+
+def grade_placares(modelo, times_casa, times_fora):
+    """
+    Grade de probabilidades de placar (jogos x gols mandante x gols visitante), de 0 a max_gols,
+    com a correção de Dixon-Coles e renormalizada. Vetorizada em todos os jogos.
+    """
+    lam, mu = taxas_gols(modelo, times_casa, times_fora)
+    gols = np.arange(modelo['max_gols'] + 1)
+    grade = poisson.pmf(gols, lam[:, None])[:, :, None] * poisson.pmf(gols, mu[:, None])[:, None, :]
+    grade[:, :2, :2] *= _tau(gols[:2, None], gols[None, :2], lam[:, None, None], mu[:, None, None], modelo['rho'])
+    return grade / grade.sum(axis=(1, 2), keepdims=True)
+
+
+def _nome_linha(linha):
+    """2.5 -> '25', 0.5 -> '05' (mesma convenção da coluna Over25)."""
+    return f"{linha:g}".replace('.', '')
+
+
+def mercados(grade, linhas_gols=(2.5,)):
+    """
+    Mercados de cada jogo a partir da grade, em forma fechada: Casa/Empate/Visitante,
+    Over/Under para cada linha de gols (pela distribuição do total de gols) e BTTS.
+    """
+    n_jogos, g, _ = grade.shape
+    # Distribuição do total de gols: soma das antidiagonais da grade (x + y = t)
+    total = np.add.outer(np.arange(g), np.arange(g)).ravel()
+    dist_total = grade.reshape(n_jogos, -1) @ (total[:, None] == np.arange(2 * g - 1)).astype(float)
+
+    saida = {
+        'Casa': np.tril(grade, -1).sum(axis=(1, 2)),
+        'Empate': np.einsum('ijj->i', grade),
+        'Visitante': np.triu(grade, 1).sum(axis=(1, 2)),
+    }
+    for linha in linhas_gols:
+        over = dist_total[:, int(np.floor(linha)) + 1:].sum(axis=1)
+        saida[f'Over{_nome_linha(linha)}'] = over
+        saida[f'Under{_nome_linha(linha)}'] = 1 - over
+    saida['BTTS'] = grade[:, 1:, 1:].sum(axis=(1, 2))
+    return saida
+
+
+@medido('placar.prever')
+def prever_placar_lote(modelo, df_jogos, linhas_gols=(2.5,)):
+    """
+    Prevê vários jogos (colunas HomeTeam/AwayTeam) com o modelo de placares. Retorna um DataFrame
+    com HomeTeam, AwayTeam, Casa, Empate, Visitante, Over/Under de cada linha, BTTS, os gols
+    esperados e o placar mais provável.
+    """
+    df_saida = df_jogos[['HomeTeam', 'AwayTeam']].reset_index(drop=True)
+    definir(jogos=len(df_saida))
+    grade = grade_placares(modelo, df_saida['HomeTeam'], df_saida['AwayTeam'])
+    for coluna, valores in mercados(grade, linhas_gols).items():
+        df_saida[coluna] = valores
+
+    lam, mu = taxas_gols(modelo, df_saida['HomeTeam'], df_saida['AwayTeam'])
+    df_saida['GolsCasa'], df_saida['GolsVisitante'] = lam, mu
+    mais_provavel = grade.reshape(len(df_saida), -1).argmax(axis=1)
+    g = grade.shape[1]
+    df_saida['Placar'] = [f"{i // g}x{i % g}" for i in mais_provavel]
+    return df_saida
+
+
+def sortear_gols(grade, n_simulacoes, rng):
+    """
+    Sorteia placares para todos os jogos de uma vez (simulações x jogos), por busca binária
+    (searchsorted) nas distribuições acumuladas da grade, deslocadas de 1 em 1 por jogo para
+    formar um único vetor crescente. Retorna (gols mandante, gols visitante).
+    """
+    n_jogos, g, _ = grade.shape
+    acumulada = np.cumsum(grade.reshape(n_jogos, -1), axis=1)
+    acumulada[:, -1] = 1.0
+    acumulada = (acumulada + np.arange(n_jogos)[:, None]).ravel()
+
+    u = rng.random((n_simulacoes, n_jogos)) + np.arange(n_jogos)
+    celula = np.searchsorted(acumulada, u, side='right') - np.arange(n_jogos) * g * g
+    return celula // g, celula % g
+
+
+@medido('placar.simulacao')
+def simular_campeonato_placar(rodada_final, df_jogos_futuros, df_resultados_atuais, modelo, n_simulacoes=10000,
+                              seed=None, tamanho_lote=2000):
+    """
+    Monte Carlo da tabela sorteando o placar de cada jogo restante da grade do modelo de placares.
+    Desempates por pontos, vitórias, saldo e gols pró (todos simulados), depois sorteio.
+    Mesmas colunas de simular_campeonato_monte_carlo, mais GP, GC e SG esperados.
+    """
+    times = sorted(set(df_resultados_atuais['HomeTeam']).union(set(df_resultados_atuais['AwayTeam'])))
+    n_times = len(times)
+    colunas_pos = [f'Pos_{i}' for i in range(1, n_times + 1)]
+    cols = ['Time', 'P', 'GP', 'GC', 'SG', 'Titulo', 'Libertadores', 'SulAmericana', 'Rebaixamento'] + colunas_pos
+    if n_times == 0:
+        return pd.DataFrame(columns=cols)
+
+    jogos = df_jogos_futuros[pd.to_numeric(df_jogos_futuros['Rodada']) <= rodada_final]
+    jogos = jogos[jogos['HomeTeam'].isin(times) & jogos['AwayTeam'].isin(times)]
+    definir(times=n_times, jogos=len(jogos), simulacoes=n_simulacoes)
+
+    idx = {time: i for i, time in enumerate(times)}
+    grade = grade_placares(modelo, jogos['HomeTeam'], jogos['AwayTeam'])
+
+    def acumular(df, gols_casa, gols_fora):
+        """Pontos, vitórias, gols pró e contra por time (última dimensão = times), via matrizes de mando."""
+        mando_casa = np.zeros((len(df), n_times)); mando_casa[np.arange(len(df)), df['HomeTeam'].map(idx)] = 1
+        mando_fora = np.zeros((len(df), n_times)); mando_fora[np.arange(len(df)), df['AwayTeam'].map(idx)] = 1
+        vitoria_casa, empate, vitoria_fora = gols_casa > gols_fora, gols_casa == gols_fora, gols_fora > gols_casa
+        return (
+            (3 * vitoria_casa + empate) @ mando_casa + (3 * vitoria_fora + empate) @ mando_fora,
+            vitoria_casa @ mando_casa + vitoria_fora @ mando_fora,
+            gols_casa @ mando_casa + gols_fora @ mando_fora,
+            gols_fora @ mando_casa + gols_casa @ mando_fora,
+        )
+
+    base = acumular(df_resultados_atuais, df_resultados_atuais['FTHG'].to_numpy(dtype=float),
+                    df_resultados_atuais['FTAG'].to_numpy(dtype=float))
+    rng = np.random.default_rng(seed)
+    somas = np.zeros((4, n_times))
+    histograma = np.zeros((n_times, n_times), dtype=np.int64)
+
+    for inicio in range(0, n_simulacoes, tamanho_lote):
+        n_lote = min(tamanho_lote, n_simulacoes - inicio)
+        gols_casa, gols_fora = sortear_gols(grade, n_lote, rng)
+        pts, vit, gp, gc = (b + s for b, s in zip(base, acumular(jogos, gols_casa, gols_fora)))
+
+        chave = pts * 1e9 + vit * 1e6 + (gp - gc + 500) * 1e3 + gp + rng.random((n_lote, n_times))
+        ordem = np.argsort(-chave, axis=1)
+        histograma += np.bincount(
+            (ordem * n_times + np.arange(n_times)).ravel(), minlength=n_times * n_times
+        ).reshape(n_times, n_times)
+        somas += np.stack([pts.sum(axis=0), gp.sum(axis=0), gc.sum(axis=0), (gp - gc).sum(axis=0)])
+
+    medias = somas / n_simulacoes
+    prob_pos = histograma / n_simulacoes
+    zonas = dict(ZONAS_TABELA, Rebaixamento=(n_times - 3, n_times))
+    df_tabela = pd.DataFrame({'Time': times, 'P': medias[0], 'GP': medias[1], 'GC': medias[2], 'SG': medias[3]})
+    for zona, (ini, fim) in zonas.items():
+        df_tabela[zona] = prob_pos[:, ini - 1:fim].sum(axis=1)
+    df_tabela = pd.concat([df_tabela, pd.DataFrame(prob_pos, columns=colunas_pos)], axis=1)
+
+    return df_tabela.sort_values(by=['P', 'Titulo'], ascending=False).reset_index(drop=True)[cols]
@@ -0,0 +1,343 @@
+"""
+Serviço HTTP local com as previsões do AtletiQ (sem Flet). Mantém em memória os dados,
+time_stats, encoder e modelos, e responde JSON.
+
+Uso:
+    python server.py --porta 8765 [--sincronizar]
+
+Endpoints:
+    GET  /saude                          versão dos dados/modelo e estatísticas dos caches
+    GET  /times                          times da base
+    GET  /prever?casa=A&fora=B           probabilidades Casa/Empate/Visitante/Over25/BTTS
+    POST /prever  {"jogos": [{"casa": A, "fora": B}, ...]}
+    GET  /h2h?time_a=A&time_b=B          confronto direto (resumo + últimos jogos)
+    GET  /simular?simulacoes=N&seed=S    Monte Carlo da tabela final da temporada atual (N até MAX_SIMULACOES)
+    POST /recarregar                     relê cache/API e troca dados e modelo (nova versão)
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from analysis import derivar_indice_h2h, gerar_confronto_direto
+from memo import CacheLRU
+from pipeline import carregar_partidas, preparar_recursos, CACHE_DIR, CACHE_FILE, ESTADO_FILE, MODELO_FILE
+from predictor import simular_campeonato_monte_carlo
+
+COLUNAS_PREVISAO = ['Casa', 'Empate', 'Visitante', 'Over25', 'BTTS']
+# Limites por requisição: uma só chamada não pode prender a CPU do serviço
+MAX_SIMULACOES = 100000
+MAX_JOGOS_POR_PEDIDO = 1000
+
+
+class AgrupadorLotes:
+    """
+    Junta pedidos concorrentes num único lote: o primeiro pedido abre uma janela de
+    `janela` segundos (ou até `max_lote` pedidos) e todos são resolvidos por uma só
+    chamada de `processar(itens) -> resultados` (mesma ordem). Cada pedido recebe um Future.
+    """
+
+    def __init__(self, processar, janela=0.005, max_lote=256):
+        self.processar = processar
+        self.janela = janela
+        self.max_lote = max_lote
+        self.lotes = 0
+        self.itens_processados = 0
+        self._fila = queue.Queue()
+        threading.Thread(target=self._laco, daemon=True, name="agrupador-lotes").start()
+
+    def enviar(self, item):
+        futuro = Future()
+        self._fila.put((item, futuro))
+        return futuro
+
+    def _laco(self):
+        while True:
+            pendentes = [self._fila.get()]
+            limite = time.perf_counter() + self.janela
+            while len(pendentes) < self.max_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    pendentes.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            itens = [item for item, _ in pendentes]
+            try:
+                resultados = self.processar(itens)
+                for (_, futuro), resultado in zip(pendentes, resultados):
+                    futuro.set_result(resultado)
+            except Exception as e:
+                for _, futuro in pendentes:
+                    futuro.set_exception(e)
+            self.lotes += 1
+            self.itens_processados += len(itens)
+
+
+class ServicoPrevisao:
+    """Estado do serviço: recursos em memória (trocados de uma vez ao recarregar), caches e agrupador."""
+
+    def __init__(self, anos, ano_atual, sincronizar=False, janela=0.005, tamanho_cache=1024):
+        self.anos = anos
+        self.ano_atual = ano_atual
+        self.sincronizar = sincronizar
+        self.cache_previsoes = CacheLRU(tamanho_cache)
+        self.cache_consultas = CacheLRU(max(tamanho_cache // 4, 16))
+        self.agrupador = AgrupadorLotes(self._prever_itens, janela=janela)
+        self._lock_recarga = threading.Lock()
+        self.recursos = None
+        self.recarregar()
+
+    def recarregar(self):
+        """Monta os recursos novos fora do caminho das requisições e troca a referência de uma vez."""
+        with self._lock_recarga:
+            scraper = None
+            if self.sincronizar:
+                from web_scraper import AtletiQScraper
+                scraper = AtletiQScraper()
+            df_total = carregar_partidas(scraper, self.anos, self.ano_atual, CACHE_DIR, csv_legado=CACHE_FILE)
+            if df_total is None:
+                raise RuntimeError("Sem dados no cache (rode com --sincronizar).")
+
+            anterior = self.recursos
+            recursos = preparar_recursos(df_total, ESTADO_FILE, MODELO_FILE)
+            recursos['df_total'] = df_total
+            # Só os jogos novos/corrigidos desde a versão anterior entram no índice de confronto direto
+            indice_anterior, df_anterior = (anterior['indice_h2h'], anterior['df_total']) if anterior else (None, None)
+            recursos['indice_h2h'] = derivar_indice_h2h(indice_anterior, df_anterior, df_total)
+            recursos['times'] = sorted(set(df_total['HomeTeam']).union(df_total['AwayTeam']))
+
+            if self.recursos is None or recursos['versao'] != self.recursos['versao']:
+                self.cache_previsoes.invalidar(recursos['versao'])
+                self.cache_consultas.invalidar(recursos['versao'])
+            self.recursos = recursos
+            return recursos['versao']
+
+    def _prever_itens(self, itens):
+        """Processa um lote do agrupador: itens (recursos, casa, fora), agrupados por versão."""
+        resultados = [None] * len(itens)
+        por_versao = {}
+        for i, (recursos, casa, fora) in enumerate(itens):
+            por_versao.setdefault(recursos['versao'], (recursos, []))[1].append(i)
+
+        for recursos, posicoes in por_versao.values():
+            # Os pares distintos do lote viram uma só matriz e um só produto matricial no plano compilado
+            pares = list(dict.fromkeys((itens[i][1], itens[i][2]) for i in posicoes))
+            por_par = {
+                par: {c: _numero(probs.get(c, float('nan'))) for c in COLUNAS_PREVISAO}
+                for par, probs in zip(pares, recursos['plano'].prever_pares(pares))
+            }
+            for i in posicoes:
+                resultados[i] = por_par[(itens[i][1], itens[i][2])]
+        return resultados
+
+    def prever(self, pares):
+        """Probabilidades de vários pares (casa, fora): cache LRU por versão + agrupamento em lotes."""
+        recursos = self.recursos
+        saida, futuros = [None] * len(pares), {}
+        for i, (casa, fora) in enumerate(pares):
+            chave = (recursos['versao'], casa, fora)
+            valor = self.cache_previsoes.obter(chave)
+            if valor is not None:
+                saida[i] = valor
+            else:
+                futuros[i] = (chave, self.agrupador.enviar((recursos, casa, fora)))
+        for i, (chave, futuro) in futuros.items():
+            saida[i] = futuro.result()
+            self.cache_previsoes.guardar(chave, saida[i])
+        return [dict(casa=casa, fora=fora, **probs) for (casa, fora), probs in zip(pares, saida)]
+
+    def h2h(self, time_a, time_b):
+        recursos = self.recursos
+
+        def calcular():
+            resumo, exibicao = gerar_confronto_direto(
+                recursos['df_total'], time_a, time_b, indice=recursos['indice_h2h']
+            )
+            exibicao = exibicao.assign(Data=exibicao['Data'].astype(str))
+            return {'resumo': resumo, 'ultimos': _registros(exibicao)}
+
+        return self.cache_consultas.obter_ou_calcular((recursos['versao'], 'h2h', time_a, time_b), calcular)
+
+    def simular(self, n_simulacoes, seed=None):
+        recursos = self.recursos
+
+        def calcular():
+            df_total = recursos['df_total']
+            df_temporada = df_total[df_total['Date'].dt.year == self.ano_atual]
+            tabela = simular_campeonato_monte_carlo(
+                38, df_temporada[df_temporada['FTHG'].isna()], df_temporada[df_temporada['FTHG'].notna()],
+                recursos['modelos'], recursos['encoder'], recursos['time_stats'], recursos['colunas_modelo'],
+                n_simulacoes=n_simulacoes, seed=seed
+            )
+            return _registros(tabela)
+
+        if seed is None:
+            return calcular()
+        return self.cache_consultas.obter_ou_calcular((recursos['versao'], 'simular', n_simulacoes, seed), calcular)
+
+    def saude(self):
+        return {
+            'status': 'ok',
+            'versao': self.recursos['versao'],
+            'jogos': len(self.recursos['df_total']),
+            'cache_previsoes': self.cache_previsoes.estatisticas(),
+            'cache_consultas': self.cache_consultas.estatisticas(),
+            'lotes': self.agrupador.lotes,
+            'previsoes_em_lote': self.agrupador.itens_processados,
+        }
+
+
+def _numero(valor):
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+def _obrigatorios(q, *nomes):
+    """Valores dos parâmetros de texto exigidos; ValueError (400) se algum faltar ou vier vazio."""
+    faltando = [n for n in nomes if not isinstance(q.get(n), str) or not q[n].strip()]
+    if faltando:
+        raise ValueError(f"Parâmetro(s) obrigatório(s): {', '.join(faltando)}")
+    return [q[n] for n in nomes]
+
+
+def _inteiro(q, nome, padrao=None, minimo=None, maximo=None):
+    """Parâmetro inteiro opcional dentro de [minimo, maximo]; ValueError (400) se inválido."""
+    if nome not in q:
+        return padrao
+    try:
+        valor = int(q[nome])
+    except (TypeError, ValueError):
+        raise ValueError(f"'{nome}' deve ser um inteiro") from None
+    if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+        raise ValueError(f"'{nome}' deve estar entre {minimo} e {maximo}")
+    return valor
+
+
+def _pares_do_corpo(corpo):
+    """Pares (casa, fora) do corpo de POST /prever; ValueError (400) se o formato não for o esperado."""
+    if not isinstance(corpo, dict) or not isinstance(corpo.get('jogos', []), list):
+        raise ValueError('O corpo deve ser {"jogos": [{"casa": ..., "fora": ...}, ...]}')
+    jogos = corpo.get('jogos', [])
+    if len(jogos) > MAX_JOGOS_POR_PEDIDO:
+        raise ValueError(f"No máximo {MAX_JOGOS_POR_PEDIDO} jogos por pedido")
+    pares = []
+    for i, jogo in enumerate(jogos):
+        if not isinstance(jogo, dict):
+            raise ValueError(f"jogos[{i}] deve ser um objeto com 'casa' e 'fora'")
+        pares.append(tuple(_obrigatorios(jogo, 'casa', 'fora')))
+    return pares
+
+
+def _registros(df):
+    """DataFrame -> lista de dicts serializável (NaN vira null)."""
+    return json.loads(df.to_json(orient='records', force_ascii=False))
+
+
+def criar_handler(servico):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Sem isso, em conexões keep-alive cada resposta (cabeçalho e corpo em writes separados)
+        # espera o ACK atrasado do cliente por causa do Nagle: ~40 ms por requisição
+        disable_nagle_algorithm = True
+
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _ler_json(self):
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(tamanho) or b'{}')
+
+        def _validar_times(self, *times):
+            desconhecidos = [t for t in times if t not in servico.recursos['times']]
+            if desconhecidos:
+                self._responder(404, {'erro': f"Time(s) desconhecido(s): {', '.join(map(str, desconhecidos))}"})
+                return False
+            return True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == '/saude':
+                    self._responder(200, servico.saude())
+                elif url.path == '/times':
+                    self._responder(200, servico.recursos['times'])
+                elif url.path == '/prever':
+                    casa, fora = _obrigatorios(q, 'casa', 'fora')
+                    if self._validar_times(casa, fora):
+                        self._responder(200, servico.prever([(casa, fora)])[0])
+                elif url.path == '/h2h':
+                    time_a, time_b = _obrigatorios(q, 'time_a', 'time_b')
+                    if self._validar_times(time_a, time_b):
+                        self._responder(200, servico.h2h(time_a, time_b))
+                elif url.path == '/simular':
+                    n_simulacoes = _inteiro(q, 'simulacoes', 10000, minimo=1, maximo=MAX_SIMULACOES)
+                    seed = _inteiro(q, 'seed', minimo=0, maximo=2**32 - 1)
+                    self._responder(200, servico.simular(n_simulacoes, seed))
+                else:
+                    self._responder(404, {'erro': 'Endpoint não encontrado'})
+            except (ValueError, KeyError) as e:
+                self._responder(400, {'erro': str(e)})
+            except Exception as e:
+                self._responder(500, {'erro': str(e)})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == '/prever':
+                    pares = _pares_do_corpo(self._ler_json())
+                    if self._validar_times(*[t for par in pares for t in par]):
+                        self._responder(200, servico.prever(pares))
+                elif url.path == '/recarregar':
+                    self._responder(200, {'versao': servico.recarregar()})
+                else:
+                    self._responder(404, {'erro': 'Endpoint não encontrado'})
+            except (ValueError, KeyError, TypeError) as e:
+                self._responder(400, {'erro': str(e)})
+            except Exception as e:
+                self._responder(500, {'erro': str(e)})
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AtletiQ: serviço HTTP local de previsões")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--sincronizar', action='store_true', help="Atualiza o cache pela API ao (re)carregar")
+    parser.add_argument('--temporadas', type=int, default=5)
+    parser.add_argument('--janela-ms', type=float, default=5.0, help="Janela de agrupamento das previsões")
+    parser.add_argument('--cache', type=int, default=1024, help="Tamanho do cache LRU de previsões")
+    args = parser.parse_args()
+
+    ano_atual = datetime.now().year
+    servico = ServicoPrevisao(
+        list(range(ano_atual - args.temporadas + 1, ano_atual + 1)), ano_atual,
+        sincronizar=args.sincronizar, janela=args.janela_ms / 1000, tamanho_cache=args.cache
+    )
+    servidor = ThreadingHTTPServer((args.host, args.porta), criar_handler(servico))
+    servidor.daemon_threads = True
+    print(f"AtletiQ servindo em http://{args.host}:{args.porta} (versão {servico.recursos['versao']})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
@@ -0,0 +1,83 @@
+"""
+Índice de confronto direto (analysis): atualização incremental e derivação entre versões
+dos dados iguais à construção completa, com nomes que só diferem em maiúsculas/espaços.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import atualizar_indice_h2h, construir_indice_h2h, derivar_indice_h2h, gerar_confronto_direto
+
+# Cada time aparece com grafias que só diferem em maiúsculas e espaços
+GRAFIAS = {
+    'Flamengo': ['Flamengo', 'FLAMENGO', ' flamengo '],
+    'Vasco da Gama': ['Vasco da Gama', 'vasco  da gama', 'Vasco Da Gama '],
+    'Palmeiras': ['Palmeiras', 'palmeiras'],
+    'Corinthians': ['Corinthians', 'CORINTHIANS '],
+}
+
+
+@pytest.fixture
+def base():
+    return pd.DataFrame({
+        'Time1': ['vasco da gama', 'Corinthians'],
+        'Time2': ['FLAMENGO', 'Palmeiras '],
+        'Vitorias_Time1': [138, 130],
+        'Vitorias_Time2': [155, 130],
+        'Empates': [118, 115],
+    })
+
+
+def _jogos(n=120, seed=4):
+    rng = np.random.default_rng(seed)
+    times = list(GRAFIAS)
+    jogos = []
+    for i in range(n):
+        casa, vis = rng.choice(len(times), 2, replace=False)
+        jogos.append({
+            'id': 1000 + i,
+            'Date': pd.Timestamp('2024-01-01', tz='UTC') + pd.Timedelta(days=i),
+            'HomeTeam': rng.choice(GRAFIAS[times[casa]]),
+            'AwayTeam': rng.choice(GRAFIAS[times[vis]]),
+            'FTHG': float(rng.poisson(1.3)),
+            'FTAG': float(rng.poisson(1.1)),
+        })
+    return pd.DataFrame(jogos)
+
+
+def test_incremental_igual_ao_completo(base):
+    df = _jogos()
+    completo = construir_indice_h2h(df, base)
+
+    incremental = construir_indice_h2h(df.iloc[:40], base)
+    for inicio in range(40, len(df), 25):
+        atualizar_indice_h2h(incremental, df.iloc[inicio:inicio + 25])
+    assert incremental == completo
+
+    # Jogos ainda sem placar no fim da versão anterior; depois um placar é corrigido
+    anterior = df.copy()
+    anterior.loc[100:, ['FTHG', 'FTAG']] = np.nan
+    indice_anterior = construir_indice_h2h(anterior, base)
+    atual = df.copy()
+    atual.loc[10, 'FTHG'] += 3
+    derivado = derivar_indice_h2h(indice_anterior, anterior, atual)
+    assert derivado == construir_indice_h2h(atual, base)
+    assert indice_anterior == construir_indice_h2h(anterior, base)  # a versão anterior não muda
+
+
+def test_grafias_do_mesmo_time_somam_juntas(base):
+    df = _jogos()
+    indice = construir_indice_h2h(df, base)
+    assert len(indice['pares']) == 6  # 4 times, sem pares duplicados por grafia
+
+    normal = lambda nome: next(t for t, grafias in GRAFIAS.items() if nome in grafias)
+    par = df[df['HomeTeam'].map(normal).isin(['Flamengo', 'Vasco da Gama'])
+             & df['AwayTeam'].map(normal).isin(['Flamengo', 'Vasco da Gama'])]
+
+    resumo, exibicao = gerar_confronto_direto(df, 'Flamengo', 'Vasco da Gama', indice=indice)
+    assert resumo['total_partidas'] == 155 + 138 + 118 + len(par)
+    assert len(exibicao) == len(par)
+    variante = gerar_confronto_direto(df, ' flamengo', 'VASCO DA GAMA', indice=indice)[0]
+    assert list(variante['vitorias'].values()) == list(resumo['vitorias'].values())
+    assert list(variante['gols'].values()) == list(resumo['gols'].values())
+    assert variante['empates'] == resumo['empates']
@@ -0,0 +1,96 @@
+"""
+Backtest walk-forward (backtest): construção dos folds, matriz com encoder global igual a um
+encoder ajustado só no treino de cada fold, e as métricas (log-loss, Brier, calibração).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from sklearn.preprocessing import OneHotEncoder
+
+from backtest import _matriz_features, _probabilidades, brier, curva_calibracao, log_loss, montar_folds
+from feature_engineering import preparar_dados_para_modelo
+from liga_sintetica import gerar_liga
+from model_trainer import ALVOS, COLS_BASE, ajustar_modelos
+
+
+@pytest.fixture(scope='module')
+def df_treino():
+    liga = gerar_liga(n_temporadas=4, n_times=8, seed=2)
+    liga['Date'] = pd.to_datetime(liga['Date'], utc=True)
+    # Um time que só existe na última temporada (promovido): fora do treino de todos os folds dela
+    ultima = liga['Date'].dt.year == liga['Date'].dt.year.max()
+    liga.loc[ultima, ['HomeTeam', 'AwayTeam']] = liga.loc[ultima, ['HomeTeam', 'AwayTeam']].replace('Time 08', 'Promovido')
+    return preparar_dados_para_modelo(liga)[0]
+
+
+@pytest.mark.parametrize('bloco', ['temporada', 'rodada'])
+def test_folds_walk_forward(df_treino, bloco):
+    folds = montar_folds(df_treino, bloco, temporadas_teste=2)
+    anos = df_treino['Date'].dt.year
+    assert sorted(folds) == sorted(anos.unique())[-2:]
+
+    for ano, lista in folds.items():
+        testados = np.concatenate([idx_teste for _, idx_teste in lista])
+        # Cada jogo da temporada é testado exatamente uma vez
+        assert sorted(testados) == list(np.flatnonzero(anos == ano))
+        for idx_treino, idx_teste in lista:
+            inicio = df_treino['Date'].iloc[idx_teste].min()
+            # Treino = todos os jogos antes do bloco, e só eles
+            assert list(idx_treino) == list(np.flatnonzero(df_treino['Date'] < inicio))
+            if bloco == 'rodada':
+                assert df_treino['Rodada'].iloc[idx_teste].nunique() == 1
+
+    n_rodadas = df_treino[anos == anos.max()]['Rodada'].nunique()
+    assert len(folds[anos.max()]) == (1 if bloco == 'temporada' else n_rodadas)
+
+
+def test_encoder_global_igual_a_encoder_do_fold(df_treino):
+    X = _matriz_features(df_treino)
+    alvos = {key: df_treino[col].to_numpy() for col, key in ALVOS}
+    idx_treino, idx_teste = montar_folds(df_treino, 'temporada', temporadas_teste=1).popitem()[1][0]
+    assert 'Promovido' not in set(df_treino['HomeTeam'].iloc[idx_treino])
+
+    modelos = ajustar_modelos(X[idx_treino], {k: y[idx_treino] for k, y in alvos.items()})
+    global_ = _probabilidades(modelos, X[idx_teste])
+
+    # Encoder ajustado só no treino do fold: o promovido vira desconhecido no teste
+    encoder = OneHotEncoder(handle_unknown='ignore').fit(df_treino[['HomeTeam', 'AwayTeam']].iloc[idx_treino])
+    matriz = lambda idx: sparse.hstack([
+        encoder.transform(df_treino[['HomeTeam', 'AwayTeam']].iloc[idx]),
+        sparse.csr_matrix(df_treino[COLS_BASE].iloc[idx].to_numpy(dtype=float)),
+    ], format='csr')
+    modelos_fold = ajustar_modelos(matriz(idx_treino), {k: y[idx_treino] for k, y in alvos.items()})
+    np.testing.assert_allclose(global_, _probabilidades(modelos_fold, matriz(idx_teste)), atol=1e-6)
+
+    # E o coeficiente das colunas do promovido é exatamente zero no modelo do encoder global
+    vazias = np.flatnonzero(X[idx_treino].getnnz(axis=0) == 0)
+    assert len(vazias) == 2  # HomeTeam_Promovido e AwayTeam_Promovido
+    for modelo in modelos.values():
+        assert (modelo.coef_[:, vazias] == 0).all()
+
+
+def test_log_loss_e_brier():
+    p = np.array([0.8, 0.3])
+    o = np.array([1.0, 0.0])
+    assert log_loss(p, o) == pytest.approx(-(np.log(0.8) + np.log(0.7)) / 2)
+    assert brier(p, o) == pytest.approx((0.2 ** 2 + 0.3 ** 2) / 2)
+
+    p = np.array([[0.5, 0.3, 0.2], [0.1, 0.6, 0.3]])
+    o = np.array([[1.0, 0, 0], [0, 0, 1.0]])
+    assert log_loss(p, o) == pytest.approx(-(np.log(0.5) + np.log(0.3)) / 2)
+    assert brier(p, o) == pytest.approx(((0.25 + 0.09 + 0.04) + (0.01 + 0.36 + 0.49)) / 2)
+
+    # Probabilidade zero no que aconteceu: finito (corte em 1e-15), não infinito
+    assert log_loss(np.array([0.0]), np.array([1.0])) == pytest.approx(-np.log(1e-15))
+
+
+def test_curva_calibracao():
+    probs = np.array([0.05, 0.15, 0.12, 0.95, 1.0])
+    ocorridos = np.array([0.0, 1.0, 0.0, 1.0, 1.0])
+    assert curva_calibracao(probs, ocorridos) == [
+        {'faixa': '0.0-0.1', 'prevista': 0.05, 'observada': 0.0, 'jogos': 1},
+        {'faixa': '0.1-0.2', 'prevista': 0.135, 'observada': 0.5, 'jogos': 2},
+        {'faixa': '0.9-1.0', 'prevista': 0.975, 'observada': 1.0, 'jogos': 2},  # 1.0 entra na última faixa
+    ]
+    assert sum(c['jogos'] for c in curva_calibracao(probs, ocorridos, n_faixas=4)) == len(probs)
@@ -0,0 +1,160 @@
+"""
+Equivalência das features vetorizadas (feature_engineering) com o laço iterrows original,
+do Elo em fluxo com a atualização jogo a jogo, e do caminho incremental
+(atualizar_dados_para_modelo) com o cálculo completo; sequência em aberto de cada time.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from elo import RatingsElo, elo_feature
+from feature_engineering import atualizar_dados_para_modelo, preparar_dados_para_modelo, sequencia_atual
+
+FEATURES = ['ForcaGeral', 'FormaPontos', 'MediaGolsMarcados', 'MediaGolsSofridos']
+
+
+def _liga(n_temporadas=3, n_times=12, seed=7):
+    """Turno e returno entre todos os pares, gols Poisson e um horário distinto por jogo."""
+    rng = np.random.default_rng(seed)
+    times = [f'Time{i:02d}' for i in range(n_times)]
+    jogos = []
+    inicio = pd.Timestamp('2020-01-01 16:00')
+    for t in range(n_temporadas):
+        pares = [(a, b) for a in times for b in times if a != b]
+        for i in rng.permutation(len(pares)):
+            jogos.append(pares[i])
+    return pd.DataFrame({
+        'Date': [inicio + pd.Timedelta(hours=7 * i) for i in range(len(jogos))],
+        'HomeTeam': [c for c, _ in jogos],
+        'AwayTeam': [f for _, f in jogos],
+        'FTHG': rng.poisson(1.4, len(jogos)).astype(float),
+        'FTAG': rng.poisson(1.1, len(jogos)).astype(float),
+    })
+
+
+def _referencia_iterrows(df_historico):
+    """O laço original, jogo a jogo (iterrows + listas por time). Devolve (features por jogo, time_stats)."""
+    df_historico = df_historico.sort_values(by='Date').reset_index(drop=True)
+    time_stats = {}
+    linhas = []
+    for _, row in df_historico.iterrows():
+        time_casa, time_visitante = row['HomeTeam'], row['AwayTeam']
+        features_jogo = {}
+
+        for time, lado in [(time_casa, 'Home'), (time_visitante, 'Away')]:
+            if time not in time_stats:
+                time_stats[time] = {'pontos': [], 'gm': [], 'gs': [], 'seq': []}
+            hist = time_stats[time]
+            features_jogo[f'ForcaGeral_{lado}'] = np.mean(hist['pontos']) if hist['pontos'] else 1.0
+            features_jogo[f'FormaPontos_{lado}'] = sum(hist['pontos'][-5:])
+            features_jogo[f'MediaGolsMarcados_{lado}'] = np.mean(hist['gm'][-5:]) if hist['gm'] else 0
+            features_jogo[f'MediaGolsSofridos_{lado}'] = np.mean(hist['gs'][-5:]) if hist['gs'] else 0
+        linhas.append(features_jogo)
+
+        g_casa, g_vis = row['FTHG'], row['FTAG']
+        res_c = 'V' if g_casa > g_vis else 'E' if g_casa == g_vis else 'D'
+        res_v = 'V' if g_vis > g_casa else 'E' if g_vis == g_casa else 'D'
+        for time, res, gm, gs in [(time_casa, res_c, g_casa, g_vis), (time_visitante, res_v, g_vis, g_casa)]:
+            hist = time_stats[time]
+            hist['pontos'].append(3 if res == 'V' else 1 if res == 'E' else 0)
+            hist['seq'].append(res)
+            hist['gm'].append(gm)
+            hist['gs'].append(gs)
+
+    return pd.DataFrame(linhas), time_stats
+
+
+def _assert_time_stats_iguais(obtido, esperado, colunas=('pontos', 'gm', 'gs', 'seq')):
+    assert list(obtido) == list(esperado)
+    for time, hist in esperado.items():
+        for col in colunas:
+            assert obtido[time][col] == hist[col], (time, col)
+
+
+@pytest.fixture(scope='module')
+def liga():
+    return _liga()
+
+
+def test_features_vetorizadas_iguais_ao_iterrows(liga):
+    df_final, time_stats = preparar_dados_para_modelo(liga.copy())
+    esperado, stats_esperado = _referencia_iterrows(liga.copy())
+
+    # preparar_dados_para_modelo descarta os 20 primeiros jogos (aquecimento das features)
+    esperado = esperado.iloc[20:].reset_index(drop=True)
+    for lado in ['Home', 'Away']:
+        for feat in FEATURES:
+            col = f'{feat}_{lado}'
+            np.testing.assert_allclose(df_final[col].to_numpy(dtype=float), esperado[col].to_numpy(dtype=float),
+                                       rtol=0, atol=1e-9, err_msg=col)
+    _assert_time_stats_iguais(time_stats, stats_esperado)
+
+
+def test_alvos(liga):
+    df_final, _ = preparar_dados_para_modelo(liga.copy())
+    casa, fora = df_final['FTHG'], df_final['FTAG']
+    esperado = np.where(casa > fora, 'Casa', np.where(casa < fora, 'Visitante', 'Empate'))
+    assert (df_final['Resultado'].to_numpy() == esperado).all()
+    assert (df_final['Target_Over25'] == ((casa + fora) > 2.5).astype(int)).all()
+    assert (df_final['Target_BTTS'] == ((casa > 0) & (fora > 0)).astype(int)).all()
+
+
+def test_elo_igual_a_atualizacao_jogo_a_jogo(liga):
+    df_final, time_stats = preparar_dados_para_modelo(liga.copy())
+
+    ratings = RatingsElo()
+    antes, depois = [], {}
+    for casa, fora, g_casa, g_fora in zip(liga['HomeTeam'], liga['AwayTeam'], liga['FTHG'], liga['FTAG']):
+        antes.append(ratings.atualizar(casa, fora, g_casa, g_fora))
+        for time in (casa, fora):
+            depois.setdefault(time, []).append(ratings.rating(time))
+    antes = np.array(antes)[20:]
+
+    # Features com o rating de antes do jogo; time_stats com o rating de depois de cada jogo
+    np.testing.assert_allclose(df_final['Elo_Home'], elo_feature(antes[:, 0]), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(df_final['Elo_Away'], elo_feature(antes[:, 1]), rtol=0, atol=1e-12)
+    for time, esperado in depois.items():
+        np.testing.assert_allclose(time_stats[time]['elo'], esperado, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('n_inicial', [0, 25, 200])
+def test_incremental_igual_ao_completo(liga, tmp_path, n_inicial):
+    caminho = str(tmp_path / 'estado.pkl')
+    completo, stats_completo = preparar_dados_para_modelo(liga.copy())
+
+    # Primeiro só uma parte dos jogos; depois o histórico inteiro, em duas levas
+    meio = (n_inicial + len(liga)) // 2
+    for n in [n_inicial, meio]:
+        if n:
+            atualizar_dados_para_modelo(liga.iloc[:n].copy(), caminho)
+    incremental, stats_incremental = atualizar_dados_para_modelo(liga.copy(), caminho)
+
+    pd.testing.assert_frame_equal(incremental, completo)
+    _assert_time_stats_iguais(stats_incremental, stats_completo, colunas=list(stats_completo[liga['HomeTeam'][0]]))
+
+    # Sem jogos novos, o snapshot salvo é devolvido tal qual
+    de_novo, _ = atualizar_dados_para_modelo(liga.copy(), caminho)
+    pd.testing.assert_frame_equal(de_novo, completo)
+
+
+def test_placar_corrigido_refaz_do_zero(liga, tmp_path):
+    caminho = str(tmp_path / 'estado.pkl')
+    atualizar_dados_para_modelo(liga.copy(), caminho)
+
+    corrigido = liga.copy()
+    corrigido.loc[3, 'FTHG'] += 2
+    obtido, stats_obtido = atualizar_dados_para_modelo(corrigido.copy(), caminho)
+    esperado, stats_esperado = preparar_dados_para_modelo(corrigido.copy())
+
+    pd.testing.assert_frame_equal(obtido, esperado)
+    _assert_time_stats_iguais(stats_obtido, stats_esperado, colunas=list(stats_esperado[liga['HomeTeam'][0]]))
+
+
+def test_sequencia_atual(liga):
+    _, time_stats = preparar_dados_para_modelo(liga)
+    for time, hist in time_stats.items():
+        resultado, qtd = sequencia_atual(time_stats, time)
+        seq = hist['seq']
+        assert qtd >= 1 and seq[-qtd:] == [resultado] * qtd
+        assert qtd == len(seq) or seq[-qtd - 1] != resultado
+    assert sequencia_atual(time_stats, 'Time Novo') == (None, 0)
@@ -0,0 +1,140 @@
+"""
+Cache de partidas por temporada (match_cache): upsert da janela incremental, gravação
+atômica das partições, manifesto, partições corrompidas e migração do CSV antigo.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+import match_cache
+from feature_engineering import preparar_dados_para_modelo
+from liga_sintetica import gerar_liga
+from match_cache import carregar_temporadas, mesclar_por_id, salvar_temporada
+from web_scraper import AtletiQScraper
+
+
+def _resposta_api(jogos):
+    """Corpo de /matches da API no formato que _partidas_para_df recebe."""
+    return {'matches': [
+        {'id': id_jogo, 'status': status, 'matchday': rodada, 'utcDate': data,
+         'homeTeam': {'name': casa}, 'awayTeam': {'name': fora},
+         'score': {'fullTime': {'home': g_casa, 'away': g_fora}}}
+        for id_jogo, status, rodada, data, casa, fora, g_casa, g_fora in jogos
+    ]}
+
+
+def test_janela_so_com_jogos_futuros_mantem_gols_em_float(tmp_path):
+    liga = gerar_liga(n_temporadas=1, n_times=10, seed=1)
+    ano = int(liga['Date'].iloc[0][:4])
+    salvar_temporada(str(tmp_path), ano, liga)
+    base = carregar_temporadas(str(tmp_path))[0][ano]
+
+    # Dia sem jogos recentes: a janela só traz partidas agendadas, sem placar
+    janela = AtletiQScraper(cache_dir=None)._partidas_para_df(_resposta_api([
+        (900000 + i, 'SCHEDULED', 19, f'2099-01-0{i + 1}T19:00:00Z', f'Time0{i}', f'Time0{i + 5}', None, None)
+        for i in range(3)
+    ]))
+    assert janela['FTHG'].dtype == 'float64' and janela['FTAG'].dtype == 'float64'
+
+    df = mesclar_por_id(base, janela)
+    assert len(df) == len(base) + 3
+    assert df.dtypes.to_dict() == base.dtypes.to_dict()
+
+    df_treino, time_stats = preparar_dados_para_modelo(df[df['FTHG'].notna()].copy())
+    assert len(df_treino) == len(base) - 20 and len(time_stats) == 10
+
+
+def test_upsert_substitui_pelo_id(tmp_path):
+    liga = gerar_liga(n_temporadas=1, n_times=6, seed=2, rodadas_pendentes=2)
+    pendente = liga[liga['FTHG'].isna()].iloc[0]
+
+    # O jogo agendado termina: a mesma partida (mesmo id) volta com placar
+    janela = AtletiQScraper(cache_dir=None)._partidas_para_df(_resposta_api([
+        (int(pendente['id']), 'FINISHED', int(pendente['Rodada']), pendente['Date'],
+         pendente['HomeTeam'], pendente['AwayTeam'], 2, 1)
+    ]))
+    df = mesclar_por_id(liga, janela)
+
+    assert len(df) == len(liga)
+    linha = df[df['id'] == pendente['id']].iloc[0]
+    assert (linha['FTHG'], linha['FTAG']) == (2.0, 1.0)
+
+
+def _temporada(ano, seed=0):
+    liga = gerar_liga(n_temporadas=1, n_times=6, seed=seed, ano_inicial=ano)
+    liga['Date'] = pd.to_datetime(liga['Date'], utc=True)
+    return liga
+
+
+def test_salvar_e_carregar_temporadas(tmp_path):
+    diretorio = str(tmp_path)
+    assert salvar_temporada(diretorio, 2021, _temporada(2021), fechada=True)
+    assert salvar_temporada(diretorio, 2022, _temporada(2022))
+
+    temporadas, manifesto = carregar_temporadas(diretorio)
+    assert sorted(temporadas) == [2021, 2022]
+    assert manifesto == {2021: {'fechada': True, 'linhas': 30}, 2022: {'fechada': False, 'linhas': 30}}
+    pd.testing.assert_frame_equal(temporadas[2021], mesclar_por_id(None, _temporada(2021)))
+    assert not [f for f in os.listdir(diretorio) if f.endswith('.tmp')]
+
+    # Temporada fechada nunca é regravada; a aberta só quando o conteúdo muda
+    assert not salvar_temporada(diretorio, 2021, _temporada(2021, seed=9), fechada=True)
+    assert not salvar_temporada(diretorio, 2022, _temporada(2022))
+    assert salvar_temporada(diretorio, 2022, _temporada(2022, seed=9))
+
+    # Filtro por anos
+    assert sorted(carregar_temporadas(diretorio, anos=[2022])[0]) == [2022]
+
+
+def test_escrita_interrompida_preserva_arquivo_anterior(tmp_path, monkeypatch):
+    diretorio = str(tmp_path)
+    salvar_temporada(diretorio, 2022, _temporada(2022))
+    antes = carregar_temporadas(diretorio)
+
+    def falhar(tabela, caminho, **kwargs):
+        with open(caminho, 'wb') as f:
+            f.write(b'meio arquivo')
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(match_cache.feather, 'write_feather', falhar)
+    with pytest.raises(OSError):
+        salvar_temporada(diretorio, 2022, _temporada(2022, seed=9))
+    monkeypatch.undo()
+    assert not [f for f in os.listdir(diretorio) if f.endswith('.tmp')]
+
+    depois = carregar_temporadas(diretorio)
+    assert depois[1] == antes[1]
+    pd.testing.assert_frame_equal(depois[0][2022], antes[0][2022])
+
+
+def test_particao_corrompida_e_manifesto_invalido(tmp_path):
+    diretorio = str(tmp_path)
+    salvar_temporada(diretorio, 2021, _temporada(2021), fechada=True)
+    salvar_temporada(diretorio, 2022, _temporada(2022))
+
+    # Partição ilegível: tratada como ausente (será baixada de novo)
+    with open(os.path.join(diretorio, 'temporada_2021.arrow'), 'wb') as f:
+        f.write(b'lixo')
+    temporadas, manifesto = carregar_temporadas(diretorio)
+    assert sorted(temporadas) == [2022] and sorted(manifesto) == [2022]
+
+    # Manifesto ilegível: cache vazio, sem erro
+    with open(os.path.join(diretorio, match_cache.MANIFESTO), 'w') as f:
+        f.write('{nao e json')
+    assert carregar_temporadas(diretorio) == ({}, {})
+
+
+def test_migra_csv_legado_uma_vez(tmp_path):
+    diretorio, csv = str(tmp_path / 'cache'), str(tmp_path / 'atletiq_dataset.csv')
+    legado = pd.concat([_temporada(2021), _temporada(2022, seed=1)])
+    legado.to_csv(csv, index=False)
+
+    temporadas, manifesto = carregar_temporadas(diretorio, csv_legado=csv)
+    assert sorted(temporadas) == [2021, 2022]
+    assert all(not info['fechada'] for info in manifesto.values())
+    assert sum(len(df) for df in temporadas.values()) == len(legado)
+
+    # Com o manifesto já criado, o CSV não é lido de novo
+    os.remove(csv)
+    assert sorted(carregar_temporadas(diretorio, csv_legado=csv)[0]) == [2021, 2022]
@@ -0,0 +1,135 @@
+"""
+Treino (treinar_modelo): caminhos denso e esparso e warm start chegam ao mesmo modelo.
+Cache de modelos (carregar_ou_treinar_modelo): reaproveitamento pela assinatura, arquivo
+corrompido ou de outra versão, gravação atômica e warm start apenas quando o treino novo
+acrescenta jogos ao do cache.
+"""
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_trainer
+from feature_engineering import preparar_dados_para_modelo
+from liga_sintetica import gerar_liga
+from model_trainer import carregar_ou_treinar_modelo, treinar_modelo
+from predictor import prever_lote
+
+
+@pytest.fixture(scope='module')
+def df_treino():
+    df, _ = preparar_dados_para_modelo(gerar_liga(n_temporadas=2, n_times=10, seed=3))
+    return df
+
+
+@pytest.fixture
+def espiao(monkeypatch):
+    """Registra se cada treino partiu de modelos anteriores (warm start)."""
+    chamadas = []
+    original = model_trainer.treinar_modelo
+
+    def treinar(df_treino, anteriores=None, **kwargs):
+        chamadas.append(anteriores is not None)
+        return original(df_treino, anteriores=anteriores, **kwargs)
+
+    monkeypatch.setattr(model_trainer, 'treinar_modelo', treinar)
+    return chamadas
+
+
+def _coeficientes(modelos):
+    return {k: np.hstack([m.coef_.ravel(), m.intercept_]) for k, m in modelos.items()}
+
+
+def _probabilidades(modelos, encoder, colunas, time_stats, df_jogos):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')  # inclui o aviso de "feature names" do sklearn
+        return prever_lote(df_jogos, modelos, encoder, time_stats, colunas)[
+            ['Casa', 'Empate', 'Visitante', 'Over25', 'BTTS']].to_numpy()
+
+
+def test_denso_e_esparso_iguais(df_treino):
+    time_stats = preparar_dados_para_modelo(gerar_liga(n_temporadas=2, n_times=10, seed=3))[1]
+    times = sorted(time_stats)
+    df_jogos = pd.DataFrame([(c, f) for c in times for f in times if c != f], columns=['HomeTeam', 'AwayTeam'])
+
+    denso = _probabilidades(*treinar_modelo(df_treino, esparso=False), time_stats, df_jogos)
+    esparso = _probabilidades(*treinar_modelo(df_treino, esparso=True), time_stats, df_jogos)
+    assert np.allclose(denso, esparso, atol=1e-6)
+
+
+def test_warm_start_igual_ao_treino_do_zero(df_treino):
+    anteriores = treinar_modelo(df_treino.iloc[:-20])
+    incremental = _coeficientes(treinar_modelo(df_treino, anteriores=anteriores)[0])
+    for chave, coef in _coeficientes(treinar_modelo(df_treino)[0]).items():
+        np.testing.assert_allclose(incremental[chave], coef, atol=1e-6)
+
+
+def test_cache_reaproveitado_e_warm_start_so_com_jogos_acrescentados(df_treino, tmp_path, espiao):
+    caminho = str(tmp_path / 'modelos.pkl')
+    inicio = df_treino.iloc[:-20]
+
+    carregar_ou_treinar_modelo(inicio, caminho)
+    carregar_ou_treinar_modelo(inicio, caminho)
+    assert espiao == [False]  # segunda chamada: cache pela assinatura
+
+    carregar_ou_treinar_modelo(df_treino, caminho, n_workers=2)
+    assert espiao == [False, True]
+
+
+def test_treino_alterado_treina_do_zero(df_treino, tmp_path, espiao):
+    caminho = str(tmp_path / 'modelos.pkl')
+    carregar_ou_treinar_modelo(df_treino.iloc[:-20], caminho)
+
+    # Placar antigo corrigido: não é acréscimo, então o resultado não depende do cache anterior
+    alterado = df_treino.copy()
+    alterado.loc[alterado.index[5], 'Target_BTTS'] = 1 - alterado.loc[alterado.index[5], 'Target_BTTS']
+    modelos = carregar_ou_treinar_modelo(alterado, caminho)[0]
+    assert espiao == [False, False]
+
+    do_zero = _coeficientes(treinar_modelo(alterado)[0])
+    for chave, coef in _coeficientes(modelos).items():
+        np.testing.assert_array_equal(coef, do_zero[chave])
+
+
+def test_cache_corrompido_ou_de_outra_versao_treina_de_novo(df_treino, tmp_path, espiao):
+    caminho = str(tmp_path / 'modelos.pkl')
+    with open(caminho, 'wb') as f:
+        f.write(b'nao e um pickle')
+    carregar_ou_treinar_modelo(df_treino, caminho)
+    assert espiao == [False]
+
+    # O treino regravou um cache válido, que passa a ser usado
+    carregar_ou_treinar_modelo(df_treino, caminho)
+    assert espiao == [False]
+
+    # Cache de outra versão do formato não serve de warm start, mesmo com jogos só acrescentados
+    carregar_ou_treinar_modelo(df_treino.iloc[:-20], caminho)
+    with open(caminho, 'rb') as f:
+        artefato = pickle.load(f)
+    artefato['versao'] -= 1
+    with open(caminho, 'wb') as f:
+        pickle.dump(artefato, f)
+    carregar_ou_treinar_modelo(df_treino, caminho)
+    assert espiao == [False, False, False]
+
+
+def test_falha_ao_gravar_preserva_cache_anterior(df_treino, tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'modelos.pkl')
+    carregar_ou_treinar_modelo(df_treino.iloc[:-20], caminho)
+    with open(caminho, 'rb') as f:
+        antes = f.read()
+
+    def falhar(obj, f, **kwargs):
+        f.write(b'meio arquivo')
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(model_trainer.pickle, 'dump', falhar)
+    modelos = carregar_ou_treinar_modelo(df_treino, caminho)[0]  # só avisa; o treino segue valendo
+    assert set(modelos) == {'resultado', 'over25', 'btts'}
+
+    with open(caminho, 'rb') as f:
+        assert f.read() == antes
+    assert os.listdir(tmp_path) == ['modelos.pkl']
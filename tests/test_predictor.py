@@ -0,0 +1,60 @@
+"""
+Previsão (predictor): o plano de inferência compilado (prever / prever_pares) dá as mesmas
+probabilidades de prever_jogo_especifico, e o Monte Carlo com semente fixa não depende do
+número de workers.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_engineering import preparar_dados_para_modelo
+from liga_sintetica import gerar_liga
+from model_trainer import treinar_modelo
+from predictor import PlanoInferencia, prever_jogo_especifico, simular_campeonato_monte_carlo
+
+
+@pytest.fixture(scope='module')
+def recursos():
+    df_treino, time_stats = preparar_dados_para_modelo(gerar_liga(n_temporadas=2, n_times=10, seed=5))
+    modelos, encoder, colunas_modelo = treinar_modelo(df_treino)
+    return df_treino, modelos, encoder, time_stats, colunas_modelo
+
+
+def test_plano_igual_a_prever_jogo_especifico(recursos):
+    _, modelos, encoder, time_stats, colunas_modelo = recursos
+    plano = PlanoInferencia(modelos, encoder, time_stats, colunas_modelo)
+    times = sorted(time_stats)
+    # Inclui um time fora do encoder e do time_stats (one-hot zerado, features padrão)
+    pares = [(c, f) for c in times + ['Time Novo'] for f in times if c != f] + [(times[0], 'Time Novo')]
+
+    em_lote = plano.prever_pares(pares)
+    for (casa, fora), lote in zip(pares, em_lote):
+        esperado = prever_jogo_especifico(casa, fora, modelos, encoder, time_stats, colunas_modelo)
+        um = plano.prever(casa, fora)
+        assert um.keys() == esperado.keys() == lote.keys()
+        np.testing.assert_allclose([um[k] for k in esperado], list(esperado.values()), rtol=0, atol=1e-12)
+        np.testing.assert_allclose([lote[k] for k in esperado], list(esperado.values()), rtol=0, atol=1e-12)
+
+
+def test_resultado_com_menos_de_3_classes_falha(recursos):
+    df_treino, _, _, time_stats, _ = recursos
+    df_sem_empate = df_treino[df_treino['Resultado'] != 'Empate']
+    modelos, encoder, colunas_modelo = treinar_modelo(df_sem_empate)
+    with pytest.raises(ValueError, match="2 classe"):
+        PlanoInferencia(modelos, encoder, time_stats, colunas_modelo)
+
+
+def test_monte_carlo_igual_para_qualquer_numero_de_workers(recursos):
+    _, modelos, encoder, time_stats, colunas_modelo = recursos
+    temporada = gerar_liga(n_temporadas=1, n_times=10, seed=6)
+    df_res = temporada[temporada['Rodada'] <= 8]
+    df_fut = temporada[temporada['Rodada'] > 8].assign(FTHG=np.nan, FTAG=np.nan)
+
+    # 25 mil simulações = 3 shards: com 3 workers cada um roda num processo
+    tabelas = [
+        simular_campeonato_monte_carlo(18, df_fut, df_res, modelos, encoder, time_stats, colunas_modelo,
+                                       n_simulacoes=25000, seed=42, n_workers=n)
+        for n in (1, 3)
+    ]
+    pd.testing.assert_frame_equal(tabelas[0], tabelas[1], check_exact=True)
+    assert np.allclose(tabelas[0].filter(like='Pos_').sum(axis=1), 1.0)
@@ -0,0 +1,67 @@
+"""
+Motor de placares (scoreline_model): a grade de placares é uma distribuição e os mercados
+(1X2, Over/Under, BTTS) batem com somas diretas sobre ela.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from liga_sintetica import gerar_liga
+from scoreline_model import grade_placares, mercados, prever_placar_lote, treinar_modelo_placar
+
+LINHAS = (0.5, 1.5, 2.5, 3.5, 4.5)
+
+
+@pytest.fixture(scope='module')
+def modelo():
+    liga = gerar_liga(n_temporadas=2, n_times=10, seed=8)
+    liga['Date'] = pd.to_datetime(liga['Date'], utc=True)
+    return treinar_modelo_placar(liga)
+
+
+@pytest.fixture(scope='module')
+def jogos(modelo):
+    times = modelo['times'] + ['Time Novo']
+    return pd.DataFrame([(c, f) for c in times for f in times if c != f], columns=['HomeTeam', 'AwayTeam'])
+
+
+def test_grade_soma_1(modelo, jogos):
+    grade = grade_placares(modelo, jogos['HomeTeam'], jogos['AwayTeam'])
+    assert grade.shape == (len(jogos), modelo['max_gols'] + 1, modelo['max_gols'] + 1)
+    assert (grade >= 0).all()
+    np.testing.assert_allclose(grade.sum(axis=(1, 2)), 1.0, atol=1e-12)
+
+
+def test_mercados_batem_com_a_grade(modelo, jogos):
+    grade = grade_placares(modelo, jogos['HomeTeam'], jogos['AwayTeam'])
+    saida = mercados(grade, LINHAS)
+
+    g = grade.shape[1]
+    gols_casa, gols_fora = np.meshgrid(np.arange(g), np.arange(g), indexing='ij')
+    somar = lambda mascara: (grade * mascara).sum(axis=(1, 2))
+
+    np.testing.assert_allclose(saida['Casa'], somar(gols_casa > gols_fora), atol=1e-12)
+    np.testing.assert_allclose(saida['Empate'], somar(gols_casa == gols_fora), atol=1e-12)
+    np.testing.assert_allclose(saida['Visitante'], somar(gols_casa < gols_fora), atol=1e-12)
+    np.testing.assert_allclose(saida['Casa'] + saida['Empate'] + saida['Visitante'], 1.0, atol=1e-12)
+    np.testing.assert_allclose(saida['BTTS'], somar((gols_casa > 0) & (gols_fora > 0)), atol=1e-12)
+
+    for linha in LINHAS:
+        nome = f"{linha:g}".replace('.', '')
+        np.testing.assert_allclose(saida[f'Over{nome}'], somar(gols_casa + gols_fora > linha), atol=1e-12)
+        np.testing.assert_allclose(saida[f'Under{nome}'], somar(gols_casa + gols_fora < linha), atol=1e-12)
+        np.testing.assert_allclose(saida[f'Over{nome}'] + saida[f'Under{nome}'], 1.0, atol=1e-12)
+
+    # Mais gols no limite, menos chance de passar dele
+    overs = np.column_stack([saida[f"Over{linha:g}".replace('.', '')] for linha in LINHAS])
+    assert (np.diff(overs, axis=1) < 0).all()
+
+
+def test_prever_placar_lote(modelo, jogos):
+    previsao = prever_placar_lote(modelo, jogos, LINHAS)
+    grade = grade_placares(modelo, jogos['HomeTeam'], jogos['AwayTeam'])
+    g = grade.shape[1]
+    for placar, celulas in zip(previsao['Placar'], grade.reshape(len(jogos), -1)):
+        assert placar == f"{celulas.argmax() // g}x{celulas.argmax() % g}"
+    # Gols esperados perto da média da grade (a massa acima de max_gols é desprezível)
+    np.testing.assert_allclose(previsao['GolsCasa'], (grade.sum(axis=2) * np.arange(g)).sum(axis=1), rtol=0.05)
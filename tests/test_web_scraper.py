@@ -0,0 +1,121 @@
+"""
+Cliente HTTP (web_scraper): novas tentativas em 429/5xx com backoff e Retry-After, contra um
+servidor local, e o limitador de taxa (10 requisições por 60 s) com relógio simulado.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from web_scraper import AtletiQScraper, LimitadorTaxa
+
+
+class _Relogio:
+    """Relógio simulado: dormir() só avança o tempo e registra a espera."""
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.pedidos.append(self.path)
+        status, cabecalhos = self.server.roteiro.pop(0) if self.server.roteiro else (200, {})
+        corpo = json.dumps({'status': status}).encode()
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    """API falsa em localhost: responde na ordem de `servidor.roteiro` ((status, cabeçalhos)) e depois 200."""
+    srv = HTTPServer(('127.0.0.1', 0), _Handler)
+    srv.pedidos, srv.roteiro = [], []
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _scraper(servidor, relogio, **kwargs):
+    return AtletiQScraper(
+        api_key='teste', base_url=f"http://127.0.0.1:{servidor.server_port}/", cache_dir=None,
+        limitador=LimitadorTaxa(relogio=relogio, dormir=relogio.dormir), dormir=relogio.dormir, **kwargs
+    )
+
+
+def test_retry_after_e_backoff(servidor):
+    servidor.roteiro = [(429, {'Retry-After': '7'}), (503, {}), (429, {'Retry-After': 'amanha'})]
+    relogio = _Relogio()
+    scraper = _scraper(servidor, relogio, backoff=0.5)
+
+    response = scraper._get(scraper.base_url + 'competitions/BSA/matches')
+    assert response.status_code == 200
+    assert len(servidor.pedidos) == 4
+    # Retry-After quando maior que o backoff; senão backoff exponencial (0.5, 1, 2)
+    assert relogio.esperas == [7.0, 1.0, 2.0]
+
+
+def test_desiste_apos_max_tentativas(servidor):
+    servidor.roteiro = [(429, {'Retry-After': '1'})] * 5
+    relogio = _Relogio()
+    scraper = _scraper(servidor, relogio, max_tentativas=3, backoff=2.0)
+
+    response = scraper._get(scraper.base_url + 'competitions/BSA/matches')
+    assert response.status_code == 429
+    assert len(servidor.pedidos) == 3
+    assert relogio.esperas == [2.0, 4.0]
+
+
+def test_erro_4xx_nao_repete(servidor):
+    servidor.roteiro = [(403, {})]
+    relogio = _Relogio()
+    scraper = _scraper(servidor, relogio)
+
+    assert scraper._get(scraper.base_url + 'competitions/BSA/matches').status_code == 403
+    assert len(servidor.pedidos) == 1 and relogio.esperas == []
+
+
+def test_limitador_10_por_60s(servidor):
+    relogio = _Relogio()
+    scraper = _scraper(servidor, relogio)
+    horarios = []
+    for _ in range(35):
+        scraper._get(scraper.base_url + 'competitions/BSA/matches')
+        horarios.append(relogio.agora)
+
+    assert len(servidor.pedidos) == 35
+    assert horarios[:10] == [0.0] * 10  # rajada inicial sem espera
+    # Nunca mais de 10 requisições em qualquer janela de 60 s
+    assert all(horarios[i + 10] - horarios[i] >= 60 for i in range(len(horarios) - 10))
+    assert horarios[-1] == 180.0
+
+
+def test_limitador_entre_threads():
+    esperas = []
+    limitador = LimitadorTaxa(capacidade=10, janela=60, relogio=lambda: 0.0, dormir=esperas.append)
+
+    threads = [threading.Thread(target=limitador.adquirir) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Relógio parado: 10 passam na hora, 10 esperam 60 s e 10 esperam 120 s
+    assert sorted(esperas) == [60.0] * 10 + [120.0] * 10
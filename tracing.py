@@ -0,0 +1,164 @@
+"""
+Medição de tempo por etapas (spans aninhados) do carregamento, treino e previsão.
+
+Desligado por padrão: `span()` devolve um objeto nulo compartilhado e o custo é só uma
+chamada de função. Com `ativar()`, cada span registra tempo de parede, thread, span pai
+e atributos (linhas, cache hit/miss...). `exportar_json()` grava o trace.
+"""
+import functools
+import itertools
+import json
+import threading
+import time
+
+_ativo = False
+_lock = threading.Lock()
+_registros = []
+_ids = itertools.count(1)
+_local = threading.local()
+_inicio = time.perf_counter()
+
+
+class _SpanNulo:
+    """Span usado com a medição desligada: não faz nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def definir(self, **atributos):
+        pass
+
+    def encerrar(self):
+        pass
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+class _Span:
+    __slots__ = ('id', 'nome', 'atributos', 'pai', 'inicio')
+
+    def __init__(self, nome, atributos):
+        self.id = next(_ids)
+        self.nome = nome
+        self.atributos = atributos
+        self.pai = None
+        self.inicio = None
+
+    def __enter__(self):
+        pilha = getattr(_local, 'pilha', None)
+        if pilha is None:
+            pilha = _local.pilha = []
+        self.pai = pilha[-1].id if pilha else None
+        pilha.append(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_erro, erro, tb):
+        fim = time.perf_counter()
+        pilha = _local.pilha
+        profundidade = len(pilha) - 1
+        pilha.pop()
+        registro = {
+            'id': self.id,
+            'pai': self.pai,
+            'nome': self.nome,
+            'thread': threading.current_thread().name,
+            'profundidade': profundidade,
+            'inicio': round(self.inicio - _inicio, 6),
+            'segundos': round(fim - self.inicio, 6),
+            'atributos': self.atributos,
+        }
+        if tipo_erro is not None:
+            registro['erro'] = tipo_erro.__name__
+        with _lock:
+            _registros.append(registro)
+        return False
+
+    def definir(self, **atributos):
+        """Acrescenta atributos ao span (ex.: linhas=..., cache='hit')."""
+        self.atributos.update(atributos)
+
+    def encerrar(self):
+        """Fecha um span aberto com iniciar()."""
+        self.__exit__(None, None, None)
+
+
+def ativar():
+    global _ativo, _inicio
+    with _lock:
+        _registros.clear()
+    _inicio = time.perf_counter()
+    _ativo = True
+
+
+def desativar():
+    global _ativo
+    _ativo = False
+
+
+def ativo():
+    return _ativo
+
+
+def span(nome, **atributos):
+    """Context manager que mede o bloco: `with span('features', linhas=n) as s: ...`."""
+    if not _ativo:
+        return _SPAN_NULO
+    return _Span(nome, atributos)
+
+
+def iniciar(nome, **atributos):
+    """Abre um span fora de um bloco `with`; feche com `.encerrar()` na mesma thread."""
+    return span(nome, **atributos).__enter__()
+
+
+def definir(**atributos):
+    """Acrescenta atributos ao span aberto mais interno da thread atual."""
+    if not _ativo:
+        return
+    pilha = getattr(_local, 'pilha', None)
+    if pilha:
+        pilha[-1].atributos.update(atributos)
+
+
+def medido(nome):
+    """Decorador: mede cada chamada da função como um span."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _Span(nome, {}):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def registros():
+    """Spans já encerrados, em ordem de término."""
+    with _lock:
+        return list(_registros)
+
+
+def resumo():
+    """Tempo total, número de chamadas e maior duração por nome de span."""
+    agregado = {}
+    for r in registros():
+        item = agregado.setdefault(r['nome'], {'chamadas': 0, 'segundos': 0.0, 'maximo': 0.0})
+        item['chamadas'] += 1
+        item['segundos'] += r['segundos']
+        item['maximo'] = max(item['maximo'], r['segundos'])
+    return {nome: {k: round(v, 6) if isinstance(v, float) else v for k, v in item.items()}
+            for nome, item in sorted(agregado.items(), key=lambda kv: -kv[1]['segundos'])}
+
+
+def exportar_json(caminho):
+    """Grava o trace (spans + resumo por nome) num arquivo JSON."""
+    spans = sorted(registros(), key=lambda r: r['inicio'])
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'spans': spans, 'resumo': resumo()}, f, indent=2, ensure_ascii=False, default=str)
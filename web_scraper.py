@@ -1,92 +1,330 @@
 import pandas as pd
 import requests
+import hashlib
+import json
+import threading
 import time
 import os
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from tracing import medido, definir
+
+# Plano gratuito da football-data.org: 10 requisições por minuto
+LIMITE_REQUISICOES = 10
+JANELA_SEGUNDOS = 60
+
+# Validade (segundos) das respostas no cache HTTP, por endpoint.
+# Temporadas encerradas não mudam mais, então ficam válidas por muito mais tempo.
+TTL_PADRAO = {
+    'matches': 10 * 60,
+    'scorers': 60 * 60,
+    'temporada_fechada': 30 * 24 * 60 * 60,
+}
+
+# Status da API em que o placar já é definitivo
+STATUS_ENCERRADO = ('FINISHED', 'AWARDED')
+
+# Maior intervalo dateFrom/dateTo aceito pela API numa única consulta
+MAX_DIAS_PERIODO = 10
+
+class LimitadorTaxa:
+    """
+    Limitador thread-safe de janela deslizante: no máximo `capacidade` requisições em qualquer
+    intervalo de `janela` segundos (rajadas de até `capacidade`). Cada chamada a adquirir()
+    reserva um horário e dorme (fora do lock) até ele. `relogio` e `dormir` podem ser trocados
+    (ex.: relógio simulado nos testes).
+    """
+    def __init__(self, capacidade=LIMITE_REQUISICOES, janela=JANELA_SEGUNDOS, relogio=time.monotonic,
+                 dormir=time.sleep):
+        self.capacidade = capacidade
+        self.janela = janela
+        self.relogio = relogio
+        self.dormir = dormir
+        # Horários reservados das últimas `capacidade` requisições
+        self.reservas = deque(maxlen=capacidade)
+        self.lock = threading.Lock()
+
+    def adquirir(self):
+        with self.lock:
+            agora = self.relogio()
+            horario = agora
+            if len(self.reservas) == self.capacidade:
+                horario = max(agora, self.reservas[0] + self.janela)
+            self.reservas.append(horario)
+            espera = horario - agora
+        if espera > 0:
+            self.dormir(espera)
+
 class AtletiQScraper:
-    def __init__(self, api_key=None):
+    # Mapeamento de nomes para padronização interna
+    de_para = {
+        'CA Mineiro': 'Atlético-MG',
+        'CA Paranaense': 'Athletico-PR',
+        'EC Bahia': 'Bahia',
+        'RB Bragantino': 'RB Bragantino',
+        'Botafogo FR': 'Botafogo',
+        'SC Corinthians Paulista': 'Corinthians',
+        'Coritiba FBC': 'Coritiba',
+        'Cuiabá EC': 'Cuiabá',
+        'Chapecoense AF': 'Chapecoense',
+        'CR Flamengo': 'Flamengo',
+        'Fluminense FC': 'Fluminense',
+        'Fortaleza EC': 'Fortaleza',
+        'Grêmio FBPA': 'Grêmio',
+        'SC Internacional': 'Internacional',
+        'Mirassol FC': 'Mirassol',
+        'SE Palmeiras': 'Palmeiras',
+        'São Paulo FC': 'São Paulo',
+        'Santos FC': 'Santos',
+        'EC Vitória': 'Vitória',
+        'CR Vasco da Gama': 'Vasco',
+        'Clube do Remo': 'Remo'
+    }
+
+    def __init__(self, api_key=None, base_url=None, limitador=None, max_tentativas=4, backoff=1.0, timeout=20,
+                 cache_dir="atletiq_http_cache", ttl=None, offline=None, dormir=time.sleep):
         load_dotenv()
         self.api_key = api_key or os.getenv("API_KEY")
-        self.base_url = "https://api.football-data.org/v4/"
+        self.base_url = base_url or "https://api.football-data.org/v4/"
         self.headers = {'X-Auth-Token': self.api_key}
+        self.limitador = limitador or LimitadorTaxa()
+        self.max_tentativas = max_tentativas
+        self.backoff = backoff
+        self.timeout = timeout
+        self.dormir = dormir  # espera entre tentativas (trocável nos testes)
+
+        # Cache HTTP em disco (cache_dir=None desativa). No modo offline só o cache é usado.
+        self.cache_dir = cache_dir
+        self.ttl = dict(TTL_PADRAO, **(ttl or {}))
+        if offline is None:
+            offline = os.getenv("ATLETIQ_OFFLINE", "").lower() in ("1", "true", "sim")
+        self.offline = offline
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Sessão compartilhada: reaproveita conexões (keep-alive) entre requisições e threads
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LIMITE_REQUISICOES)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def limpar_nome_time(self, nome_raw):
         """Função auxiliar para padronizar nomes"""
         return self.de_para.get(nome_raw, nome_raw.replace(' SAF', '').replace(' EC', '').strip())
 
+    @medido('http.get')
+    def _get(self, url, params=None, headers=None):
+        """
+        GET pela sessão compartilhada, respeitando o limitador de taxa.
+        Em 429 e 5xx (ou falha de conexão) tenta de novo com backoff exponencial,
+        usando o tempo indicado pela API quando ele vier no cabeçalho.
+        """
+        for tentativa in range(self.max_tentativas):
+            self.limitador.adquirir()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                if tentativa == self.max_tentativas - 1:
+                    raise
+                self.dormir(self.backoff * 2 ** tentativa)
+                continue
+
+            definir(status=response.status_code, tentativas=tentativa + 1)
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if tentativa == self.max_tentativas - 1:
+                return response
+
+            espera = self.backoff * 2 ** tentativa
+            for cabecalho in ('Retry-After', 'X-RequestCounter-Reset'):
+                try:
+                    espera = max(espera, float(response.headers[cabecalho]))
+                    break
+                except (KeyError, ValueError):
+                    continue
+            print(f"API respondeu {response.status_code}, nova tentativa em {espera:.0f}s...")
+            self.dormir(espera)
+        return response
+
+    def _caminho_cache(self, url, params):
+        chave = json.dumps([url, sorted((params or {}).items())])
+        return os.path.join(self.cache_dir, hashlib.sha1(chave.encode()).hexdigest() + ".json")
+
+    def _ler_cache(self, caminho):
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _gravar_cache(self, caminho, entrada):
+        tmp = f"{caminho}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entrada, f)
+        os.replace(tmp, caminho)
+
+    @medido('http.buscar_json')
+    def _buscar_json(self, endpoint, params):
+        """
+        Busca um endpoint da competição usando o cache HTTP em disco:
+        - dentro do TTL, devolve o corpo salvo sem ir à rede;
+        - fora dele, faz uma requisição condicional (If-None-Match / If-Modified-Since)
+          e, em 304, só renova a validade do corpo salvo;
+        - em erro de rede/API, devolve a última versão salva, se houver;
+        - no modo offline, responde apenas com o que estiver no cache.
+        Retorna o JSON (dict) ou None.
+        """
+        url = f"{self.base_url}competitions/BSA/{endpoint}"
+        definir(endpoint=endpoint, params=params)
+        if not self.cache_dir:
+            response = self._get(url, params=params)
+            if response.status_code != 200:
+                print(f"Erro na API: Status {response.status_code}")
+                return None
+            return response.json()
+
+        caminho = self._caminho_cache(url, params)
+        entrada = self._ler_cache(caminho)
+
+        if self.offline:
+            definir(cache='offline' if entrada is not None else 'offline_miss')
+            if entrada is None:
+                print(f"Modo offline: sem cache para {endpoint} {params}")
+                return None
+            return entrada['corpo']
+
+        ttl = self.ttl[endpoint]
+        if 'season' in (params or {}) and int(params['season']) < datetime.now().year:
+            ttl = max(ttl, self.ttl['temporada_fechada'])
+        if entrada is not None and time.time() - entrada['salvo_em'] < ttl:
+            definir(cache='hit')
+            return entrada['corpo']
+
+        headers = {}
+        if entrada is not None:
+            if entrada.get('etag'):
+                headers['If-None-Match'] = entrada['etag']
+            if entrada.get('last_modified'):
+                headers['If-Modified-Since'] = entrada['last_modified']
+
+        try:
+            response = self._get(url, params=params, headers=headers)
+        except requests.RequestException as e:
+            print(f"Erro na requisição: {e}")
+            definir(cache='stale' if entrada is not None else 'erro')
+            return entrada['corpo'] if entrada is not None else None
+
+        if response.status_code == 304 and entrada is not None:
+            entrada['salvo_em'] = time.time()
+            self._gravar_cache(caminho, entrada)
+            definir(cache='revalidado')
+            return entrada['corpo']
+
+        if response.status_code != 200:
+            print(f"Erro na API: Status {response.status_code}")
+            definir(cache='stale' if entrada is not None else 'erro')
+            return entrada['corpo'] if entrada is not None else None
+
+        definir(cache='miss')
+        corpo = response.json()
+        self._gravar_cache(caminho, {
+            'url': url,
+            'params': params,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'salvo_em': time.time(),
+            'corpo': corpo,
+        })
+        return corpo
+
+    def _partidas_para_df(self, data):
+        """Converte a lista de partidas da API no DataFrame usado pelo app (uma linha por jogo)."""
+        matches = []
+
+        for m in data.get('matches', []):
+            h_raw, a_raw = m['homeTeam'].get('name', ''), m['awayTeam'].get('name', '')
+            home = self.limpar_nome_time(h_raw)
+            away = self.limpar_nome_time(a_raw)
+            status = m.get('status')
+            # Placar só conta quando o jogo terminou (durante o jogo a API já preenche o parcial)
+            encerrado = status in STATUS_ENCERRADO
+
+            matches.append({
+                'id': m.get('id'),
+                'Status': status,
+                'Rodada': m.get('matchday'),
+                'Date': m.get('utcDate'),
+                'HomeTeam': home,
+                'AwayTeam': away,
+                'FTHG': m['score']['fullTime'].get('home') if encerrado else None,
+                'FTAG': m['score']['fullTime'].get('away') if encerrado else None
+            })
+        definir(linhas=len(matches))
+        df = pd.DataFrame(matches, columns=['id', 'Status', 'Rodada', 'Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG'])
+        # Gols sempre em float (NaN para jogos sem placar): uma janela só com jogos futuros
+        # viraria coluna de None (object) e contaminaria o cache ao ser mesclada
+        df[['FTHG', 'FTAG']] = df[['FTHG', 'FTAG']].apply(pd.to_numeric, errors='coerce').astype('float64')
+        return df
+
+    @medido('api.temporada')
     def buscar_dados_hibrido(self, ano):
-        if not self.api_key:
+        if not self.api_key and not self.offline:
             print("Erro: API_KEY não encontrada.")
             return None
-            
+
         print(f"Buscando partidas ({ano})...")
-        url = f"{self.base_url}competitions/BSA/matches"
         params = {'season': int(ano)}
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code != 200: 
-                print(f"Erro na API: Status {response.status_code}")
+            data = self._buscar_json('matches', params)
+            if data is None:
                 return None
-            
-            data = response.json()
-            matches = []
-            
-            # Mapeamento de nomes para padronização interna 
-            self.de_para = {
-                'CA Mineiro': 'Atlético-MG',
-                'CA Paranaense': 'Athletico-PR',
-                'EC Bahia': 'Bahia',
-                'RB Bragantino': 'RB Bragantino',
-                'Botafogo FR': 'Botafogo',
-                'SC Corinthians Paulista': 'Corinthians',
-                'Coritiba FBC': 'Coritiba',
-                'Cuiabá EC': 'Cuiabá',
-                'Chapecoense AF': 'Chapecoense',
-                'CR Flamengo': 'Flamengo',
-                'Fluminense FC': 'Fluminense',
-                'Fortaleza EC': 'Fortaleza',
-                'Grêmio FBPA': 'Grêmio',
-                'SC Internacional': 'Internacional',
-                'Mirassol FC': 'Mirassol',
-                'SE Palmeiras': 'Palmeiras',
-                'São Paulo FC': 'São Paulo',
-                'Santos FC': 'Santos',
-                'EC Vitória': 'Vitória',
-                'CR Vasco da Gama': 'Vasco',
-                'Clube do Remo': 'Remo'
-            }
-            
-            for m in data.get('matches', []):
-                h_raw, a_raw = m['homeTeam'].get('name', ''), m['awayTeam'].get('name', '')
-                home = self.de_para.get(h_raw, h_raw.replace(' SAF', '').replace(' EC', '').strip())
-                away = self.de_para.get(a_raw, a_raw.replace(' SAF', '').replace(' EC', '').strip())
-                
-                matches.append({
-                    'Rodada': m.get('matchday'), 
-                    'Date': m.get('utcDate'), 
-                    'HomeTeam': home, 
-                    'AwayTeam': away,
-                    'FTHG': m['score']['fullTime'].get('home'), 
-                    'FTAG': m['score']['fullTime'].get('away')
-                })
-            return pd.DataFrame(matches)
+            return self._partidas_para_df(data)
         except Exception as e:
             print(f"Erro na requisição: {e}")
             return None
 
+    @medido('api.temporada_periodo')
+    def buscar_partidas_periodo(self, ano, data_inicio, data_fim):
+        """
+        Busca só as partidas da temporada entre `data_inicio` e `data_fim` (dateFrom/dateTo),
+        usado para atualizar a temporada em andamento sem baixar tudo de novo.
+        """
+        if not self.api_key and not self.offline:
+            print("Erro: API_KEY não encontrada.")
+            return None
+
+        print(f"Buscando partidas ({ano}) de {data_inicio:%d/%m} a {data_fim:%d/%m}...")
+        params = {
+            'season': int(ano),
+            'dateFrom': data_inicio.strftime('%Y-%m-%d'),
+            'dateTo': data_fim.strftime('%Y-%m-%d'),
+        }
+        try:
+            data = self._buscar_json('matches', params)
+            if data is None:
+                return None
+            return self._partidas_para_df(data)
+        except Exception as e:
+            print(f"Erro na requisição: {e}")
+            return None
+
+    @medido('api.artilharia')
     def fetch_scorers(self, ano):
         """Busca os artilheiros da competição no ano especificado."""
-        if not self.api_key:
+        if not self.api_key and not self.offline:
             return None
-            
+
         print(f"Buscando artilharia ({ano})...")
-        url = f"{self.base_url}competitions/BSA/scorers"
         params = {'season': int(ano)}
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code != 200: return None
-            data = response.json()
+            data = self._buscar_json('scorers', params)
+            if data is None: return None
+            definir(ano=int(ano), linhas=len(data.get('scorers', [])))
             scorers = []
             for s in data.get('scorers', []):
                 nome_time_raw = s['team']['name']
@@ -105,4 +343,27 @@ class AtletiQScraper:
                     'Jogos': s.get('playedMatches', 0)
                 })
             return pd.DataFrame(scorers)
-        except: return None
\ No newline at end of file
+        except: return None
+
+    def sincronizar(self, anos, ano_artilharia=None, periodos=None):
+        """
+        Busca as temporadas pedidas (e, opcionalmente, a artilharia) em paralelo.
+        `periodos` (dict ano -> (data_inicio, data_fim)) faz a busca daquele ano só na janela de datas.
+        Retorna (dict ano -> DataFrame ou None, DataFrame de artilharia ou None).
+        """
+        anos = list(anos)
+        periodos = periodos or {}
+        n_tarefas = len(anos) + (1 if ano_artilharia is not None else 0)
+        if n_tarefas == 0:
+            return {}, None
+
+        with ThreadPoolExecutor(max_workers=min(n_tarefas, LIMITE_REQUISICOES)) as pool:
+            futuros = {
+                ano: pool.submit(self.buscar_partidas_periodo, str(ano), *periodos[ano]) if ano in periodos
+                else pool.submit(self.buscar_dados_hibrido, str(ano))
+                for ano in anos
+            }
+            futuro_art = pool.submit(self.fetch_scorers, str(ano_artilharia)) if ano_artilharia is not None else None
+            temporadas = {ano: f.result() for ano, f in futuros.items()}
+            artilharia = futuro_art.result() if futuro_art is not None else None
+        return temporadas, artilharia